@@ -2,18 +2,14 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
-from dotenv import load_dotenv
-import os
-
-# 환경 변수 로드
-load_dotenv()
+from app.core.config import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# 데이터베이스 URL을 환경 변수에서 가져옴
-config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
+# 데이터베이스 URL은 앱과 같은 Settings에서 가져옴 (configparser 보간을 피하기 위해 % 이스케이프)
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -62,6 +58,16 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # 테스트 등에서 이미 열린 커넥션을 넘겨받은 경우 그대로 사용
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,30 @@
+"""add composite indexes for per-user mission and message queries
+
+Revision ID: add_hot_path_indexes
+Revises: create_messages_table
+Create Date: 2024-04-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'create_messages_table'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # read_missions: WHERE user_id = ? (id 순)
+    op.create_index('ix_missions_user_id_id', 'missions', ['user_id', 'id'], unique=False)
+    # 사용자별 메시지 기록: WHERE user_id = ? ORDER BY created_at DESC
+    op.create_index(
+        'ix_messages_user_id_created_at',
+        'messages',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_user_id_created_at', table_name='messages')
+    op.drop_index('ix_missions_user_id_id', table_name='missions')
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""add messages.reaction for observed reaction outcomes
+
+Revision ID: add_message_reaction
+Revises: add_user_report_stats
+Create Date: 2024-05-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_message_reaction'
+down_revision = 'add_user_report_stats'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # 사용자가 기록한 상대의 실제 반응 (positive/neutral/negative, 기록 전에는 NULL)
+    op.add_column('messages', sa.Column('reaction', sa.String(length=16), nullable=True))
+    # 예측 반응으로 만든 이전 요일/시간 히스토그램("hour")은 더 이상 쓰지 않음.
+    # 새 히스토그램("reaction_hour")은 기록된 반응으로만 쌓임
+    op.execute("DELETE FROM user_report_stats WHERE metric = 'hour'")
+
+def downgrade() -> None:
+    op.execute("DELETE FROM user_report_stats WHERE metric = 'reaction_hour'")
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.drop_column('reaction')
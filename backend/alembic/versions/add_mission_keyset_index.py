@@ -0,0 +1,27 @@
+"""add (user_id, created_at, id) index for mission keyset pagination
+
+Revision ID: add_mission_keyset_index
+Revises: add_hot_path_indexes
+Create Date: 2024-04-22 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_mission_keyset_index'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # read_missions: WHERE user_id = ? AND (created_at, id) > (?, ?) ORDER BY created_at, id
+    op.create_index(
+        'ix_missions_user_id_created_at_id',
+        'missions',
+        ['user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_missions_user_id_created_at_id', table_name='missions')
\ No newline at end of file
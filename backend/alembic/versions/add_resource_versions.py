@@ -0,0 +1,29 @@
+"""add resource_versions table for conditional GET (ETag)
+
+Revision ID: add_resource_versions
+Revises: add_mission_keyset_index
+Create Date: 2024-05-06 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_resource_versions'
+down_revision = 'add_mission_keyset_index'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # 조회: WHERE user_id = ? AND resource = ? (기본 키 조회 한 번)
+    op.create_table(
+        'resource_versions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(length=32), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'resource')
+    )
+
+def downgrade() -> None:
+    op.drop_table('resource_versions')
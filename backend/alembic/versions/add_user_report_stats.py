@@ -0,0 +1,31 @@
+"""add user_report_stats table for incrementally maintained report statistics
+
+Revision ID: add_user_report_stats
+Revises: add_resource_versions
+Create Date: 2024-05-13 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_report_stats'
+down_revision = 'add_resource_versions'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # 리포트 조회: WHERE user_id = ? (기본 키 앞부분 범위 조회)
+    op.create_table(
+        'user_report_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=16), nullable=False),
+        sa.Column('bucket', sa.String(length=64), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'metric', 'bucket')
+    )
+
+def downgrade() -> None:
+    op.drop_table('user_report_stats')
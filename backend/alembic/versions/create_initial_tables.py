@@ -0,0 +1,102 @@
+"""create users, user_profiles, missions and onboarding tables
+
+Revision ID: create_initial_tables
+Revises: None
+Create Date: 2024-04-01 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'create_initial_tables'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# SQLAlchemy Enum은 파이썬 enum의 멤버 이름을 저장함
+tendency_type = sa.Enum('ANALYTICAL', 'EMOTIONAL', name='tendencytype')
+breakup_reason = sa.Enum('COMMUNICATION', 'VALUES', 'EXTERNAL', 'TRUST', 'OTHER', name='breakupreason')
+strategy_type = sa.Enum('ANALYTICAL', 'BALANCED', 'EMOTIONAL', name='strategytype')
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table(
+        'user_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('bio', sa.String(), nullable=True),
+        sa.Column('interests', sa.JSON(), nullable=True),
+        sa.Column('preferences', sa.JSON(), nullable=True),
+        sa.Column('goals', sa.JSON(), nullable=True),
+        sa.Column('onboarding_completed', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_profiles_id'), 'user_profiles', ['id'], unique=False)
+    op.create_index(op.f('ix_user_profiles_user_id'), 'user_profiles', ['user_id'], unique=True)
+
+    op.create_table(
+        'missions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_missions_id'), 'missions', ['id'], unique=False)
+    op.create_index(op.f('ix_missions_title'), 'missions', ['title'], unique=False)
+
+    op.create_table(
+        'onboarding',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('breakup_date', sa.Date(), nullable=False),
+        sa.Column('relationship_years', sa.Integer(), nullable=False),
+        sa.Column('relationship_months', sa.Integer(), nullable=False),
+        sa.Column('my_tendency', tendency_type, nullable=False),
+        sa.Column('partner_tendency', tendency_type, nullable=False),
+        sa.Column('breakup_reason', breakup_reason, nullable=True),
+        sa.Column('strategy_type', strategy_type, nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_onboarding_id'), 'onboarding', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_onboarding_id'), table_name='onboarding')
+    op.drop_table('onboarding')
+    op.drop_index(op.f('ix_missions_title'), table_name='missions')
+    op.drop_index(op.f('ix_missions_id'), table_name='missions')
+    op.drop_table('missions')
+    op.drop_index(op.f('ix_user_profiles_user_id'), table_name='user_profiles')
+    op.drop_index(op.f('ix_user_profiles_id'), table_name='user_profiles')
+    op.drop_table('user_profiles')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
+    bind = op.get_bind()
+    strategy_type.drop(bind, checkfirst=True)
+    breakup_reason.drop(bind, checkfirst=True)
+    tendency_type.drop(bind, checkfirst=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
 """create messages table
 
 Revision ID: create_messages_table
-Revises: None
+Revises: create_initial_tables
 Create Date: 2024-04-08 12:00:00.000000
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'create_messages_table'
-down_revision = None
+down_revision = 'create_initial_tables'
 branch_labels = None
 depends_on = None
 
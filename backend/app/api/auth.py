@@ -1,36 +1,38 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core import security
 from ..core.deps import get_db
+from ..core.etag import USER, bump_version
 from ..models.user import User
 from ..schemas.user import UserCreate, UserResponse, Token
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 @router.post("/signup", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """새로운 사용자 생성"""
-    # 이메일 중복 체크
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+    # 이메일/사용자 이름 중복을 한 번에 체크
+    duplicates = (await db.execute(
+        select(User.email, User.username).where(
+            or_(User.email == user.email, User.username == user.username)
+        )
+    )).all()
+    if any(row.email == user.email for row in duplicates):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # 사용자 이름 중복 체크
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    if duplicates:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
     # 새 사용자 생성
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.hash_password(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -38,24 +40,33 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         full_name=user.full_name
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자 로그인"""
     # 사용자 찾기
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await security.check_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # 이전 비용 인자로 만든 해시는 현재 설정으로 재해싱
+    if new_hash:
+        user.hashed_password = new_hash
+        # updated_at이 바뀌므로 /users/me의 ETag도 갱신
+        await bump_version(db, user.id, USER)
+        await db.commit()
     
     # 액세스 토큰 생성
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -63,28 +74,3 @@ def login(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
-
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """현재 인증된 사용자 가져오기"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = security.decode_access_token(token)
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except Exception:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-        
-    return user 
\ No newline at end of file
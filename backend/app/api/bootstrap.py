@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Optional
+
+from ..core.deps import get_current_active_user, get_db
+from ..models.mission import Mission
+from ..models.user import User
+from ..schemas.bootstrap import BootstrapResponse
+from ..services.goals import recommend_goals
+
+router = APIRouter()
+
+BOOTSTRAP_FIELDS = ("user", "profile", "onboarding", "missions", "recommended_goals")
+
+def _parse_fields(fields: Optional[str]) -> set:
+    if fields is None:
+        return set(BOOTSTRAP_FIELDS)
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected.difference(BOOTSTRAP_FIELDS)
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown)) or '(empty)'} (available: {', '.join(BOOTSTRAP_FIELDS)})"
+        )
+    return selected
+
+@router.get("/", response_model=BootstrapResponse, response_model_exclude_unset=True)
+async def read_bootstrap(
+    fields: Optional[str] = Query(None, description="쉼표로 구분한 항목 (user, profile, onboarding, missions, recommended_goals)"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    앱 시작 시 필요한 사용자, 프로필, 온보딩, 진행 중인 미션, 추천 목표를 한 번에 반환합니다.
+    사용자 행과 1:1 관계는 JOIN으로, 미션은 IN 조회로 함께 읽어 최대 두 번의 쿼리로 처리합니다.
+    """
+    selected = _parse_fields(fields)
+    data = {}
+    if "user" in selected:
+        data["user"] = current_user
+
+    # 요청한 항목에 필요한 관계만 eager load
+    options = []
+    if "profile" in selected:
+        options.append(joinedload(User.profile))
+    # 추천 목표는 같은 쿼리로 읽은 온보딩 행에서 바로 계산 (캐시를 거치지 않으므로 항상 최신)
+    if "onboarding" in selected or "recommended_goals" in selected:
+        options.append(joinedload(User.onboarding))
+    if "missions" in selected:
+        options.append(selectinload(User.missions.and_(Mission.is_completed == False)))  # noqa: E712
+
+    if options:
+        user = await db.scalar(select(User).where(User.id == current_user.id).options(*options))
+        if "profile" in selected:
+            data["profile"] = user.profile
+        if "onboarding" in selected:
+            data["onboarding"] = user.onboarding
+        if "missions" in selected:
+            data["missions"] = sorted(user.missions, key=lambda mission: (mission.created_at, mission.id))
+        if "recommended_goals" in selected:
+            onboarding = user.onboarding
+            data["recommended_goals"] = list(recommend_goals(None if onboarding is None else (
+                onboarding.breakup_reason,
+                onboarding.strategy_type,
+                onboarding.my_tendency,
+                onboarding.partner_tendency,
+            )))
+    return data
@@ -1,68 +1,244 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from sqlalchemy.orm import Session
-from app.schemas.message import RecommendedGoal, MessagePurpose, GeneratedMessage
+from contextlib import aclosing
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.schemas.message import (
+    GeneratedMessage,
+    GeneratedVariant,
+    MessagePurpose,
+    MessageReaction,
+    MessageResponse,
+    RecommendedGoal,
+    RiskMatchResponse,
+    RiskScanRequest,
+    RiskScanResponse,
+)
+from app.core.config import settings
 from app.core.deps import get_current_user, get_db
+from app.core.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, split_page
+from app.core.responses import FastJSONResponse
+from app.db.database import get_session_factory
 from app.models.user import User
 from app.services.message_service import MessageService
+from app.services.risk import risk_scanner
+from app.services.templates import UnknownToneStyle, template_registry
+from app.services.write_behind import WriteBufferFull
+import json
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# 추천 목표 목록 (임시 데이터)
-RECOMMENDED_GOALS = [
-    {
-        "id": 1,
-        "name": "재회",
-        "description": "이전 관계를 복구하고 새로운 시작을 준비합니다.",
-        "reason": "상대방과의 관계가 아직 완전히 종료되지 않았으며, 서로에 대한 감정이 남아있습니다."
-    },
-    {
-        "id": 2,
-        "name": "마음 정리",
-        "description": "과거의 관계를 정리하고 새로운 시작을 준비합니다.",
-        "reason": "현재 감정적 혼란과 불안정한 상태를 해소할 필요가 있습니다."
-    },
-    {
-        "id": 3,
-        "name": "자기 이해",
-        "description": "자신의 감정과 행동 패턴을 이해하고 성장합니다.",
-        "reason": "관계에서 반복되는 패턴을 발견했으며, 이를 개선할 필요가 있습니다."
-    },
-    {
-        "id": 4,
-        "name": "성장",
-        "description": "이전 관계의 경험을 통해 개인적 성장을 이루어냅니다.",
-        "reason": "관계 경험을 통해 배운 교훈을 바탕으로 더 나은 관계를 만들 준비를 합니다."
-    }
-]
+@router.get("/", response_model=List[MessageResponse])
+async def read_messages(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    tone_style: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    생성했던 메시지 기록을 최신순으로 조회합니다.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다.
+    """
+    messages = await MessageService(db).get_message_history(
+        current_user,
+        limit,
+        position=decode_cursor(cursor),
+        tone_style=tone_style,
+        since=since,
+        until=until,
+    )
+    page, next_cursor = split_page(messages, limit, lambda message: (message.created_at, message.id))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page
+
+@router.get("/export")
+async def export_messages(
+    current_user: User = Depends(get_current_user),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """
+    메시지 기록 전체를 NDJSON(한 줄에 메시지 하나)으로 스트리밍합니다.
+    요청 의존성 세션은 응답 전송 전에 닫히므로 스트림이 자체 세션을 열고,
+    클라이언트가 끊기면 제너레이터가 닫히면서 세션도 반환됩니다.
+    """
+    user_id = current_user.id
+
+    async def lines():
+        async with session_factory() as db:
+            async for row in MessageService(db).iter_message_history(user_id):
+                yield json.dumps(row, ensure_ascii=False, default=datetime.isoformat) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="messages.ndjson"'}
+    )
 
 @router.get("/recommended-goals", response_model=List[RecommendedGoal])
 async def get_recommended_goals(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     사용자에게 추천할 목표 목록을 반환합니다.
-    사용자의 온보딩 데이터를 기반으로 0~3개의 목표를 추천합니다.
+    사용자의 온보딩 데이터를 기반으로 0~3개의 목표를 추천합니다 (온보딩 전에는 전체 목표).
+    목표 정의는 고정값이므로 ETag는 추천된 목표 id로 만들고, 캐시 적중 시 304는 온보딩 버전 조회 한 번으로 반환됩니다.
     """
-    # 임시로 모든 추천 목표를 반환
-    return RECOMMENDED_GOALS
+    goals = await MessageService(db).get_recommended_goals(current_user)
+    etag = make_etag(current_user.id, "-".join(str(goal["id"]) for goal in goals))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(goals, headers=etag_headers(etag))
 
 @router.post("/generate", response_model=GeneratedMessage)
 async def generate_message(
     message_purpose: MessagePurpose,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     사용자가 입력한 목적과 말투 스타일에 따라 메시지를 생성하고 긍정적 반응 예측을 제공합니다.
-    생성된 메시지는 데이터베이스에 저장됩니다.
+    n과 purposes로 여러 후보를 한 번에 생성할 수 있으며, 후보는 예측 반응 순으로 정렬되고
+    가장 높은 후보가 최상위 필드에 담깁니다. 생성된 메시지는 모두 데이터베이스에 저장됩니다.
     """
     message_service = MessageService(db)
-    message = message_service.generate_message(current_user, message_purpose)
-    
+    try:
+        messages = await message_service.generate_messages(current_user, message_purpose)
+    except UnknownToneStyle as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"지원하지 않는 말투입니다: {e.tone_style} (가능한 값: {', '.join(e.available)})"
+        )
+    except WriteBufferFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many messages waiting to be saved, please retry later",
+            headers={"Retry-After": str(settings.MESSAGE_BUFFER_RETRY_AFTER)},
+        )
+
+    variants = [
+        GeneratedVariant(
+            id=message.id,
+            purpose=message.purpose,
+            message=message.content,
+            positive_reaction=int(message.positive_reaction),
+            warning=message.warning
+        )
+        for message in messages
+    ]
+    best = variants[0]
     return GeneratedMessage(
-        message=message.content,
-        positive_reaction=int(message.positive_reaction),
-        warning=message.warning
-    ) 
\ No newline at end of file
+        message=best.message,
+        positive_reaction=best.positive_reaction,
+        warning=best.warning,
+        variants=variants
+    ) 
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _generation_events(user: User, message_purpose: MessagePurpose, session_factory: async_sessionmaker) -> AsyncIterator[str]:
+    """
+    생성 전에 start 이벤트를 먼저 보내 헤더와 첫 바이트가 백엔드 호출을 기다리지 않게 하고,
+    백엔드가 조각을 보내는 대로 token 이벤트로 전달한 뒤, 다 보낸 뒤에만 저장해 점수와 경고를
+    result 이벤트로 보냅니다. 클라이언트가 중간에 끊으면 제너레이터가 닫히면서 백엔드 스트림도
+    닫히고 저장하지 않으며, 생성/저장 중에 끊겨도 async with가 세션을 반환합니다.
+    """
+    yield _sse("start", {"purpose": message_purpose.purpose, "tone_style": message_purpose.tone_style})
+    # 조각을 보내는 동안 커넥션을 붙잡지 않도록 생성(온보딩 조회 후 반환)과 저장은 각각 세션을 열어 수행
+    draft = None
+    async with session_factory() as db:
+        try:
+            async with aclosing(MessageService(db).stream_draft(user, message_purpose)) as drafts:
+                async for draft in drafts:
+                    yield _sse("token", {"text": draft.fragments[-1]})
+        except Exception:
+            # 조각을 보낸 뒤 백엔드가 실패하면 대체할 수 없으므로 error 이벤트로 알림
+            logger.exception("메시지 스트리밍 생성 실패")
+            draft = None
+    if draft is None:
+        yield _sse("error", {"detail": "Message generation failed, please retry"})
+        return
+    async with session_factory() as db:
+        try:
+            message, = await MessageService(db).save_drafts(user.id, [draft])
+        except WriteBufferFull:
+            # 헤더를 이미 보냈으므로 503 대신 error 이벤트로 알림
+            yield _sse("error", {"detail": "Too many messages waiting to be saved, please retry later"})
+            return
+    yield _sse("result", {
+        "id": message.id,
+        "message": message.content,
+        "positive_reaction": int(message.positive_reaction),
+        "warning": message.warning,
+    })
+
+@router.post("/generate/stream")
+async def generate_message_stream(
+    message_purpose: MessagePurpose,
+    current_user: User = Depends(get_current_user),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """
+    메시지 생성의 스트리밍(Server-Sent Events) 버전입니다.
+    start 이벤트를 바로 보내고 생성 백엔드가 본문 조각을 만드는 대로 token 이벤트로, 마지막 result 이벤트로
+    점수와 경고를 보냅니다. 목적 하나에 후보 하나만 생성하며 (n, purposes 무시),
+    메시지는 스트림이 끝까지 전송된 뒤 저장됩니다.
+    """
+    single = message_purpose.model_copy(update={"n": 1, "purposes": []})
+    # 헤더를 보낸 뒤에는 422를 줄 수 없으므로 말투는 스트림을 시작하기 전에 검증
+    try:
+        template_registry.current().tone(single.tone_style)
+    except UnknownToneStyle as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"지원하지 않는 말투입니다: {e.tone_style} (가능한 값: {', '.join(e.available)})"
+        )
+    # 요청 세션은 응답 전송 전에 닫히므로 생성과 저장은 스트림이 직접 연 세션으로 수행
+    return StreamingResponse(
+        _generation_events(current_user, single, session_factory),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.put("/{message_id}/reaction", response_model=MessageResponse)
+async def set_message_reaction(
+    message_id: int,
+    body: MessageReaction,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    보낸 메시지에 상대가 실제로 보인 반응(positive/neutral/negative)을 기록합니다.
+    기록된 반응은 보낸 시각별로 모여 연락 시간 추천(/api/timing/weekly)의 근거가 됩니다.
+    """
+    message = await MessageService(db).set_reaction(current_user.id, message_id, body.reaction)
+    if message is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="메시지를 찾을 수 없습니다")
+    return message
+
+@router.post("/scan", response_model=RiskScanResponse)
+async def scan_message(
+    draft: RiskScanRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    사용자가 수정한 메시지 초안에서 위험 문구를 찾아 경고를 반환합니다.
+    생성 시 경고와 같은 사전을 사용하며 DB는 사용하지 않습니다.
+    """
+    result = risk_scanner.scan(draft.purpose or "", draft.text)
+    return RiskScanResponse(
+        warning=result.warning,
+        category=result.category,
+        matches=[RiskMatchResponse(category=match.category, phrase=match.phrase) for match in result.matches]
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from ..core.deps import principal_cache, require_metrics_token
+from ..db.telemetry import pool_telemetry
+from ..services.goals import recommended_goals_cache
+from ..services.generation import generation_backend, generation_cache
+from ..services.risk import risk_scanner
+from ..services.scoring import reaction_scorer
+from ..services.templates import template_registry
+from ..services.timing import timing_prior
+from ..services.write_behind import message_write_buffer
+
+router = APIRouter()
+
+@router.get("/", dependencies=[Depends(require_metrics_token)])
+async def read_metrics():
+    """캐시 등 프로세스 내부 지표를 반환합니다. 내부 수집기 전용으로 X-Metrics-Token 헤더가 필요합니다."""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "db_pool": pool_telemetry.stats(),
+        "message_templates": template_registry.stats(),
+        "reaction_model": reaction_scorer.stats(),
+        "risk_phrases": risk_scanner.stats(),
+        "timing_prior": timing_prior.stats(),
+        "generation": generation_backend.stats(),
+        "generation_cache": generation_cache.stats(),
+        "recommended_goals_cache": recommended_goals_cache.stats(),
+        "message_write_buffer": message_write_buffer.stats() if message_write_buffer is not None else None,
+    }
\ No newline at end of file
@@ -1,55 +1,224 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from ..core.deps import get_db, get_current_user
+from ..core.etag import MISSIONS, bump_version, etag_headers, etag_matches, make_etag, not_modified, resource_version
+from ..core.pagination import NEXT_CURSOR_HEADER, decode_cursor, split_page
+from ..core.responses import FastJSONResponse, row_dicts
 from ..models.user import User
 from ..models.mission import Mission
-from ..schemas.mission import MissionCreate, MissionUpdate, MissionResponse
+from ..services.report import record_mission_completion, record_missions_completed
+from ..schemas.mission import (
+    MissionBatchRequest,
+    MissionBatchResult,
+    MissionCreate,
+    MissionResponse,
+    MissionUpdate,
+)
 
 router = APIRouter()
 
+# 목록 조회에서 읽는 컬럼 (MissionResponse 필드와 같은 이름, 같은 순서)
+MISSION_COLUMNS = tuple(Mission.__table__.c[name] for name in MissionResponse.model_fields)
+
 @router.post("/", response_model=MissionResponse)
-def create_mission(
+async def create_mission(
     mission: MissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """새로운 미션을 생성합니다."""
-    db_mission = Mission(
-        title=mission.title,
-        description=mission.description,
-        user_id=current_user.id
+    # DB가 채우는 created_at까지 INSERT ... RETURNING 한 문장으로 받아옴
+    db_mission = await db.scalar(
+        insert(Mission)
+        .values(
+            title=mission.title,
+            description=mission.description,
+            user_id=current_user.id
+        )
+        .returning(Mission)
     )
-    db.add(db_mission)
-    db.commit()
-    db.refresh(db_mission)
+    await bump_version(db, current_user.id, MISSIONS)
+    await db.commit()
     return db_mission
 
 @router.get("/", response_model=List[MissionResponse])
-def read_missions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+async def read_missions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    is_completed: Optional[bool] = None,
+    updated_since: Optional[datetime] = None,
+    skip: Optional[int] = Query(None, ge=0, description="하위 호환용 offset 페이지네이션"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    현재 로그인한 사용자의 미션 목록을 (created_at, id) 순으로 조회합니다.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다.
+    ORM 객체 대신 컬럼 튜플을 읽어 dict로 바로 직렬화합니다 (identity map, 스키마 재검증 생략).
+    If-None-Match가 현재 미션 버전(과 같은 쿼리 파라미터)의 ETag와 같으면 목록을 읽지 않고 304를 반환합니다.
+    """
+    # 버전을 먼저 읽어 두면 사이에 쓰기가 끼어도 ETag가 본문보다 새것이 되지 않음
+    version = await resource_version(db, current_user.id, MISSIONS)
+    etag = make_etag(current_user.id, str(version), variant=str(request.query_params))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    columns = Mission.__table__.c
+    query = select(*MISSION_COLUMNS).where(columns.user_id == current_user.id)
+    if is_completed is not None:
+        query = query.where(columns.is_completed == is_completed)
+    if updated_since is not None:
+        # 아직 수정된 적 없는 미션은 생성 시각을 기준으로 판단
+        query = query.where(func.coalesce(columns.updated_at, columns.created_at) >= updated_since)
+    query = query.order_by(columns.created_at, columns.id)
+
+    position = decode_cursor(cursor)
+    if position is not None:
+        query = query.where(tuple_(columns.created_at, columns.id) > tuple_(*position))
+    elif skip:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit + 1))
+    missions = row_dicts(result.keys(), result.all())
+    page, next_cursor = split_page(missions, limit, lambda mission: (mission["created_at"], mission["id"]))
+    headers = etag_headers(etag)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return FastJSONResponse(page, headers=headers)
+
+@router.post("/batch", response_model=List[MissionBatchResult])
+async def batch_missions(
+    batch: MissionBatchRequest,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """현재 로그인한 사용자의 미션 목록을 조회합니다."""
-    missions = db.query(Mission).filter(
-        Mission.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return missions
+    """
+    여러 미션의 생성/수정/완료/삭제를 한 트랜잭션으로 처리하고 작업별 결과를 반환합니다.
+    작업 종류마다 INSERT/UPDATE/DELETE 문을 한 번씩만 실행하므로
+    배치 크기와 관계없이 DB 왕복 횟수가 일정합니다.
+    """
+    operations = batch.operations
+    target_ids = [operation.id for operation in operations if operation.op != "create"]
+    if len(target_ids) != len(set(target_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="같은 미션에 대한 작업이 중복되었습니다"
+        )
+
+    # 다른 사용자의 미션은 건드리지 않도록 소유한 id만 추림 (리포트 통계용으로 완료 여부도 함께)
+    owned = {}
+    if target_ids:
+        owned = dict((await db.execute(
+            select(Mission.id, Mission.is_completed).where(
+                Mission.user_id == current_user.id,
+                Mission.id.in_(target_ids)
+            )
+        )).all())
+
+    creates = [operation for operation in operations if operation.op == "create"]
+    created = []
+    if creates:
+        # RETURNING 행을 입력 순서대로 받음. SQLite는 sort_by_parameter_order를 행마다 INSERT로
+        # 처리하므로 한 문장으로 넣고, 여러 행 VALUES의 자동 증가 id가 입력 순서대로 부여되는 점을 이용해 id로 정렬
+        ordered = db.bind.dialect.name == "postgresql"
+        created = (await db.scalars(
+            insert(Mission).returning(Mission, sort_by_parameter_order=ordered).execution_options(render_nulls=True),
+            [
+                {
+                    "user_id": current_user.id,
+                    "title": operation.title,
+                    "description": operation.description,
+                    "is_completed": bool(operation.is_completed),
+                }
+                for operation in creates
+            ]
+        )).all()
+        if not ordered:
+            created.sort(key=lambda mission: mission.id)
+
+    updates = [
+        dict(
+            operation.model_dump(include={"title", "description", "is_completed"}, exclude_unset=True),
+            id=operation.id
+        )
+        for operation in operations
+        if operation.op == "update" and operation.id in owned
+    ]
+    # 변경할 필드가 없는 수정은 UPDATE 없이 현재 상태만 반환
+    changed_updates = [values for values in updates if len(values) > 1]
+    if changed_updates:
+        await db.execute(update(Mission), changed_updates)
+
+    complete_ids = [operation.id for operation in operations if operation.op == "complete" and operation.id in owned]
+    if complete_ids:
+        await db.execute(
+            update(Mission)
+            .where(Mission.user_id == current_user.id, Mission.id.in_(complete_ids))
+            .values(is_completed=True)
+        )
+
+    delete_ids = [operation.id for operation in operations if operation.op == "delete" and operation.id in owned]
+    if delete_ids:
+        await db.execute(
+            delete(Mission).where(Mission.user_id == current_user.id, Mission.id.in_(delete_ids))
+        )
+
+    changed = {}
+    changed_ids = [values["id"] for values in updates] + complete_ids
+    if changed_ids:
+        missions = await db.scalars(
+            select(Mission)
+            .where(Mission.id.in_(changed_ids))
+            .execution_options(populate_existing=True)
+        )
+        changed = {mission.id: mission for mission in missions}
+    if creates or changed_updates or complete_ids or delete_ids:
+        await bump_version(db, current_user.id, MISSIONS)
+    # 완료된 미션 수 증감: 완료 상태로 생성 + 완료 상태 변경 - 완료된 미션 삭제
+    completed_delta = sum(bool(operation.is_completed) for operation in creates)
+    completed_delta += sum(
+        bool(values["is_completed"]) - bool(owned[values["id"]])
+        for values in changed_updates if "is_completed" in values
+    )
+    completed_delta += sum(not owned[mission_id] for mission_id in complete_ids)
+    completed_delta -= sum(bool(owned[mission_id]) for mission_id in delete_ids)
+    await record_missions_completed(db, current_user.id, completed_delta)
+    await db.commit()
+
+    results = []
+    created_iter = iter(created)
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            results.append(MissionBatchResult(index=index, op=operation.op, status="ok", mission=next(created_iter)))
+        elif operation.id not in owned:
+            results.append(MissionBatchResult(index=index, op=operation.op, status="not_found"))
+        else:
+            results.append(MissionBatchResult(
+                index=index,
+                op=operation.op,
+                status="ok",
+                mission=changed.get(operation.id)
+            ))
+    return results
 
 @router.get("/{mission_id}", response_model=MissionResponse)
-def read_mission(
+async def read_mission(
     mission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """특정 미션의 상세 정보를 조회합니다."""
-    mission = db.query(Mission).filter(
-        Mission.id == mission_id,
-        Mission.user_id == current_user.id
-    ).first()
+    mission = await db.scalar(
+        select(Mission).where(
+            Mission.id == mission_id,
+            Mission.user_id == current_user.id
+        )
+    )
     if mission is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -58,47 +227,61 @@ def read_mission(
     return mission
 
 @router.put("/{mission_id}", response_model=MissionResponse)
-def update_mission(
+async def update_mission(
     mission_id: int,
     mission_update: MissionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """특정 미션의 정보를 업데이트합니다."""
-    db_mission = db.query(Mission).filter(
-        Mission.id == mission_id,
-        Mission.user_id == current_user.id
-    ).first()
+    values = mission_update.model_dump(exclude_unset=True)
+    if "is_completed" in values:
+        # 리포트의 완료 미션 수 증감을 UPDATE 전에 현재 행과 비교해 한 문장으로 반영 (이전 값을 따로 읽지 않음)
+        await record_mission_completion(db, current_user.id, mission_id, bool(values["is_completed"]))
+    # 소유 확인과 수정을 UPDATE ... RETURNING 한 문장으로 처리
+    db_mission = await db.scalar(
+        update(Mission)
+        .where(
+            Mission.id == mission_id,
+            Mission.user_id == current_user.id
+        )
+        .values(**values)
+        .returning(Mission),
+        execution_options={"populate_existing": True}
+    )
     if db_mission is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="미션을 찾을 수 없습니다"
         )
-    
-    for field, value in mission_update.dict(exclude_unset=True).items():
-        setattr(db_mission, field, value)
-    
-    db.commit()
-    db.refresh(db_mission)
+    await bump_version(db, current_user.id, MISSIONS)
+    await db.commit()
     return db_mission
 
 @router.delete("/{mission_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_mission(
+async def delete_mission(
     mission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """특정 미션을 삭제합니다."""
-    db_mission = db.query(Mission).filter(
-        Mission.id == mission_id,
-        Mission.user_id == current_user.id
-    ).first()
-    if db_mission is None:
+    deleted = (await db.execute(
+        delete(Mission)
+        .where(
+            Mission.id == mission_id,
+            Mission.user_id == current_user.id
+        )
+        .returning(Mission.id, Mission.is_completed)
+    )).first()
+    if deleted is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="미션을 찾을 수 없습니다"
         )
-    
-    db.delete(db_mission)
-    db.commit()
+    await bump_version(db, current_user.id, MISSIONS)
+    if deleted.is_completed:
+        await record_missions_completed(db, current_user.id, -1)
+    await db.commit()
     return None 
\ No newline at end of file
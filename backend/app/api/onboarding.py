@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.core import deps
+from app.core.etag import ONBOARDING, PROFILE, bump_version, etag_headers, etag_matches, make_etag, not_modified, resource_version
+from app.core.responses import FastJSONResponse
+from app.db.database import dialect_insert
 from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.schemas.onboarding import (
@@ -10,17 +14,40 @@ from app.schemas.onboarding import (
     UserProfileResponse,
     OnboardingStep
 )
-from ..db.database import get_db
 from ..models.onboarding import Onboarding, TendencyType, BreakupReason, StrategyType
 from ..schemas.onboarding import OnboardingCreate, OnboardingResponse, OnboardingStep1, OnboardingStep2, OnboardingStep3
-from ..api.auth import get_current_user
 
 router = APIRouter()
 
+# 조회 응답에서 읽는 컬럼 (응답 스키마 필드와 같은 이름, 같은 순서)
+PROFILE_COLUMNS = tuple(UserProfile.__table__.c[name] for name in UserProfileResponse.model_fields)
+ONBOARDING_COLUMNS = tuple(Onboarding.__table__.c[name] for name in OnboardingResponse.model_fields)
+
+async def _update_profile(db: AsyncSession, user_id: int, values: dict) -> UserProfile:
+    """사용자 프로필을 UPDATE ... RETURNING 한 문장으로 수정 (없으면 404)"""
+    if values:
+        query = (
+            update(UserProfile)
+            .where(UserProfile.user_id == user_id)
+            .values(**values)
+            .returning(UserProfile)
+        )
+    else:
+        # 변경할 필드가 없으면 조회만 수행
+        query = select(UserProfile).where(UserProfile.user_id == user_id)
+    db_profile = await db.scalar(query, execution_options={"populate_existing": True})
+    if not db_profile:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if values:
+        await bump_version(db, user_id, PROFILE)
+    await db.commit()
+    return db_profile
+
 @router.post("/profile", response_model=UserProfileResponse)
-def create_user_profile(
+async def create_user_profile(
     profile: UserProfileCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """사용자 프로필 생성"""
@@ -33,142 +60,138 @@ def create_user_profile(
         onboarding_completed=0
     )
     db.add(db_profile)
-    db.commit()
-    db.refresh(db_profile)
+    await bump_version(db, current_user.id, PROFILE)
+    await db.commit()
     return db_profile
 
 @router.put("/profile", response_model=UserProfileResponse)
-def update_user_profile(
+async def update_user_profile(
     profile: UserProfileUpdate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """사용자 프로필 업데이트"""
-    db_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if not db_profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
-    for field, value in profile.dict(exclude_unset=True).items():
-        setattr(db_profile, field, value)
-    
-    db.commit()
-    db.refresh(db_profile)
-    return db_profile
+    return await _update_profile(db, current_user.id, profile.model_dump(exclude_unset=True))
 
 @router.put("/step/{step}", response_model=UserProfileResponse)
-def update_onboarding_step(
+async def update_onboarding_step(
     step: OnboardingStep,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """온보딩 단계 업데이트"""
-    db_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if not db_profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
-    db_profile.onboarding_completed = step.value
-    db.commit()
-    db.refresh(db_profile)
-    return db_profile
+    return await _update_profile(db, current_user.id, {"onboarding_completed": step.value})
 
 @router.get("/profile", response_model=UserProfileResponse)
-def get_user_profile(
-    db: Session = Depends(deps.get_db),
+async def get_user_profile(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """사용자 프로필 조회"""
-    db_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if not db_profile:
+    """
+    사용자 프로필 조회 (ORM 객체 없이 컬럼 행을 바로 직렬화).
+    If-None-Match가 현재 버전과 같으면 프로필을 읽지 않고 304를 반환합니다.
+    """
+    # 버전을 먼저 읽어 두면 사이에 쓰기가 끼어도 ETag가 본문보다 새것이 되지 않음
+    etag = make_etag(current_user.id, str(await resource_version(db, current_user.id, PROFILE)))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    row = (await db.execute(
+        select(*PROFILE_COLUMNS).where(UserProfile.user_id == current_user.id)
+    )).mappings().first()
+    if not row:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return db_profile
+    return FastJSONResponse(dict(row), headers=etag_headers(etag))
+
+async def _upsert_onboarding(db: AsyncSession, user_id: int, values: dict) -> Onboarding:
+    """
+    사용자의 온보딩 행을 INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING
+    한 문장으로 저장하고 저장된 행을 반환합니다. values에 없는 컬럼은 유지됩니다.
+    """
+    stmt = dialect_insert(db, Onboarding).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Onboarding.user_id],
+        set_={key: stmt.excluded[key] for key in values}
+    ).returning(Onboarding)
+    onboarding = await db.scalar(stmt, execution_options={"populate_existing": True})
+    await bump_version(db, user_id, ONBOARDING)
+    await db.commit()
+    return onboarding
+
+async def _update_onboarding(db: AsyncSession, user_id: int, values: dict) -> Onboarding:
+    """1단계가 저장된 온보딩 행만 UPDATE ... RETURNING 한 문장으로 수정"""
+    onboarding = await db.scalar(
+        update(Onboarding)
+        .where(Onboarding.user_id == user_id)
+        .values(**values)
+        .returning(Onboarding),
+        execution_options={"populate_existing": True}
+    )
+    if not onboarding:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Step 1 must be completed first"
+        )
+    await bump_version(db, user_id, ONBOARDING)
+    await db.commit()
+    return onboarding
 
 @router.post("/step1", response_model=OnboardingResponse)
 async def create_onboarding_step1(
     data: OnboardingStep1,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    """온보딩 1단계 데이터 저장"""
-    # 기존 온보딩 데이터가 있는지 확인
-    onboarding = db.query(Onboarding).filter(Onboarding.user_id == current_user.id).first()
-    
-    if onboarding:
-        # 기존 데이터 업데이트
-        onboarding.breakup_date = data.breakup_date
-        onboarding.relationship_years = data.relationship_years
-        onboarding.relationship_months = data.relationship_months
-        onboarding.my_tendency = data.my_tendency
-        onboarding.partner_tendency = data.partner_tendency
-    else:
-        # 새 온보딩 데이터 생성
-        onboarding = Onboarding(
-            user_id=current_user.id,
-            breakup_date=data.breakup_date,
-            relationship_years=data.relationship_years,
-            relationship_months=data.relationship_months,
-            my_tendency=data.my_tendency,
-            partner_tendency=data.partner_tendency
-        )
-        db.add(onboarding)
-    
-    db.commit()
-    db.refresh(onboarding)
-    return onboarding
+    """온보딩 1단계 데이터 저장 (이미 있으면 1단계 항목만 갱신)"""
+    return await _upsert_onboarding(db, current_user.id, data.model_dump())
 
 @router.post("/step2", response_model=OnboardingResponse)
 async def create_onboarding_step2(
     data: OnboardingStep2,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    """온보딩 2단계 데이터 저장"""
-    # 온보딩 1단계가 완료되었는지 확인
-    onboarding = db.query(Onboarding).filter(Onboarding.user_id == current_user.id).first()
-    if not onboarding:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Step 1 must be completed first"
-        )
-    
-    # 2단계 데이터 업데이트
-    onboarding.breakup_reason = data.breakup_reason
-    
-    db.commit()
-    db.refresh(onboarding)
-    return onboarding
+    """온보딩 2단계 데이터 저장 (1단계가 먼저 완료되어야 함)"""
+    return await _update_onboarding(db, current_user.id, data.model_dump())
 
 @router.post("/step3", response_model=OnboardingResponse)
 async def create_onboarding_step3(
     data: OnboardingStep3,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    """온보딩 3단계 데이터 저장"""
-    # 온보딩 1단계가 완료되었는지 확인
-    onboarding = db.query(Onboarding).filter(Onboarding.user_id == current_user.id).first()
-    if not onboarding:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Step 1 must be completed first"
-        )
-    
-    # 3단계 데이터 업데이트
-    onboarding.strategy_type = data.strategy_type
-    
-    db.commit()
-    db.refresh(onboarding)
-    return onboarding
+    """온보딩 3단계 데이터 저장 (1단계가 먼저 완료되어야 함)"""
+    return await _update_onboarding(db, current_user.id, data.model_dump())
+
+@router.post("/complete", response_model=OnboardingResponse)
+async def complete_onboarding(
+    data: OnboardingCreate,
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db)
+):
+    """온보딩 1~3단계 데이터를 한 번에 저장"""
+    return await _upsert_onboarding(db, current_user.id, data.model_dump())
 
 @router.get("/", response_model=OnboardingResponse)
 async def get_onboarding(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    """사용자의 온보딩 데이터 조회"""
-    onboarding = db.query(Onboarding).filter(Onboarding.user_id == current_user.id).first()
-    if not onboarding:
+    """
+    사용자의 온보딩 데이터 조회 (ORM 객체 없이 컬럼 행을 바로 직렬화).
+    If-None-Match가 현재 버전과 같으면 온보딩을 읽지 않고 304를 반환합니다.
+    """
+    etag = make_etag(current_user.id, str(await resource_version(db, current_user.id, ONBOARDING)))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    row = (await db.execute(
+        select(*ONBOARDING_COLUMNS).where(Onboarding.user_id == current_user.id)
+    )).mappings().first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Onboarding data not found"
         )
-    return onboarding 
\ No newline at end of file
+    return FastJSONResponse(dict(row), headers=etag_headers(etag)) 
\ No newline at end of file
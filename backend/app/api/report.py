@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.deps import get_current_user, get_db
+from ..models.user import User
+from ..schemas.report import ReportResponse
+from ..services.report import get_report
+
+router = APIRouter()
+
+@router.get("/", response_model=ReportResponse)
+async def read_report(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    리포트 화면의 성공 확률, 지난주 대비 변화, 말투 분포, 반응 시뮬레이션을 반환합니다.
+    메시지 저장/미션 완료 시 증분으로 갱신되는 통계 행만 읽으므로 기록 양과 관계없이 일정한 비용입니다.
+    """
+    return await get_report(db, current_user.id)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.deps import get_current_user, get_db
+from ..models.user import User
+from ..schemas.timing import WeeklyTimingResponse
+from ..services.timing import get_weekly_timing
+
+router = APIRouter()
+
+@router.get("/weekly", response_model=WeeklyTimingResponse)
+async def read_weekly_timing(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    요일/시간대별 연락 적합도와 요일별 상태(good/normal/avoid), 추천 연락 구간을 반환합니다.
+    사용자가 기록한 실제 반응의 히스토그램을 전체 사용자 사전 분포 쪽으로 평활해 계산하고,
+    근거(source)와 칸별 근거 건수를 함께 반환합니다. 기록된 반응이 없으면 추천하지 않습니다.
+    """
+    return await get_weekly_timing(db, current_user.id)
@@ -1,24 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.deps import get_current_active_user, get_db
+from ..core.etag import USER, bump_version, etag_headers, etag_matches, make_etag, not_modified, resource_version
 from ..models.user import User
 from ..schemas.user import UserResponse, UserCreate
-from ..core.security import get_password_hash
+from ..core.security import hash_password
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(current_user: User = Depends(get_current_active_user)):
-    """현재 로그인한 사용자의 프로필 정보를 반환합니다."""
-    return current_user
+async def read_user_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    현재 로그인한 사용자의 프로필 정보를 반환합니다.
+    ETag는 다른 리소스처럼 resource_versions의 버전으로 만들어 304는 버전 조회 한 번으로 반환하고,
+    본문은 다른 워커의 변경이 늦게 반영될 수 있는 인증 캐시 대신 DB에서 읽습니다.
+    """
+    # 버전을 먼저 읽어 두면 사이에 쓰기가 끼어도 ETag가 본문보다 새것이 되지 않음
+    etag = make_etag(current_user.id, str(await resource_version(db, current_user.id, USER)))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    user = await db.scalar(select(User).where(User.id == current_user.id))
+    response.headers.update(etag_headers(etag))
+    return user
 
 @router.put("/me", response_model=UserResponse)
-def update_user_me(user: UserCreate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def update_user_me(user: UserCreate, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     """현재 로그인한 사용자의 프로필 정보를 수정합니다."""
+    # 캐시에서 온 detached 사용자도 SELECT 없이 세션에 붙여 UPDATE
+    db.add(current_user)
     current_user.email = user.email
     current_user.username = user.username
     current_user.full_name = user.full_name
-    current_user.hashed_password = get_password_hash(user.password)
-    db.commit()
-    db.refresh(current_user)
+    current_user.hashed_password = await hash_password(user.password)
+    await bump_version(db, current_user.id, USER)
+    await db.commit()
     return current_user 
\ No newline at end of file
@@ -1,12 +1,13 @@
 from typing import Any, Dict, Optional
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, field_validator, ValidationInfo
+import os
 import secrets
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
     
     POSTGRES_SERVER: str = "localhost"
@@ -15,10 +16,98 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "re_connect"
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
 
+    # 비밀번호 해싱 (bcrypt 비용 인자와 전용 프로세스 풀 크기)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # 0이면 프로세스 풀 없이 스레드풀에서 실행
+    PASSWORD_HASH_MAX_PENDING: int = 32  # 대기+실행 중 작업 상한, 초과 시 503
+    PASSWORD_HASH_RETRY_AFTER: int = 1  # 503 응답의 Retry-After (초)
+
+    # 인증 사용자 캐시 (검증된 토큰 -> 사용자 스냅샷). 워커 간 무효화는 없으므로 TTL이 곧
+    # 다른 워커에서의 사용자 변경/비활성화가 반영되기까지의 최대 지연 (0이면 캐시 사용 안 함)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60  # 초
+
+    # 내부 지표(/api/metrics) 조회 토큰. 수집기는 X-Metrics-Token 헤더로 보내야 하며,
+    # None이면 지표 엔드포인트를 열지 않음(404)
+    METRICS_TOKEN: Optional[str] = None
+
+    # 메시지 템플릿 파일 (None이면 app/data/message_templates.json)과 변경 확인 주기(초, 음수면 리로드 안 함)
+    MESSAGE_TEMPLATES_PATH: Optional[str] = None
+    MESSAGE_TEMPLATES_RELOAD_INTERVAL: float = 5.0
+
+    # 긍정적 반응 예측 모델 파일 (None이면 app/data/reaction_model.json)과 변경 확인 주기(초)
+    REACTION_MODEL_PATH: Optional[str] = None
+    REACTION_MODEL_RELOAD_INTERVAL: float = 5.0
+
+    # 경고 문구 판정용 위험 문구 사전 (None이면 app/data/risk_phrases.json)과 변경 확인 주기(초)
+    RISK_PHRASES_PATH: Optional[str] = None
+    RISK_PHRASES_RELOAD_INTERVAL: float = 5.0
+
+    # 메시지 생성 백엔드: template(내장 템플릿) / http(외부 모델 서버, 실패 시 템플릿으로 대체)
+    GENERATION_BACKEND: str = "template"
+    MODEL_SERVER_URL: Optional[str] = None
+    MODEL_VERSION: Optional[str] = None  # 모델 버전 고정 (None이면 기동 시 모델 서버의 /version으로 확인, 캐시 키에 포함)
+    MODEL_TIMEOUT: float = 2.0  # 헤지 요청을 포함한 전체 대기 시간 (초)
+    MODEL_MAX_CONCURRENCY: int = 8  # 워커 프로세스당 동시 모델 호출 수
+    MODEL_HEDGE_DELAY: Optional[float] = 0.5  # 이 시간 안에 응답이 없으면 두 번째 요청 (None이면 헤지 안 함)
+    MODEL_BREAKER_FAILURES: int = 5  # 연속 실패가 이만큼 쌓이면 회로 차단
+    MODEL_BREAKER_RESET: float = 30.0  # 차단 후 시험 호출까지 대기 (초)
+
+    # 생성 결과 캐시 (목적/말투/온보딩 지문 -> 후보 본문). 크기 0이면 사용 안 함
+    GENERATION_CACHE_SIZE: int = 10000
+    GENERATION_CACHE_TTL: int = 300  # 초
+    GENERATION_CACHE_MAX_BYTES: Optional[int] = 32 * 1024 * 1024
+
+    # 사용자별 추천 목표 캐시 (온보딩 저장 시 무효화)
+    RECOMMENDED_GOALS_CACHE_SIZE: int = 10000
+    RECOMMENDED_GOALS_CACHE_TTL: int = 3600  # 초
+
+    # 생성 메시지 write-behind 저장. 켜면 응답을 먼저 보내고 메시지는 모아서 저장하므로
+    # 생성 응답의 메시지 id가 null이 됨
+    MESSAGE_WRITE_BEHIND: bool = False
+    MESSAGE_FLUSH_BATCH_SIZE: int = 500  # 이만큼 쌓이면 바로 저장
+    MESSAGE_FLUSH_INTERVAL: float = 0.5  # 초
+    MESSAGE_BUFFER_MAX_PENDING: int = 10000  # 저장 대기 행 상한 (넘으면 대기 후 503)
+    MESSAGE_BUFFER_PUT_TIMEOUT: float = 1.0  # 자리가 날 때까지 기다리는 시간 (초)
+    MESSAGE_BUFFER_RETRY_AFTER: int = 1  # 503 응답의 Retry-After (초)
+    # DB 장애 시 메시지를 임시 저장할 디렉터리의 절대 경로 (None이면 메모리에만 보관).
+    # 파일은 호스트 이름/pid/무작위 값으로 구분하며, 다른 호스트의 파일은 생존 여부를 알 수 없어
+    # 같은 호스트 이름으로 다시 기동한 워커만 가져가므로 컨테이너에서는 호스트별 볼륨을 사용
+    MESSAGE_SPILL_DIR: Optional[str] = None
+
+    # 연락 시간 추천. 요일/시간 버킷을 나누는 시간대 (바꾸면 리포트 통계 재계산 필요)와
+    # 전체 사용자 사전 분포 파일 (None이면 app/data/timing_prior.json, python -m app.services.timing으로 갱신)
+    TIMING_TIMEZONE: str = "Asia/Seoul"
+    TIMING_PRIOR_PATH: Optional[str] = None
+    TIMING_PRIOR_RELOAD_INTERVAL: float = 5.0
+    TIMING_PRIOR_STRENGTH: float = 5.0  # 사전 분포의 가상 반응 수 (기록이 적은 시간대일수록 전체 분포를 따름)
+    TIMING_STATUS_MARGIN: float = 3.0  # 평균보다 이만큼(반응 점수) 높으면 good, 낮으면 avoid
+    TIMING_WINDOW_HOURS: int = 2  # 추천 시간대 길이
+
+    # 시작 시 DB 스키마 리비전 확인: strict(불일치 시 기동 중단) / warn / off.
+    # 리비전이 기록되지 않은 DB(create_all로 만든 기존 DB)는 strict여도 경고만 남김 (alembic stamp head로 기록)
+    SCHEMA_CHECK: str = "strict"
+
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DATABASE_URL: Optional[str] = None
 
+    # 커넥션 풀 (워커 프로세스당). 스레드풀 크기는 풀 용량(pool_size + max_overflow)에 맞춰
+    # 동시에 DB를 쓰는 작업이 커넥션보다 많아지지 않도록 함
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    THREADPOOL_SIZE: Optional[int] = None  # None이면 DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+    @field_validator("MESSAGE_SPILL_DIR")
+    def require_absolute_spill_dir(cls, v: Optional[str]) -> Optional[str]:
+        # 상대 경로는 워커의 작업 디렉터리에 따라 달라져 다시 기동한 워커가 파일을 찾지 못함
+        if v is not None and not os.path.isabs(v):
+            raise ValueError(f"MESSAGE_SPILL_DIR는 절대 경로여야 합니다: {v}")
+        return v
+
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     def assemble_db_connection(cls, v: Optional[str], info: ValidationInfo) -> Any:
         if isinstance(v, str):
@@ -28,9 +117,18 @@ class Settings(BaseSettings):
             username=info.data.get("POSTGRES_USER"),
             password=info.data.get("POSTGRES_PASSWORD"),
             host=info.data.get("POSTGRES_SERVER"),
-            path=f"/{info.data.get('POSTGRES_DB') or ''}",
+            path=info.data.get('POSTGRES_DB') or '',
         )
 
+    @property
+    def database_url(self) -> str:
+        """DATABASE_URL이 있으면 우선 사용하고, 없으면 POSTGRES_* 값으로 조합한 URI 사용"""
+        return self.DATABASE_URL or str(self.SQLALCHEMY_DATABASE_URI)
+
+    @property
+    def threadpool_size(self) -> int:
+        return self.THREADPOOL_SIZE or self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW
+
     model_config = {
         "case_sensitive": True,
         "env_file": ".env",
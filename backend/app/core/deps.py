@@ -1,45 +1,92 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from ..db.database import SessionLocal
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from ..db.database import get_db
 from ..models.user import User
 from ..schemas.user import TokenData
-from .security import SECRET_KEY, ALGORITHM
+from .cache import TTLCache
+from .config import settings
+from .security import decode_access_token
+from typing import Optional
+import secrets
+import time
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-def get_db() -> Generator:
-    """데이터베이스 세션 의존성"""
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
+# 검증된 토큰 -> 사용자 컬럼 스냅샷 (사용자 id를 태그로 무효화).
+# 아래 훅은 이 프로세스에서 커밋한 변경만 무효화합니다. 다른 워커에서 바꾼 사용자 정보나
+# is_active(비활성화 포함)는 이 워커의 항목이 만료될 때까지, 최대 PRINCIPAL_CACHE_TTL초 늦게 반영됩니다.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+def _snapshot(user: User) -> dict:
+    return {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+
+def _from_snapshot(snapshot: dict) -> User:
+    # 요청마다 새 인스턴스를 만들어 핸들러의 수정이 캐시로 새지 않게 함.
+    # detached 상태이므로 db.add() 후 수정하면 SELECT 없이 UPDATE 됨
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+def invalidate_principal(user_id: int) -> None:
+    """사용자의 캐시된 인증 정보 제거"""
+    principal_cache.invalidate_tag(user_id)
+
+@event.listens_for(User, "after_update")
+def _mark_principal_dirty(mapper, connection, target: User) -> None:
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("dirty_principals", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dirty_principals(session: Session) -> None:
+    # 사용자 정보나 is_active가 바뀐 트랜잭션이 커밋되면 이 프로세스의 캐시 무효화
+    for user_id in session.info.pop("dirty_principals", ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_principals(session: Session) -> None:
+    session.info.pop("dirty_principals", None)
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
-    """현재 인증된 사용자 가져오기"""
+    """
+    현재 인증된 사용자 가져오기. 캐시 적중 시 DB를 읽지 않으므로 다른 워커에서의 변경은
+    최대 PRINCIPAL_CACHE_TTL초 뒤에 반영됩니다.
+    """
+    snapshot = principal_cache.get(token)
+    if snapshot is not None:
+        return _from_snapshot(snapshot)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
+    email: str = payload.get("sub")
+    if email is None:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == token_data.email).first()
+    token_data = TokenData(email=email)
+
+    user = await db.scalar(select(User).where(User.email == token_data.email))
     if user is None:
         raise credentials_exception
+
+    # 토큰 만료 시각을 넘겨 캐시하지 않음
+    ttl = None
+    if payload.get("exp") is not None:
+        ttl = payload["exp"] - time.time()
+    principal_cache.set(token, _snapshot(user), ttl=ttl, tag=user.id)
     return user
 
 async def get_current_active_user(
@@ -48,4 +95,11 @@ async def get_current_active_user(
     """현재 활성화된 사용자 가져오기"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
+    return current_user
+
+async def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """내부 지표 수집기 확인 (METRICS_TOKEN이 없으면 엔드포인트를 숨기고, 토큰이 다르면 403)"""
+    if settings.METRICS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_metrics_token is None or not secrets.compare_digest(x_metrics_token, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token")
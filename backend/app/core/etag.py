@@ -0,0 +1,66 @@
+import hashlib
+from fastapi import Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.database import dialect_insert
+from ..models.resource_version import ResourceVersion
+
+# 버전을 관리하는 리소스 이름 (추천 목표는 온보딩 데이터로만 정해지므로 온보딩 버전을 사용)
+MISSIONS = "missions"
+ONBOARDING = "onboarding"
+PROFILE = "profile"
+USER = "user"
+
+# 매번 서버에 재검증하도록 하되 본문은 클라이언트가 보관
+CACHE_CONTROL = "private, no-cache"
+
+async def resource_version(db: AsyncSession, user_id: int, resource: str) -> int:
+    """리소스의 현재 버전 (기본 키 조회 한 번, 쓰기가 없었으면 0)"""
+    version = await db.scalar(
+        select(ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource == resource
+        )
+    )
+    return version or 0
+
+async def bump_version(db: AsyncSession, user_id: int, resource: str) -> None:
+    """
+    리소스 버전을 INSERT ... ON CONFLICT DO UPDATE 한 문장으로 1 올립니다.
+    쓰기와 같은 트랜잭션에서 실행하고 커밋은 호출한 쪽에서 합니다.
+    """
+    stmt = dialect_insert(db, ResourceVersion).values(user_id=user_id, resource=resource, version=1)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ResourceVersion.user_id, ResourceVersion.resource],
+        set_={"version": ResourceVersion.version + 1}
+    ))
+
+def make_etag(user_id: int, tag: str, variant: str = "") -> str:
+    """
+    약한 ETag 생성. 계정을 바꾼 클라이언트가 다른 사용자의 ETag로 304를 받지 않도록 사용자 id를,
+    쿼리 파라미터에 따라 본문이 달라지는 목록은 variant(쿼리 문자열)의 해시를 포함합니다.
+    """
+    if variant:
+        tag = f"{tag}.{hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()}"
+    return f'W/"{user_id}.{tag}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match가 현재 ETag와 일치하는지 (약한 비교, 여러 값과 * 지원)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == current for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    """본문 없는 304 응답"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+def etag_headers(etag: str) -> dict:
+    """200 응답에 붙일 ETag/Cache-Control 헤더"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, status
+import base64
+import json
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """(created_at, id) 키셋 위치를 불투명한 커서 문자열로 인코딩"""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """커서 문자열을 (created_at, id)로 디코딩 (형식이 잘못되면 400)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def split_page(rows: list, limit: int, key: Any) -> Tuple[list, Optional[str]]:
+    """limit + 1개 조회한 결과를 페이지와 다음 커서로 나눔"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    created_at, id = key(page[-1])
+    return page, encode_cursor(created_at, id)
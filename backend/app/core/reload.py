@@ -0,0 +1,84 @@
+from pathlib import Path
+from threading import Lock
+from typing import Generic, Optional, Tuple, TypeVar, Union
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class HotReloadable(Generic[T]):
+    """
+    데이터 파일을 한 번 파싱해 불변 스냅샷으로 들고 있다가 파일이 바뀌면 교체합니다.
+    변경 확인은 reload_interval초마다 한 번 stat으로만 하므로 요청 경로 비용이 거의 없고,
+    잘못된 파일로 바뀌면 로그만 남기고 이전 스냅샷을 계속 사용합니다.
+    하위 클래스는 parse()만 구현합니다.
+    """
+
+    name = "data file"
+    errors: Tuple[type, ...] = (ValueError,)
+
+    def __init__(self, path: Union[str, Path], reload_interval: float = 5.0):
+        self.path = Path(path)
+        self.reload_interval = reload_interval  # 음수면 파일 변경을 확인하지 않음
+        self._lock = Lock()
+        self._current: Optional[T] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+
+    def parse(self, raw: bytes) -> T:
+        raise NotImplementedError
+
+    def current(self) -> T:
+        """현재 스냅샷 (필요하면 리로드)"""
+        if self._current is None or (self.reload_interval >= 0 and time.monotonic() >= self._next_check):
+            self._maybe_reload()
+        return self._current
+
+    def reload(self) -> T:
+        """파일 변경 여부와 관계없이 즉시 다시 로드"""
+        with self._lock:
+            self._stamp = None
+        self._maybe_reload()
+        return self._current
+
+    def swap(self, path: Union[str, Path]) -> T:
+        """
+        다른 파일로 교체. 새 파일을 먼저 파싱해 검증하고 성공했을 때만 바꾸므로
+        실패하면 예외가 나고 기존 스냅샷이 그대로 유지됩니다.
+        """
+        path = Path(path)
+        stamp = self._stat(path)
+        snapshot = self.parse(path.read_bytes())
+        with self._lock:
+            self.path, self._current, self._stamp = path, snapshot, stamp
+            self._next_check = time.monotonic() + self.reload_interval
+        logger.info("%s 교체: %s", self.name, path)
+        return snapshot
+
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _maybe_reload(self) -> None:
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            stamp = None
+            try:
+                stamp = self._stat(self.path)
+                if stamp == self._stamp and self._current is not None:
+                    return
+                snapshot = self.parse(self.path.read_bytes())
+            except (OSError, *self.errors):
+                if self._current is None:
+                    raise
+                # 같은 잘못된 파일을 주기마다 다시 파싱하지 않도록 기록
+                self._stamp = stamp
+                logger.exception("%s 리로드 실패, 이전 버전 유지: %s", self.name, self.path)
+                return
+            logger.info("%s 로드: %s", self.name, self.path)
+            self._current = snapshot
+            self._stamp = stamp
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Iterable, List, Sequence
+from fastapi.responses import JSONResponse
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson으로 직렬화하는 기본 응답 클래스. datetime/date/Enum을 직접 직렬화하므로
+    ORM을 거치지 않은 행 dict도 그대로 응답할 수 있습니다.
+    UTC 시각은 pydantic과 같이 "Z"로 표기합니다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY)
+
+def _default(value: Any) -> Any:
+    # 표준 json 대체 경로: datetime/date는 ISO 8601, Enum은 값
+    if hasattr(value, "isoformat"):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def row_dicts(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Core 조회 결과 튜플을 컬럼명 dict로 변환 (ORM 객체와 스키마 검증 없이 응답할 때 사용)"""
+    return [dict(zip(keys, row)) for row in rows]
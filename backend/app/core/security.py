@@ -1,30 +1,96 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from dotenv import load_dotenv
-import os
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+import asyncio
+import multiprocessing
 
-load_dotenv()
+# 설정 가져오기 (.env는 Settings가 읽음)
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# 환경 변수에서 설정 가져오기
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# passlib/jose는 import 비용이 커서 처음 사용할 때 불러옴 (콜드 스타트 단축)
+_pwd_context = None
 
-# 비밀번호 해싱을 위한 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def get_pwd_context():
+    """비밀번호 해싱 컨텍스트 (최초 호출 시 생성)"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        # 비용 인자가 다른 해시는 needs_update 대상이 되어 다음 로그인 때 재해싱됨
+        _pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        )
+    return _pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """비밀번호 검증"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """비밀번호 해싱"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """비밀번호 검증 후, 비용 인자가 바뀐 해시라면 새 해시를 함께 반환"""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+# bcrypt 전용 프로세스 풀 (GIL과 공용 anyio 스레드풀을 점유하지 않도록 분리)
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0
+
+def start_hash_pool() -> None:
+    """해싱 프로세스 풀 시작 (워커 0개면 스레드풀 사용)"""
+    global _hash_executor
+    if _hash_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+def shutdown_hash_pool() -> None:
+    """해싱 프로세스 풀 종료"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+async def _run_hash_job(func: Callable, *args):
+    """대기열 상한을 넘으면 503으로 거절하고, 아니면 해싱 풀에서 실행"""
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry later",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+        )
+    _hash_pending += 1
+    try:
+        start_hash_pool()
+        if _hash_executor is None:
+            return await run_in_threadpool(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password(password: str) -> str:
+    """해싱 풀에서 비밀번호 해싱"""
+    return await _run_hash_job(get_password_hash, password)
+
+async def check_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """해싱 풀에서 비밀번호 검증 (검증 결과, 재해싱된 해시 또는 None)"""
+    return await _run_hash_job(verify_and_update, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """JWT 액세스 토큰 생성"""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -36,7 +102,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
-    """JWT 액세스 토큰 디코딩"""
+    """JWT 액세스 토큰 디코딩 (유효하지 않으면 None)"""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
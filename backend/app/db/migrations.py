@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import Set
+import logging
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# backend/alembic
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+class SchemaRevisionMismatch(RuntimeError):
+    """DB 스키마 리비전이 코드의 Alembic head와 다를 때 발생"""
+
+def expected_heads() -> Set[str]:
+    """코드에 포함된 마이그레이션의 head 리비전"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(ALEMBIC_DIR)).get_heads())
+
+async def current_revisions(engine: AsyncEngine) -> Set[str]:
+    """DB의 alembic_version 테이블에 기록된 리비전 (테이블이 없으면 빈 집합)"""
+    from alembic.migration import MigrationContext
+
+    def _read(sync_conn) -> Set[str]:
+        return set(MigrationContext.configure(sync_conn).get_current_heads())
+
+    async with engine.connect() as conn:
+        return await conn.run_sync(_read)
+
+async def check_schema_revision(engine: AsyncEngine, mode: str = "strict") -> None:
+    """
+    시작 시 스키마 리비전 확인 (쿼리 한 번).
+    스키마 생성/변경은 `alembic upgrade head`로만 수행합니다.
+    기록된 리비전이 없으면(예전에 create_all로 만든 DB) strict여도 경고만 남기고 기동합니다.
+    이런 DB는 스키마가 head와 같은지 확인한 뒤 `alembic stamp head`로 리비전을 기록하면 됩니다.
+    """
+    if mode == "off":
+        return
+    expected = expected_heads()
+    current = await current_revisions(engine)
+    if current == expected:
+        return
+    if not current:
+        logger.warning(
+            "Database has no Alembic revision (created without migrations?); "
+            "if its schema matches head %s run `alembic stamp head`, otherwise `alembic upgrade head`",
+            sorted(expected),
+        )
+        return
+    message = (
+        f"Database schema revision {sorted(current) or 'none'} does not match "
+        f"migration head {sorted(expected)}; run `alembic upgrade head`"
+    )
+    if mode == "strict":
+        raise SchemaRevisionMismatch(message)
+    logger.warning(message)
@@ -1,6 +1,2 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
-
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) 
\ No newline at end of file
+# 엔진과 세션 팩토리는 app.db.database 한 곳에서만 생성
+from app.db.database import engine, AsyncSessionLocal as SessionLocal
\ No newline at end of file
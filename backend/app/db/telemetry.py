@@ -0,0 +1,96 @@
+from collections import deque
+from threading import Lock
+from typing import Any, Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import time
+
+class PoolTelemetry:
+    """커넥션 풀 체크아웃 지연, 대기 시간, 포화도 집계"""
+
+    def __init__(self, samples: int = 1024):
+        self._lock = Lock()
+        self._latencies = deque(maxlen=samples)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_checkout_time = 0.0
+        self.total_wait_time = 0.0
+        self.max_checkout_time = 0.0
+        self.peak_in_use = 0
+        self.pool = None
+
+    def record_checkout(self, latency: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_checkout_time += latency
+            self.max_checkout_time = max(self.max_checkout_time, latency)
+            self._latencies.append(latency)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_wait(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.total_wait_time += wait
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            checkouts = self.checkouts
+            result = {
+                "checkouts": checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_ms_avg": self.total_checkout_time / checkouts * 1000 if checkouts else 0.0,
+                "checkout_ms_p99": latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else 0.0,
+                "checkout_ms_max": self.max_checkout_time * 1000,
+                "wait_ms_total": self.total_wait_time * 1000,
+                "peak_in_use": self.peak_in_use,
+            }
+        pool = self.pool
+        if isinstance(pool, InstrumentedAsyncQueuePool):
+            capacity = pool.capacity()
+            result.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "saturation": pool.checkedout() / capacity if capacity else 0.0,
+                "peak_saturation": self.peak_in_use / capacity if capacity else 0.0,
+            })
+        return result
+
+pool_telemetry = PoolTelemetry()
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """체크아웃마다 pool_telemetry에 지연/대기를 기록하는 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # dispose() 시 풀이 재생성되므로 항상 최신 풀을 가리키게 함
+        pool_telemetry.pool = self
+
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+    def connect(self):
+        # pre_ping을 포함한 전체 체크아웃 지연
+        start = time.perf_counter()
+        connection = super().connect()
+        pool_telemetry.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def _do_get(self):
+        # 유휴 커넥션도 없고 오버플로도 소진된 상태에서 들어온 요청은 대기로 집계
+        exhausted = self.checkedin() == 0 and self._max_overflow > -1 and self.checkedout() >= self.capacity()
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            pool_telemetry.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if exhausted:
+            pool_telemetry.record_wait(time.perf_counter() - start)
+        return record
@@ -1,16 +1,51 @@
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api import auth, users, missions, onboarding
+from .api import auth, bootstrap, users, missions, onboarding, metrics, report, timing
 from .api.endpoints import messages
-from .db.database import engine, Base
+from .db.database import engine
+from .db.migrations import check_schema_revision
+from .core import security
+from .core.config import settings
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.responses import FastJSONResponse
+from .services.generation import generation_backend
+from .services.risk import risk_scanner
+from .services.scoring import reaction_scorer
+from .services.templates import template_registry
+from .services.timing import timing_prior
+from .services.write_behind import message_write_buffer
 
-# 데이터베이스 테이블 생성
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스레드풀 동시 실행 수를 커넥션 풀 용량에 맞춤
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    # 스키마는 Alembic으로만 관리하고, 여기서는 리비전 일치 여부만 확인
+    await check_schema_revision(engine, settings.SCHEMA_CHECK)
+    # 템플릿/모델/사전 파일 오류는 첫 요청이 아니라 기동 시점에 드러나도록 미리 로드
+    template_registry.current()
+    reaction_scorer.current()
+    risk_scanner.current()
+    timing_prior.current()
+    security.start_hash_pool()
+    await generation_backend.start()
+    if message_write_buffer is not None:
+        message_write_buffer.start()
+    yield
+    if message_write_buffer is not None:
+        # 남은 메시지를 저장한 뒤 엔진 정리
+        await message_write_buffer.close()
+    security.shutdown_hash_pool()
+    await generation_backend.close()
+    await engine.dispose()
 
 app = FastAPI(
     title="Re_Connect API",
     description="Re_Connect 백엔드 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS 설정
@@ -20,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # API 라우터 등록
@@ -28,6 +64,10 @@ app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(missions.router, prefix="/api/missions", tags=["missions"])
 app.include_router(onboarding.router, prefix="/api/onboarding", tags=["onboarding"])
 app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
+app.include_router(bootstrap.router, prefix="/api/bootstrap", tags=["bootstrap"])
+app.include_router(report.router, prefix="/api/report", tags=["report"])
+app.include_router(timing.router, prefix="/api/timing", tags=["timing"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
 
 @app.get("/")
 async def root():
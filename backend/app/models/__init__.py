@@ -1,6 +1,11 @@
 from ..db.database import Base
 from .user import User
+from .user_profile import UserProfile
+from .onboarding import Onboarding
 from .mission import Mission
+from .message import Message
+from .resource_version import ResourceVersion
+from .report_stat import UserReportStat
 
 # 모든 모델을 여기서 export
-__all__ = ["Base", "User", "Mission"] 
\ No newline at end of file
+__all__ = ["Base", "User", "UserProfile", "Onboarding", "Mission", "Message", "ResourceVersion", "UserReportStat"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -7,16 +7,21 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     purpose = Column(String(300), nullable=False)
     tone_style = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
     positive_reaction = Column(Float, nullable=False)
     warning = Column(String(200), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    reaction = Column(String(16), nullable=True)  # 사용자가 기록한 상대의 실제 반응 (positive/neutral/negative)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="messages")
+    user = relationship("User", back_populates="messages", lazy="raise_on_sql")
+
+    __table_args__ = (
+        Index("ix_messages_user_id_created_at", user_id, created_at.desc()),
+    )
 
     class Config:
         orm_mode = True 
\ No newline at end of file
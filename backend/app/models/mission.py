@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.database import Base
@@ -15,4 +15,9 @@ class Mission(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # 사용자 관계 추가
-    user = relationship("User", back_populates="missions") 
\ No newline at end of file
+    user = relationship("User", back_populates="missions", lazy="raise_on_sql")
+
+    __table_args__ = (
+        Index("ix_missions_user_id_id", user_id, id),
+        Index("ix_missions_user_id_created_at_id", user_id, created_at, id),
+    ) 
\ No newline at end of file
@@ -39,4 +39,4 @@ class Onboarding(Base):
     strategy_type = Column(Enum(StrategyType), nullable=True)
     
     # 관계 설정
-    user = relationship("User", back_populates="onboarding") 
\ No newline at end of file
+    user = relationship("User", back_populates="onboarding", lazy="raise_on_sql") 
\ No newline at end of file
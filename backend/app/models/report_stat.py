@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from ..db.database import Base
+
+class UserReportStat(Base):
+    """
+    리포트용 사용자별 누적 통계. (metric, bucket)마다 건수와 합계를 들고 있으며
+    메시지 저장/미션 완료 시 같은 트랜잭션에서 증분으로 갱신합니다 (app.services.report).
+    """
+    __tablename__ = "user_report_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    metric = Column(String(16), primary_key=True)
+    bucket = Column(String(64), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
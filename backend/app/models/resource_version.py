@@ -0,0 +1,13 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from ..db.database import Base
+
+class ResourceVersion(Base):
+    """
+    사용자별 리소스(미션 목록, 온보딩, 프로필 등)의 버전 카운터.
+    쓰기 트랜잭션에서 1씩 올리고, 조회는 이 값으로 ETag를 만들어 바뀌지 않았으면 304로 응답합니다.
+    """
+    __tablename__ = "resource_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    resource = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
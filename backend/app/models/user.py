@@ -17,10 +17,10 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 관계 설정
-    profile = relationship("UserProfile", back_populates="user", uselist=False)
-    onboarding = relationship("Onboarding", back_populates="user", uselist=False)
-    missions = relationship("Mission", back_populates="user")
-    messages = relationship("Message", back_populates="user")
+    profile = relationship("UserProfile", back_populates="user", uselist=False, lazy="raise_on_sql")
+    onboarding = relationship("Onboarding", back_populates="user", uselist=False, lazy="raise_on_sql")
+    missions = relationship("Mission", back_populates="user", lazy="raise_on_sql")
+    messages = relationship("Message", back_populates="user", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, username={self.username}, full_name={self.full_name})>" 
\ No newline at end of file
@@ -14,4 +14,4 @@ class UserProfile(Base):
     onboarding_completed = Column(Integer, default=0)  # 온보딩 진행 상태
 
     # 관계 설정
-    user = relationship("User", back_populates="profile") 
\ No newline at end of file
+    user = relationship("User", back_populates="profile", lazy="raise_on_sql") 
\ No newline at end of file
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from .message import RecommendedGoal
+from .mission import MissionResponse
+from .onboarding import OnboardingResponse, UserProfileResponse
+from .user import UserResponse
+
+class BootstrapResponse(BaseModel):
+    """앱 시작에 필요한 데이터 묶음 (fields로 고른 항목만 포함, 데이터가 없으면 null)"""
+    user: Optional[UserResponse] = None
+    profile: Optional[UserProfileResponse] = None
+    onboarding: Optional[OnboardingResponse] = None
+    missions: Optional[List[MissionResponse]] = None  # 완료되지 않은 미션
+    recommended_goals: Optional[List[RecommendedGoal]] = None
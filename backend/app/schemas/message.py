@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import List, Literal, Optional
+from datetime import datetime
 
 class RecommendedGoal(BaseModel):
     id: int
@@ -12,10 +13,60 @@ class RecommendedGoal(BaseModel):
 class MessagePurpose(BaseModel):
     purpose: str = Field(..., max_length=300)
     tone_style: str = Field(..., description="논리적, 감성적, 호기심 유발 중 하나")
+    n: int = Field(1, ge=1, le=10, description="목적마다 생성할 후보 수")
+    purposes: List[str] = Field(default_factory=list, max_length=4, description="함께 생성할 추가 목적")
+
+    @field_validator("purposes")
+    @classmethod
+    def check_purposes(cls, purposes: List[str]) -> List[str]:
+        if any(len(purpose) > 300 for purpose in purposes):
+            raise ValueError("purpose는 300자 이하여야 합니다")
+        return purposes
+
+    def all_purposes(self) -> List[str]:
+        """중복을 제거한 전체 목적 목록 (purpose가 첫 번째)"""
+        return list(dict.fromkeys([self.purpose, *self.purposes]))
+
+class GeneratedVariant(BaseModel):
+    id: Optional[int] = None  # write-behind 저장 모드에서는 아직 저장 전이라 null
+    purpose: str
+    message: str
+    positive_reaction: int = Field(..., ge=0, le=100)
+    warning: Optional[str] = None
 
 class GeneratedMessage(BaseModel):
     message: str
     positive_reaction: int = Field(..., ge=0, le=100, description="긍정적 반응 예측 퍼센트")
     warning: Optional[str] = None
+    variants: List[GeneratedVariant] = Field(default_factory=list, description="예측 반응 순으로 정렬된 전체 후보")
+
+    model_config = ConfigDict(from_attributes=True) 
 
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+class MessageResponse(BaseModel):
+    id: int
+    purpose: str
+    tone_style: str
+    content: str
+    positive_reaction: float
+    warning: Optional[str] = None
+    reaction: Optional[str] = None  # 기록된 실제 반응 (기록 전에는 null)
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class MessageReaction(BaseModel):
+    """보낸 메시지에 상대가 실제로 보인 반응 (연락 시간 추천의 근거)"""
+    reaction: Literal["positive", "neutral", "negative"]
+
+class RiskScanRequest(BaseModel):
+    text: str = Field(..., max_length=2000, description="검사할 메시지 초안")
+    purpose: Optional[str] = Field(None, max_length=300)
+
+class RiskMatchResponse(BaseModel):
+    category: str
+    phrase: str
+
+class RiskScanResponse(BaseModel):
+    warning: Optional[str] = None
+    category: Optional[str] = None
+    matches: List[RiskMatchResponse] = Field(default_factory=list)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 
 class MissionBase(BaseModel):
@@ -19,4 +19,35 @@ class MissionResponse(MissionBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) 
+
+class MissionBatchOperation(BaseModel):
+    op: Literal["create", "update", "complete", "delete"]
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    is_completed: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.title is None:
+            raise ValueError("create 작업에는 title이 필요합니다")
+        if self.op != "create" and self.id is None:
+            raise ValueError(f"{self.op} 작업에는 id가 필요합니다")
+        # NOT NULL 필드에 명시적인 null을 보내면 쓰기 전에 거절 (생략은 변경하지 않음)
+        nulls = [
+            name for name in ("title", "is_completed")
+            if name in self.model_fields_set and getattr(self, name) is None
+        ]
+        if self.op == "update" and nulls:
+            raise ValueError(f"update 작업의 {', '.join(nulls)}에는 null을 보낼 수 없습니다")
+        return self
+
+class MissionBatchRequest(BaseModel):
+    operations: List[MissionBatchOperation] = Field(..., min_length=1, max_length=500)
+
+class MissionBatchResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["ok", "not_found"]
+    mission: Optional[MissionResponse] = None
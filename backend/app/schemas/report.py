@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from .timing import TimingWindow
+
+class ToneStat(BaseModel):
+    tone_style: str
+    count: int
+    ratio: float  # 전체 메시지 중 비율
+    success_rate: Optional[float] = None  # 평균 예측 반응 (0~1)
+
+class ReactionSimulation(BaseModel):
+    """예측 반응 분포로 본 응답 유형별 비율 (0~1)"""
+    tone_style: Optional[str] = None  # 평균 예측 반응이 가장 높은 말투
+    positive: float
+    neutral: float
+    negative: float
+
+class ReportResponse(BaseModel):
+    message_count: int
+    success_rate: Optional[float] = None  # 전체 평균 예측 반응 (0~1)
+    rate_change: Optional[float] = None  # 지난주 대비 이번 주 평균 변화
+    tone_distribution: List[ToneStat]
+    reaction_histogram: List[int]  # 예측 반응 10점 단위 구간별 메시지 수
+    simulation: Optional[ReactionSimulation] = None
+    missions_completed: int
+    optimal_time: Optional[TimingWindow] = None  # 기록된 실제 반응 기반, 기록한 반응이 없으면 null
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+class TimingWindow(BaseModel):
+    """추천 연락 구간 (weekday: 월요일 0 ~ 일요일 6, 설정 시간대 기준)"""
+    weekday: int
+    start_hour: int
+    end_hour: int
+    score: float  # 평활한 평균 반응 점수 (긍정 100, 중립 50, 부정 0)
+
+class TimingDay(BaseModel):
+    weekday: int
+    status: Literal["good", "normal", "avoid"]
+    best: TimingWindow
+
+class WeeklyTimingResponse(BaseModel):
+    """
+    기록된 실제 반응으로 만든 요일/시간대별 연락 적합도.
+    source: observed(사용자 기록 있음), prior(전체 사용자 기록만), none(기록 없음, days는 빈 목록이고 best는 null)
+    """
+    timezone: str
+    source: Literal["observed", "prior", "none"]
+    prior_version: str
+    prior_outcome_count: int  # 사전 분포를 만든 전체 사용자의 기록된 반응 수
+    outcome_count: int
+    counts: List[List[int]]  # [요일][시] 사용자가 기록한 반응 수 (칸별 근거 건수)
+    scores: List[List[float]]  # [요일][시] 평활한 평균 반응 점수
+    days: List[TimingDay]
+    best: Optional[TimingWindow] = None  # 근거가 없으면 null
@@ -0,0 +1,518 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+import unicodedata
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.templates import template_registry
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class GenerationRequest:
+    purpose: str
+    tone_style: str
+    n: int
+    context: str = ""  # 온보딩 기반 맞춤 문장
+    features: Dict[str, Any] = field(default_factory=dict)  # 온보딩 특성 (모델 입력용)
+
+@dataclass
+class GeneratedText:
+    template_id: str  # 템플릿 id 또는 "model:<버전>"
+    fragments: List[str]
+    fallback: bool = False  # 주 백엔드 대신 대체 백엔드로 만든 결과 (캐시하지 않음)
+
+class GenerationBackend:
+    """메시지 본문 생성 백엔드 인터페이스"""
+
+    name = "backend"
+    # 외부 호출처럼 오래 걸릴 수 있으면 True (호출 전에 DB 커넥션을 반환)
+    remote = False
+    # 생성 결과가 온보딩 특성(features)에 따라 달라지면 True (캐시 키에 포함)
+    uses_features = False
+    # 결과를 캐시해 재사용할 만큼 생성이 비싸면 True. 템플릿처럼 매번 무작위로 고르는 값싼 백엔드를
+    # 캐시하면 TTL 동안 다시 생성해도 같은 후보만 돌아오므로 캐시하지 않음
+    cacheable = False
+
+    @property
+    def version(self) -> str:
+        """생성 결과를 좌우하는 템플릿/모델 버전 (바뀌면 캐시된 결과를 버림)"""
+        return self.name
+
+    async def generate(self, request: GenerationRequest) -> List[GeneratedText]:
+        raise NotImplementedError
+
+    async def stream(self, request: GenerationRequest) -> AsyncIterator[GeneratedText]:
+        """
+        후보 하나(n 무시)를 만들어지는 대로 조각 단위로 전달합니다 (GeneratedText마다 이어 붙일 조각 하나).
+        기본 구현은 generate가 끝난 뒤 조각을 나눠 보내므로, 조각을 먼저 받을 수 있는 백엔드는 재정의합니다.
+        """
+        text, = await self.generate(replace(request, n=1))
+        for fragment in text.fragments:
+            yield replace(text, fragments=[fragment])
+
+    async def start(self) -> None:
+        """기동 시 한 번 호출 (모델 버전 확인 등)"""
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name}
+
+class TemplateBackend(GenerationBackend):
+    """템플릿 레지스트리로 생성 (즉시 완료, 외부 호출 없음)"""
+
+    name = "template"
+
+    @property
+    def version(self) -> str:
+        return f"template:{template_registry.current().version}"
+
+    async def generate(self, request: GenerationRequest) -> List[GeneratedText]:
+        values = {"purpose": request.purpose}
+        results = []
+        for template in template_registry.current().choose(request.tone_style, request.n):
+            fragments = template.fragments(values)
+            if request.context:
+                fragments.append(request.context)
+            results.append(GeneratedText(template_id=template.id, fragments=fragments))
+        return results
+
+    async def stream(self, request: GenerationRequest) -> AsyncIterator[GeneratedText]:
+        template, = template_registry.current().choose(request.tone_style, 1)
+        fragments = template.fragments({"purpose": request.purpose})
+        if request.context:
+            fragments.append(request.context)
+        for fragment in fragments:
+            yield GeneratedText(template_id=template.id, fragments=[fragment])
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번 쌓이면 reset_timeout초 동안 호출을 막고(open),
+    그 뒤 한 번의 시험 호출(half-open)이 성공하면 다시 닫습니다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def end_probe(self) -> None:
+        """
+        시험 호출이 결과를 기록하지 못하고 끝났을 때(취소 등) 자리를 반환.
+        반환하지 않으면 half_open에서 모든 호출이 거절된 채로 남습니다.
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+class HttpModelBackend(GenerationBackend):
+    """
+    외부 모델 서버에 HTTP로 생성 요청. POST {base_url}/generate 에
+    {"purpose", "tone_style", "n", "context", "features"}를 보내고
+    {"model_version", "candidates": [{"text"}]}를 받습니다.
+    스트리밍은 같은 요청(n=1)을 POST {base_url}/generate/stream 에 보내고, 모델이 만드는 대로
+    한 줄에 하나씩 {"model_version", "text"} 조각을 NDJSON으로 받습니다.
+    모델 버전은 설정값(MODEL_VERSION)으로 고정하거나 기동 시 GET {base_url}/version으로 확인하고,
+    응답의 model_version이 달라지면(배포) 갱신해 이후 캐시 키가 바뀌게 합니다.
+    """
+
+    name = "http"
+    remote = True
+    uses_features = True
+    cacheable = True
+
+    def __init__(self, base_url: str, timeout: float, client=None, model_version: Optional[str] = None):
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self.model_version = model_version or "unknown"
+        self._pinned = model_version is not None
+        self._client = client or httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}:{self.model_version}"
+
+    async def start(self) -> None:
+        if self._pinned:
+            return
+        try:
+            response = await self._client.get("/version")
+            response.raise_for_status()
+            self._set_model_version(str(response.json()["model_version"]))
+        except Exception:
+            # 모델 서버가 아직 떠 있지 않아도 기동은 계속하고, 첫 응답에서 버전을 알게 됨
+            logger.warning("모델 서버 버전 확인 실패: %s/version", self.base_url, exc_info=True)
+
+    def _set_model_version(self, model_version: str) -> None:
+        if model_version != self.model_version:
+            logger.info("모델 버전 %s -> %s", self.model_version, model_version)
+            self.model_version = model_version
+
+    async def generate(self, request: GenerationRequest) -> List[GeneratedText]:
+        response = await self._client.post("/generate", json={
+            "purpose": request.purpose,
+            "tone_style": request.tone_style,
+            "n": request.n,
+            "context": request.context,
+            "features": request.features,
+        })
+        response.raise_for_status()
+        data = response.json()
+        model_version = str(data.get("model_version", self.model_version))
+        self._set_model_version(model_version)
+        template_id = f"model:{model_version}"
+        return [GeneratedText(template_id=template_id, fragments=[candidate["text"]]) for candidate in data["candidates"]]
+
+    async def stream(self, request: GenerationRequest) -> AsyncIterator[GeneratedText]:
+        async with self._client.stream("POST", "/generate/stream", json={
+            "purpose": request.purpose,
+            "tone_style": request.tone_style,
+            "n": 1,
+            "context": request.context,
+            "features": request.features,
+        }) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                model_version = str(chunk.get("model_version", self.model_version))
+                self._set_model_version(model_version)
+                yield GeneratedText(template_id=f"model:{model_version}", fragments=[chunk["text"]])
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+class GuardedBackend(GenerationBackend):
+    """
+    느린 백엔드를 감싸 동시 호출 수 제한(세마포어), 전체 타임아웃, 헤지 재시도,
+    회로 차단을 적용하고 실패하면 fallback 백엔드(템플릿)로 생성합니다.
+    동시 호출 수가 가득 차면 줄을 서지 않고 바로 대체해 요청이 타임아웃까지 묶이지 않게 합니다.
+    헤지: hedge_delay초 안에 응답이 없으면 (자리가 있을 때) 두 번째 요청을 보내 먼저 온 결과를 사용.
+    """
+
+    def __init__(
+        self,
+        backend: GenerationBackend,
+        fallback: GenerationBackend,
+        timeout: float,
+        max_concurrency: int,
+        hedge_delay: Optional[float],
+        breaker: CircuitBreaker,
+    ):
+        self.backend = backend
+        self.fallback = fallback
+        self.name = backend.name
+        self.remote = backend.remote
+        self.uses_features = backend.uses_features
+        self.cacheable = backend.cacheable
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "hedges": 0, "fallbacks": 0, "rejected": 0, "shed": 0}
+
+    async def generate(self, request: GenerationRequest) -> List[GeneratedText]:
+        self.counters["calls"] += 1
+        # 자리가 없으면 회로 상태와 관계없이 바로 대체 (half_open의 시험 호출 자리를 잡기 전에 확인)
+        if self._semaphore.locked():
+            self.counters["shed"] += 1
+            return await self._degraded(request)
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            return await self._degraded(request)
+        pending = set()
+        try:
+            pending.add(await self._launch(request))
+            result = await self._race(request, pending)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.breaker.record_failure()
+            return await self._fallback(request, "timeout")
+        except Exception as e:
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            return await self._fallback(request, repr(e))
+        finally:
+            for task in pending:
+                task.cancel()
+            if probe:
+                # 취소(CancelledError)처럼 결과를 기록하지 못한 경우에도 시험 호출 자리를 반환
+                self.breaker.end_probe()
+        self.counters["successes"] += 1
+        self.breaker.record_success()
+        return result
+
+    async def stream(self, request: GenerationRequest) -> AsyncIterator[GeneratedText]:
+        """
+        조각을 받는 대로 전달. 이미 보낸 조각은 되돌릴 수 없으므로 헤지하지 않고, timeout은
+        조각 사이의 최대 대기 시간으로 씁니다. 첫 조각 전에 실패하면 대체 백엔드로 생성하고,
+        조각을 보낸 뒤 실패하면 예외를 그대로 올립니다.
+        """
+        self.counters["calls"] += 1
+        if self._semaphore.locked():
+            self.counters["shed"] += 1
+            async for text in self._degraded_stream(request):
+                yield text
+            return
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self.counters["rejected"] += 1
+            async for text in self._degraded_stream(request):
+                yield text
+            return
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        chunks = self.backend.stream(request)
+        sent = False
+        reason = None
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(anext(chunks), self.timeout)
+                except StopAsyncIteration:
+                    break
+                sent = True
+                yield text
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self.breaker.record_failure()
+            if sent:
+                raise
+            reason = "timeout"
+        except Exception as e:
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            if sent:
+                raise
+            reason = repr(e)
+        else:
+            self.counters["successes"] += 1
+            self.breaker.record_success()
+        finally:
+            # 클라이언트가 끊겨 중간에 닫혀도 모델 서버 연결과 세마포어 자리, 시험 호출 자리를 반환
+            await chunks.aclose()
+            self.in_flight -= 1
+            self._semaphore.release()
+            if probe:
+                self.breaker.end_probe()
+        if reason is None:
+            return
+        self.counters["fallbacks"] += 1
+        logger.warning("%s 백엔드 사용 불가 (%s), %s 백엔드로 대체", self.backend.name, reason, self.fallback.name)
+        async for text in self._degraded_stream(request):
+            yield text
+
+    async def _degraded_stream(self, request: GenerationRequest) -> AsyncIterator[GeneratedText]:
+        async for text in self.fallback.stream(request):
+            yield replace(text, fallback=True)
+
+    async def _fallback(self, request: GenerationRequest, reason: str) -> List[GeneratedText]:
+        self.counters["fallbacks"] += 1
+        logger.warning("%s 백엔드 사용 불가 (%s), %s 백엔드로 대체", self.backend.name, reason, self.fallback.name)
+        return await self._degraded(request)
+
+    async def _degraded(self, request: GenerationRequest) -> List[GeneratedText]:
+        return [replace(text, fallback=True) for text in await self.fallback.generate(request)]
+
+    async def _launch(self, request: GenerationRequest) -> asyncio.Task:
+        """
+        세마포어 자리를 잡고 호출 태스크를 시작. 자리가 비어 있을 때만 호출하므로 acquire가
+        기다리지 않고, 자리는 태스크가 끝나거나 취소될 때 반환됩니다.
+        """
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        task = asyncio.ensure_future(self.backend.generate(request))
+        task.add_done_callback(self._release)
+        return task
+
+    def _release(self, task: asyncio.Task) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        if not task.cancelled():
+            # 헤지로 버려진 요청의 실패가 "never retrieved" 경고로 남지 않도록 확인 처리
+            task.exception()
+
+    async def _race(self, request: GenerationRequest, pending: set) -> List[GeneratedText]:
+        """
+        timeout 안에 먼저 성공한 결과를 반환. 첫 요청이 hedge_delay 안에 끝나지 않거나
+        실패하면 (자리가 있을 때) 두 번째 요청을 보냄 (최대 2회)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        can_hedge = self.hedge_delay is not None
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=min(remaining, self.hedge_delay) if can_hedge else remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            pending -= done
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if can_hedge and (done or loop.time() < deadline):
+                can_hedge = False
+                if not self._semaphore.locked():
+                    self.counters["hedges"] += 1
+                    pending.add(await self._launch(request))
+        raise error
+
+    @property
+    def version(self) -> str:
+        return self.backend.version
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def close(self) -> None:
+        await self.backend.close()
+        await self.fallback.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.backend.name,
+            "fallback": self.fallback.name,
+            "breaker": self.breaker.state,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            **self.counters,
+        }
+
+def create_backend(config=None) -> GenerationBackend:
+    """설정(GENERATION_BACKEND)에 맞는 생성 백엔드 생성"""
+    config = config or settings
+    template = TemplateBackend()
+    if config.GENERATION_BACKEND == "template":
+        return template
+    if config.GENERATION_BACKEND == "http":
+        if not config.MODEL_SERVER_URL:
+            raise ValueError("GENERATION_BACKEND=http에는 MODEL_SERVER_URL이 필요합니다")
+        return GuardedBackend(
+            HttpModelBackend(config.MODEL_SERVER_URL, timeout=config.MODEL_TIMEOUT, model_version=config.MODEL_VERSION),
+            fallback=template,
+            timeout=config.MODEL_TIMEOUT,
+            max_concurrency=config.MODEL_MAX_CONCURRENCY,
+            hedge_delay=config.MODEL_HEDGE_DELAY,
+            breaker=CircuitBreaker(config.MODEL_BREAKER_FAILURES, config.MODEL_BREAKER_RESET),
+        )
+    raise ValueError(f"알 수 없는 GENERATION_BACKEND: {config.GENERATION_BACKEND}")
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_purpose(purpose: str) -> str:
+    """캐시 키용 목적 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백을 하나로)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", purpose)).strip()
+
+def _texts_size(texts: Sequence[GeneratedText]) -> int:
+    """캐시 항목의 대략적인 메모리 크기 (바이트)"""
+    return sys.getsizeof(texts) + sum(
+        sys.getsizeof(text) + sys.getsizeof(text.template_id) + sys.getsizeof(text.fragments) + sum(sys.getsizeof(fragment) for fragment in text.fragments)
+        for text in texts
+    )
+
+class GenerationCache:
+    """
+    생성 결과 캐시 (cacheable 백엔드만 사용). 키는 (백엔드 버전, 정규화한 목적, 말투, 개수, 온보딩 지문)이고
+    LRU/TTL과 바이트 상한으로 크기를 제한합니다. 템플릿이나 모델 버전이 바뀌면
+    키가 달라져 이전 결과는 쓰이지 않으며, 이전 버전 항목은 태그로 한 번에 비웁니다.
+    대체 백엔드로 만든 결과는 장애가 끝난 뒤에도 남지 않도록 저장하지 않습니다.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, maxbytes: Optional[int]):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes, sizeof=_texts_size)
+        self._version: Optional[str] = None
+
+    @staticmethod
+    def fingerprint(backend: GenerationBackend, request: GenerationRequest) -> str:
+        """생성 결과에 영향을 주는 온보딩 정보(맞춤 문장, 모델이 쓰는 특성)의 해시"""
+        data = [request.context, request.features if backend.uses_features else None]
+        raw = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+    def key(self, backend: GenerationBackend, request: GenerationRequest) -> Tuple[str, str, str, int, str]:
+        version = backend.version
+        if version != self._version:
+            if self._version is not None:
+                self._cache.invalidate_tag(self._version)
+            self._version = version
+        return (
+            version,
+            normalize_purpose(request.purpose),
+            request.tone_style,
+            request.n,
+            self.fingerprint(backend, request),
+        )
+
+    def get(self, key: Tuple) -> Optional[List[GeneratedText]]:
+        texts = self._cache.get(key)
+        # 호출한 쪽이 조각 목록을 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return None if texts is None else [replace(text, fragments=list(text.fragments)) for text in texts]
+
+    def set(self, key: Tuple, texts: List[GeneratedText], version: Optional[str] = None) -> None:
+        """
+        결과 저장. version은 생성 직후의 백엔드 버전으로, 생성하는 사이 모델이 바뀌어
+        키의 버전과 다르면 새 모델의 결과가 이전 버전 키로 남지 않도록 저장하지 않습니다.
+        """
+        if version is not None and version != key[0]:
+            return
+        if texts and not any(text.fallback for text in texts):
+            self._cache.set(key, tuple(replace(text, fragments=tuple(text.fragments)) for text in texts), tag=key[0])
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self._version, **self._cache.stats()}
+
+generation_backend = create_backend()
+generation_cache = GenerationCache(
+    maxsize=settings.GENERATION_CACHE_SIZE,
+    ttl=settings.GENERATION_CACHE_TTL,
+    maxbytes=settings.GENERATION_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,96 @@
+from itertools import product
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.onboarding import BreakupReason, StrategyType, TendencyType
+
+# 추천 목표 목록
+GOALS: Dict[int, Dict[str, Any]] = {
+    1: {
+        "id": 1,
+        "name": "재회",
+        "description": "이전 관계를 복구하고 새로운 시작을 준비합니다.",
+        "reason": "상대방과의 관계가 아직 완전히 종료되지 않았으며, 서로에 대한 감정이 남아있습니다."
+    },
+    2: {
+        "id": 2,
+        "name": "마음 정리",
+        "description": "과거의 관계를 정리하고 새로운 시작을 준비합니다.",
+        "reason": "현재 감정적 혼란과 불안정한 상태를 해소할 필요가 있습니다."
+    },
+    3: {
+        "id": 3,
+        "name": "자기 이해",
+        "description": "자신의 감정과 행동 패턴을 이해하고 성장합니다.",
+        "reason": "관계에서 반복되는 패턴을 발견했으며, 이를 개선할 필요가 있습니다."
+    },
+    4: {
+        "id": 4,
+        "name": "성장",
+        "description": "이전 관계의 경험을 통해 개인적 성장을 이루어냅니다.",
+        "reason": "관계 경험을 통해 배운 교훈을 바탕으로 더 나은 관계를 만들 준비를 합니다."
+    },
+}
+
+# 이별 이유에 따른 목표
+REASON_GOALS = {
+    BreakupReason.COMMUNICATION: 3,  # 자기 이해
+    BreakupReason.VALUES: 3,  # 자기 이해
+    BreakupReason.EXTERNAL: 1,  # 재회
+    BreakupReason.TRUST: 2,  # 마음 정리
+}
+
+# 전략 유형에 따른 목표
+STRATEGY_GOALS = {
+    StrategyType.EMOTIONAL: 1,  # 재회
+    StrategyType.ANALYTICAL: 3,  # 자기 이해
+    StrategyType.BALANCED: 4,  # 성장
+}
+
+# 나와 상대의 성향이 다르면 관계 패턴을 돌아보는 목표 추가
+MISMATCHED_TENDENCY_GOAL = 3  # 자기 이해
+
+MAX_GOALS = 3
+
+GoalKey = Tuple[Optional[BreakupReason], Optional[StrategyType], TendencyType, TendencyType]
+
+def _recommend(key: GoalKey) -> Tuple[Dict[str, Any], ...]:
+    """규칙을 순서대로 적용해 목표를 고르고 중복을 제거해 최대 3개 반환"""
+    breakup_reason, strategy_type, my_tendency, partner_tendency = key
+    ids = [
+        REASON_GOALS.get(breakup_reason),
+        STRATEGY_GOALS.get(strategy_type),
+        MISMATCHED_TENDENCY_GOAL if my_tendency != partner_tendency else None,
+    ]
+    unique = dict.fromkeys(goal_id for goal_id in ids if goal_id is not None)
+    return tuple(GOALS[goal_id] for goal_id in unique)[:MAX_GOALS]
+
+def build_goal_table() -> Dict[GoalKey, Tuple[Dict[str, Any], ...]]:
+    """온보딩 값의 모든 조합에 대한 추천 결과를 미리 계산한 표"""
+    return {
+        key: _recommend(key)
+        for key in product(
+            [None, *BreakupReason],
+            [None, *StrategyType],
+            TendencyType,
+            TendencyType,
+        )
+    }
+
+GOAL_TABLE = build_goal_table()
+
+# 온보딩 전에는 근거가 없으므로 전체 목표를 보여줌
+DEFAULT_GOALS = tuple(GOALS.values())
+
+def recommend_goals(onboarding_values: Optional[Iterable]) -> Tuple[Dict[str, Any], ...]:
+    """(breakup_reason, strategy_type, my_tendency, partner_tendency) 값으로 추천 목표 조회"""
+    if onboarding_values is None:
+        return DEFAULT_GOALS
+    return GOAL_TABLE[tuple(onboarding_values)]
+
+# (사용자 id, 온보딩 리소스 버전) -> 추천 목표. 온보딩 저장이 같은 트랜잭션에서 버전을 올리므로
+# 다른 워커에서 저장했어도 다음 조회는 새 키로 찾고, 이전 버전의 항목은 TTL/LRU로 밀려남
+recommended_goals_cache = TTLCache(
+    maxsize=settings.RECOMMENDED_GOALS_CACHE_SIZE,
+    ttl=settings.RECOMMENDED_GOALS_CACHE_TTL,
+)
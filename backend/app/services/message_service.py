@@ -1,156 +1,248 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import ONBOARDING, resource_version
 from app.models.message import Message
 from app.models.user import User
 from app.models.onboarding import Onboarding
 from app.schemas.message import MessagePurpose
-import random
+from app.services.generation import GenerationRequest, generation_backend, generation_cache
+from app.services.goals import recommend_goals, recommended_goals_cache
+from app.services.report import record_messages, record_reaction
+from app.services.risk import risk_scanner
+from app.services.scoring import onboarding_features, reaction_scorer
+from app.services.templates import template_registry
+from app.services.write_behind import message_write_buffer
+
+@dataclass
+class MessageDraft:
+    """저장 전 후보 메시지 (조각 단위로 스트리밍할 수 있도록 본문을 조각으로 보관)"""
+    purpose: str
+    tone_style: str
+    template_id: str
+    fragments: List[str]
+    positive_reaction: float = 0.0
+
+    @property
+    def content(self) -> str:
+        return "".join(self.fragments)
+
+def _score_drafts(drafts: List[MessageDraft], features: dict) -> None:
+    """후보 전체의 긍정적 반응을 한 번에 예측"""
+    scores = reaction_scorer.score([
+        dict(features, tone_style=draft.tone_style, template=draft.template_id)
+        for draft in drafts
+    ])
+    for draft, score in zip(drafts, scores):
+        draft.positive_reaction = float(score)
 
 class MessageService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_recommended_goals(self, user: User) -> List[dict]:
+    async def get_message_history(
+        self,
+        user: User,
+        limit: int,
+        position: Optional[Tuple[datetime, int]] = None,
+        tone_style: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Message]:
         """
-        사용자의 온보딩 데이터를 기반으로 추천 목표를 생성합니다.
+        사용자의 메시지 기록을 최신순 (created_at, id) 키셋으로 조회합니다.
+        다음 페이지 여부 판단을 위해 limit + 1개까지 반환합니다.
         """
-        # 기본 목표 목록
-        all_goals = [
-            {
-                "id": 1,
-                "name": "재회",
-                "description": "이전 관계를 복구하고 새로운 시작을 준비합니다.",
-                "reason": "상대방과의 관계가 아직 완전히 종료되지 않았으며, 서로에 대한 감정이 남아있습니다."
-            },
-            {
-                "id": 2,
-                "name": "마음 정리",
-                "description": "과거의 관계를 정리하고 새로운 시작을 준비합니다.",
-                "reason": "현재 감정적 혼란과 불안정한 상태를 해소할 필요가 있습니다."
-            },
-            {
-                "id": 3,
-                "name": "자기 이해",
-                "description": "자신의 감정과 행동 패턴을 이해하고 성장합니다.",
-                "reason": "관계에서 반복되는 패턴을 발견했으며, 이를 개선할 필요가 있습니다."
-            },
-            {
-                "id": 4,
-                "name": "성장",
-                "description": "이전 관계의 경험을 통해 개인적 성장을 이루어냅니다.",
-                "reason": "관계 경험을 통해 배운 교훈을 바탕으로 더 나은 관계를 만들 준비를 합니다."
-            }
-        ]
+        query = select(Message).where(Message.user_id == user.id)
+        if tone_style is not None:
+            query = query.where(Message.tone_style == tone_style)
+        if since is not None:
+            query = query.where(Message.created_at >= since)
+        if until is not None:
+            query = query.where(Message.created_at < until)
+        if position is not None:
+            query = query.where(tuple_(Message.created_at, Message.id) < tuple_(*position))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+        return (await self.db.scalars(query)).all()
 
-        # 사용자의 온보딩 데이터 가져오기
-        onboarding = self.db.query(Onboarding).filter(Onboarding.user_id == user.id).first()
-        
-        if not onboarding:
-            # 온보딩 데이터가 없는 경우 랜덤하게 0~3개 추천
-            num_goals = random.randint(0, 3)
-            return random.sample(all_goals, num_goals)
-
-        # 온보딩 데이터 기반 목표 추천 로직
-        recommended_goals = []
-        
-        # 이별 이유에 따른 목표 추천
-        if onboarding.breakup_reason:
-            if "성격 차이" in onboarding.breakup_reason:
-                recommended_goals.append(all_goals[2])  # 자기 이해
-            elif "외부 요인" in onboarding.breakup_reason:
-                recommended_goals.append(all_goals[0])  # 재회
-            elif "감정 식음" in onboarding.breakup_reason:
-                recommended_goals.append(all_goals[1])  # 마음 정리
-
-        # 전략 유형에 따른 목표 추천
-        if onboarding.strategy_type:
-            if onboarding.strategy_type == "재회 희망":
-                recommended_goals.append(all_goals[0])  # 재회
-            elif onboarding.strategy_type == "완전한 이별":
-                recommended_goals.append(all_goals[1])  # 마음 정리
-            elif onboarding.strategy_type == "미정":
-                recommended_goals.append(all_goals[2])  # 자기 이해
-
-        # 중복 제거
-        recommended_goals = list({goal['id']: goal for goal in recommended_goals}.values())
-        
-        # 최대 3개까지만 반환
-        return recommended_goals[:3]
-
-    def generate_message(self, user: User, message_purpose: MessagePurpose) -> Message:
-        """
-        사용자의 입력과 온보딩 데이터를 기반으로 메시지를 생성합니다.
+    async def iter_message_history(self, user_id: int, batch_size: int = 500) -> AsyncIterator[dict]:
+        """
+        사용자의 전체 메시지 기록을 서버 사이드 커서로 batch_size씩 읽어 dict로 반환합니다.
+        ORM 객체 대신 컬럼 행을 읽어 기록이 많아도 메모리 사용량이 일정합니다.
         """
+        columns = Message.__table__.c
+        query = (
+            select(
+                columns.id,
+                columns.purpose,
+                columns.tone_style,
+                columns.content,
+                columns.positive_reaction,
+                columns.warning,
+                columns.reaction,
+                columns.created_at,
+            )
+            .where(columns.user_id == user_id)
+            .order_by(columns.created_at, columns.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
+
+    async def get_recommended_goals(self, user: User) -> List[dict]:
+        """
+        사용자의 온보딩 데이터를 기반으로 추천 목표를 반환합니다.
+        미리 계산한 규칙 표에서 조회하고 결과는 (사용자, 온보딩 버전)별로 캐시합니다.
+        버전은 기본 키 조회 한 번으로 읽으므로 다른 워커가 온보딩을 저장해도 이전 목표를 반환하지 않습니다.
+        """
+        key = (user.id, await resource_version(self.db, user.id, ONBOARDING))
+        goals = recommended_goals_cache.get(key)
+        if goals is None:
+            # 규칙에 쓰는 네 컬럼만 조회
+            row = (await self.db.execute(
+                select(
+                    Onboarding.breakup_reason,
+                    Onboarding.strategy_type,
+                    Onboarding.my_tendency,
+                    Onboarding.partner_tendency,
+                ).where(Onboarding.user_id == user.id)
+            )).first()
+            goals = recommend_goals(row)
+            recommended_goals_cache.set(key, goals)
+        return list(goals)
+
+    async def _generation_requests(self, user: User, message_purpose: MessagePurpose) -> List[GenerationRequest]:
+        """목적마다 온보딩 맞춤 문장과 특성을 담은 생성 요청 (등록되지 않은 말투는 UnknownToneStyle)"""
         # 온보딩 데이터 가져오기
-        onboarding = self.db.query(Onboarding).filter(Onboarding.user_id == user.id).first()
-
-        # 메시지 생성 로직
-        tone_style_templates = {
-            "logical": [
-                "객관적인 사실을 바탕으로 {purpose}에 대해 이야기하고 싶습니다.",
-                "합리적인 관점에서 {purpose}를 설명하고자 합니다.",
-                "논리적으로 생각해보면, {purpose}이(가) 중요한 이유가 있습니다."
-            ],
-            "emotional": [
-                "진심을 담아 {purpose}에 대한 제 마음을 전하고 싶습니다.",
-                "솔직한 감정으로 {purpose}에 대해 이야기하고 싶어요.",
-                "{purpose}에 대한 제 진심이 전해졌으면 좋겠습니다."
-            ],
-            "curious": [
-                "{purpose}에 대해 함께 생각해보면 어떨까요?",
-                "{purpose}에 대해 당신의 생각이 궁금합니다.",
-                "{purpose}에 대해 이야기를 나누어보고 싶습니다."
-            ]
-        }
-
-        # 기본 템플릿 선택
-        templates = tone_style_templates.get(message_purpose.tone_style, tone_style_templates["logical"])
-        base_message = random.choice(templates).format(purpose=message_purpose.purpose)
-
-        # 온보딩 데이터가 있는 경우, 맞춤형 내용 추가
+        onboarding = await self.db.scalar(select(Onboarding).where(Onboarding.user_id == user.id))
+
+        # 말투 검증 (등록되지 않은 말투는 UnknownToneStyle)
+        templates = template_registry.current()
+        tone_style = message_purpose.tone_style
+        templates.tone(tone_style)
+        context = ""
         if onboarding:
+            # 온보딩 데이터가 있는 경우, 맞춤형 내용 추가
             relationship_duration = f"{onboarding.relationship_years}년 {onboarding.relationship_months}개월"
-            additional_context = f"\n우리가 함께한 {relationship_duration}의 시간이 있었기에, "
-            if onboarding.strategy_type == "재회 희망":
-                additional_context += "새로운 시작을 위한 대화를 나누고 싶습니다."
-            elif onboarding.strategy_type == "완전한 이별":
-                additional_context += "서로의 미래를 위해 좋은 마무리를 하고 싶습니다."
-            else:
-                additional_context += "서로를 이해하는 시간이 되었으면 합니다."
-            
-            base_message += additional_context
-
-        # 긍정적 반응 예측 (실제로는 더 복잡한 로직이 필요)
-        positive_reaction = random.uniform(50, 90)
-
-        # 경고 메시지 생성
-        warning = None
-        warning_threshold = {
-            "logical": 0.2,    # 20% 확률
-            "emotional": 0.4,  # 40% 확률
-            "curious": 0.3     # 30% 확률
-        }
-
-        if random.random() < warning_threshold.get(message_purpose.tone_style, 0.3):
-            warnings = [
-                "상대방이 부담을 느낄 수 있습니다.",
-                "감정적 자극이 있을 수 있습니다.",
-                "상대방이 거부할 가능성이 있습니다."
-            ]
-            warning = random.choice(warnings)
-
-        # 메시지 저장
-        message = Message(
-            user_id=user.id,
-            purpose=message_purpose.purpose,
-            tone_style=message_purpose.tone_style,
-            content=base_message,
-            positive_reaction=positive_reaction,
-            warning=warning
+            context = templates.render_context(relationship_duration, onboarding.strategy_type)
+        features = onboarding_features(onboarding)
+        return [
+            GenerationRequest(purpose=purpose, tone_style=tone_style, n=message_purpose.n, context=context, features=features)
+            for purpose in message_purpose.all_purposes()
+        ]
+
+    async def prepare_drafts(self, user: User, message_purpose: MessagePurpose) -> List[MessageDraft]:
+        """
+        사용자의 입력과 온보딩 데이터를 기반으로 목적마다 n개의 후보 메시지를 만들고
+        후보 전체의 긍정적 반응을 한 번에 예측합니다. (저장은 save_drafts)
+        """
+        requests = await self._generation_requests(user, message_purpose)
+
+        # 같은 목적/말투/온보딩 지문으로 생성한 결과가 캐시에 있으면 재사용
+        # (템플릿처럼 값싸고 무작위인 백엔드는 다시 생성할 때마다 새 후보를 고르도록 캐시하지 않음)
+        cacheable = generation_backend.cacheable
+        keys = [generation_cache.key(generation_backend, request) if cacheable else None for request in requests]
+        results = [generation_cache.get(key) if cacheable else None for key in keys]
+        missing = [i for i, texts in enumerate(results) if texts is None]
+        if missing:
+            if generation_backend.remote:
+                # 모델 서버 응답을 기다리는 동안 DB 커넥션을 붙잡지 않도록 먼저 반환 (저장 시 다시 연결)
+                await self.db.close()
+            # 캐시에 없는 목적의 생성 요청을 동시에 보냄
+            generated = await asyncio.gather(*(generation_backend.generate(requests[i]) for i in missing))
+            for i, texts in zip(missing, generated):
+                if cacheable:
+                    generation_cache.set(keys[i], texts, version=generation_backend.version)
+                results[i] = texts
+        drafts = [
+            MessageDraft(purpose=request.purpose, tone_style=request.tone_style, template_id=text.template_id, fragments=text.fragments)
+            for request, texts in zip(requests, results)
+            for text in texts
+        ]
+        _score_drafts(drafts, requests[0].features)
+        return drafts
+
+    async def stream_draft(self, user: User, message_purpose: MessagePurpose) -> AsyncIterator[MessageDraft]:
+        """
+        첫 목적의 후보 하나를 백엔드가 조각을 만드는 대로 쌓아 갑니다. 조각이 도착할 때마다 같은 초안을
+        돌려주고(새 조각은 draft.fragments[-1]), 반복이 끝나면 초안의 긍정적 반응이 예측되어 있습니다.
+        스트리밍은 캐시하지 않습니다.
+        """
+        request, *_ = await self._generation_requests(user, message_purpose)
+        # 조각을 기다리고 보내는 동안 DB 커넥션을 붙잡지 않도록 먼저 반환 (저장 시 다시 연결)
+        await self.db.close()
+        draft = MessageDraft(purpose=request.purpose, tone_style=request.tone_style, template_id="", fragments=[])
+        async with aclosing(generation_backend.stream(request)) as texts:
+            async for text in texts:
+                draft.template_id = text.template_id
+                for fragment in text.fragments:
+                    draft.fragments.append(fragment)
+                    yield draft
+        _score_drafts([draft], request.features)
+
+    async def save_drafts(self, user_id: int, drafts: List[MessageDraft]) -> List[Message]:
+        """
+        후보들을 INSERT 한 문장으로 저장하고 예측 반응이 높은 순으로 반환합니다.
+        write-behind 모드에서는 버퍼에 넣고 바로 반환하므로 반환된 메시지의 id가 None입니다
+        (버퍼가 가득 차면 WriteBufferFull).
+        """
+        # 저장 시점이 아니라 생성 시점으로 기록 (리포트 주별 통계도 같은 값 사용)
+        created_at = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "purpose": draft.purpose,
+                "tone_style": draft.tone_style,
+                "content": draft.content,
+                "positive_reaction": draft.positive_reaction,
+                # 목적과 본문에서 위험 문구를 찾아 경고 생성
+                "warning": risk_scanner.scan(draft.purpose, draft.content).warning,
+                "created_at": created_at,
+            }
+            for draft in drafts
+        ]
+        if message_write_buffer is not None:
+            # 리포트 통계는 버퍼가 저장하는 트랜잭션에서 갱신
+            await message_write_buffer.submit(rows)
+            messages = [Message(**row) for row in rows]
+            return sorted(messages, key=lambda message: -message.positive_reaction)
+
+        # render_nulls: warning이 None인 행과 아닌 행이 섞여도 INSERT 하나로 묶음
+        messages = (await self.db.scalars(
+            insert(Message).returning(Message).execution_options(render_nulls=True),
+            rows
+        )).all()
+        await record_messages(self.db, rows)
+        await self.db.commit()
+
+        return sorted(messages, key=lambda message: (-message.positive_reaction, message.id))
+
+    async def set_reaction(self, user_id: int, message_id: int, reaction: str) -> Optional[Message]:
+        """
+        보낸 메시지에 상대가 보인 실제 반응을 기록하고 연락 시간 통계에 반영합니다 (다시 기록하면 교체).
+        이전 반응을 통계에서 빼야 하므로 행을 잠가 읽고, 사용자의 메시지가 아니면 None을 반환합니다.
+        """
+        message = await self.db.scalar(
+            select(Message)
+            .where(Message.id == message_id, Message.user_id == user_id)
+            .with_for_update()
         )
-        
-        self.db.add(message)
-        self.db.commit()
-        self.db.refresh(message)
+        if message is None:
+            return None
+        if message.reaction != reaction:
+            await record_reaction(self.db, user_id, message.created_at, message.reaction, reaction)
+            message.reaction = reaction
+            await self.db.commit()
+        return message
 
-        return message 
\ No newline at end of file
+    async def generate_messages(self, user: User, message_purpose: MessagePurpose) -> List[Message]:
+        """
+        후보 메시지를 생성/점수화해 저장하고 예측 반응이 높은 순으로 반환합니다.
+        """
+        drafts = await self.prepare_drafts(user, message_purpose)
+        return await self.save_drafts(user.id, drafts)
@@ -0,0 +1,259 @@
+"""
+리포트 통계 (user_report_stats) 증분 갱신/조회/재계산.
+
+메시지 저장, 반응 기록과 미션 완료 상태 변경은 같은 트랜잭션에서 (metric, bucket)별 건수/합계 증분을
+upsert 한 문장으로 더하므로, 리포트 조회는 기록 전체를 훑지 않고 사용자의 통계 행만 읽습니다.
+증분 갱신이 빠졌거나 버킷 규칙을 바꾼 뒤에는 재계산 명령으로 원본 행에서 다시 만듭니다:
+
+    python -m app.services.report [--user-id ID]
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import argparse
+import asyncio
+from sqlalchemy import delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import dialect_insert
+from app.models.message import Message
+from app.models.mission import Mission
+from app.models.report_stat import UserReportStat
+from app.services.timing import HOUR_OF_WEEK, OUTCOME_SCORES, best_window, histogram_arrays, hour_of_week
+
+# 통계 종류 (bucket 의미)
+MESSAGES = "messages"  # 전체 ("")
+TONE = "tone"  # 말투 스타일
+WEEK = "week"  # 주 시작일(월요일, UTC) ISO 날짜
+REACTION = "reaction"  # 예측 반응 10점 단위 구간 "0".."9"
+MISSIONS = "missions"  # "completed"
+# HOUR_OF_WEEK: 보낸 시각의 요일*24 + 시, 기록된 반응만 (연락 시간 추천, app.services.timing)
+
+COMPLETED = "completed"
+REACTION_BUCKETS = 10
+# 반응 시뮬레이션: 이 구간 이상은 긍정, NEUTRAL_BUCKET 이상은 중립, 나머지는 부정
+POSITIVE_BUCKET = 6
+NEUTRAL_BUCKET = 4
+
+REBUILD_BATCH_SIZE = 5000
+# 여러 행 INSERT 한 문장에 담는 통계 행 수 (바인딩 파라미터 수 제한)
+INSERT_CHUNK_SIZE = 500
+
+StatKey = Tuple[int, str, str]
+
+def week_bucket(created_at: datetime) -> str:
+    """생성 시각이 속한 주의 시작일(월요일)"""
+    day = created_at.date() if isinstance(created_at, datetime) else created_at
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+def reaction_bucket(positive_reaction: float) -> str:
+    """예측 반응(0~100)을 10점 단위 구간으로 (100은 마지막 구간)"""
+    return str(min(max(int(positive_reaction // 10), 0), REACTION_BUCKETS - 1))
+
+class ReportDeltas:
+    """(사용자, metric, bucket)별 건수/합계 증분을 모아 두는 버퍼"""
+
+    def __init__(self):
+        self.values: Dict[StatKey, List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def add(self, user_id: int, metric: str, bucket: str = "", count: int = 1, total: float = 0.0) -> None:
+        entry = self.values[(user_id, metric, bucket)]
+        entry[0] += count
+        entry[1] += total
+
+    def add_message(self, user_id: int, tone_style: str, positive_reaction: float, created_at: datetime) -> None:
+        self.add(user_id, MESSAGES, total=positive_reaction)
+        self.add(user_id, TONE, tone_style, total=positive_reaction)
+        self.add(user_id, WEEK, week_bucket(created_at), total=positive_reaction)
+        self.add(user_id, REACTION, reaction_bucket(positive_reaction))
+
+    def add_outcome(self, user_id: int, created_at: datetime, reaction: str, sign: int = 1) -> None:
+        """기록된 반응을 보낸 시각의 칸에 더함 (반응을 바꾸면 이전 반응을 sign=-1로 뺌)"""
+        self.add(user_id, HOUR_OF_WEEK, str(hour_of_week(created_at)), count=sign, total=sign * OUTCOME_SCORES[reaction])
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"user_id": user_id, "metric": metric, "bucket": bucket, "count": count, "total": total}
+            for (user_id, metric, bucket), (count, total) in self.values.items()
+            if count or total
+        ]
+
+async def apply_deltas(db: AsyncSession, deltas: ReportDeltas) -> None:
+    """증분을 INSERT ... ON CONFLICT DO UPDATE 한 문장으로 더함 (커밋은 호출한 쪽에서)"""
+    rows = deltas.rows()
+    if not rows:
+        return
+    stmt = dialect_insert(db, UserReportStat).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserReportStat.user_id, UserReportStat.metric, UserReportStat.bucket],
+        set_={
+            "count": UserReportStat.count + stmt.excluded.count,
+            "total": UserReportStat.total + stmt.excluded.total,
+        }
+    ))
+
+async def record_messages(db: AsyncSession, rows: Iterable[Mapping[str, Any]]) -> None:
+    """저장하는 메시지 행(user_id, tone_style, positive_reaction, created_at)을 통계에 반영"""
+    deltas = ReportDeltas()
+    for row in rows:
+        deltas.add_message(row["user_id"], row["tone_style"], row["positive_reaction"], row["created_at"])
+    await apply_deltas(db, deltas)
+
+async def record_missions_completed(db: AsyncSession, user_id: int, delta: int) -> None:
+    """완료된 미션 수 증감 (완료 취소나 완료된 미션 삭제는 음수)"""
+    if delta:
+        deltas = ReportDeltas()
+        deltas.add(user_id, MISSIONS, COMPLETED, count=delta)
+        await apply_deltas(db, deltas)
+
+async def record_reaction(db: AsyncSession, user_id: int, created_at: datetime, old: Optional[str], new: str) -> None:
+    """메시지의 반응 기록/변경을 통계에 반영 (같은 반응이면 증분이 없어 실행하지 않음)"""
+    deltas = ReportDeltas()
+    if old is not None:
+        deltas.add_outcome(user_id, created_at, old, sign=-1)
+    deltas.add_outcome(user_id, created_at, new)
+    await apply_deltas(db, deltas)
+
+async def record_mission_completion(db: AsyncSession, user_id: int, mission_id: int, is_completed: bool) -> None:
+    """
+    미션 완료 여부를 is_completed로 바꾸는 UPDATE 전에 호출. 현재 값과 다를 때만 +1/-1을
+    INSERT ... SELECT ... ON CONFLICT 한 문장으로 더하므로 이전 값을 따로 읽지 않습니다.
+    SELECT는 미션 행을 잠가(PostgreSQL) 동시에 같은 변경이 와도 한 번만 셉니다.
+    """
+    source = (
+        select(
+            literal(user_id),
+            literal(MISSIONS),
+            literal(COMPLETED),
+            literal(1 if is_completed else -1),
+            literal(0.0),
+        )
+        .where(
+            Mission.id == mission_id,
+            Mission.user_id == user_id,
+            func.coalesce(Mission.is_completed, False) != is_completed
+        )
+        .with_for_update()
+    )
+    stmt = dialect_insert(db, UserReportStat).from_select(["user_id", "metric", "bucket", "count", "total"], source)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserReportStat.user_id, UserReportStat.metric, UserReportStat.bucket],
+        set_={"count": UserReportStat.count + stmt.excluded.count}
+    ))
+
+def _rate(count: int, total: float) -> Optional[float]:
+    # 예측 반응(%) 평균을 0~1 비율로
+    return round(total / count / 100, 4) if count else None
+
+async def get_report(db: AsyncSession, user_id: int, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    사용자의 통계 행만 읽어 리포트를 만듭니다. 주별 행은 이번 주와 지난주만 읽으므로
+    읽는 행 수가 기록 양과 관계없이 (말투 수 + 구간 수 + 상수)로 일정합니다.
+    """
+    today = today or datetime.utcnow().date()
+    this_week = week_bucket(today)
+    last_week = week_bucket(today - timedelta(days=7))
+    result = await db.execute(
+        select(UserReportStat.metric, UserReportStat.bucket, UserReportStat.count, UserReportStat.total)
+        .where(
+            UserReportStat.user_id == user_id,
+            or_(UserReportStat.metric != WEEK, UserReportStat.bucket.in_([this_week, last_week]))
+        )
+    )
+    stats: Dict[str, Dict[str, Tuple[int, float]]] = defaultdict(dict)
+    for metric, bucket, count, total in result:
+        stats[metric][bucket] = (count, total)
+
+    message_count, reaction_total = stats[MESSAGES].get("", (0, 0.0))
+    weeks = stats[WEEK]
+    this_rate = _rate(*weeks.get(this_week, (0, 0.0)))
+    last_rate = _rate(*weeks.get(last_week, (0, 0.0)))
+    rate_change = None if this_rate is None or last_rate is None else round(this_rate - last_rate, 4)
+
+    tones = sorted(stats[TONE].items(), key=lambda item: (-item[1][0], item[0]))
+    histogram = [stats[REACTION].get(str(bucket), (0, 0.0))[0] for bucket in range(REACTION_BUCKETS)]
+    simulation = None
+    if message_count:
+        # 평균 예측 반응이 가장 높은 말투
+        best_tone = max(tones, key=lambda item: item[1][1] / max(item[1][0], 1))[0] if tones else None
+        simulation = {
+            "tone_style": best_tone,
+            "positive": round(sum(histogram[POSITIVE_BUCKET:]) / message_count, 4),
+            "neutral": round(sum(histogram[NEUTRAL_BUCKET:POSITIVE_BUCKET]) / message_count, 4),
+            "negative": round(sum(histogram[:NEUTRAL_BUCKET]) / message_count, 4),
+        }
+
+    return {
+        "message_count": message_count,
+        "success_rate": _rate(message_count, reaction_total),
+        "rate_change": rate_change,
+        "tone_distribution": [
+            {
+                "tone_style": tone,
+                "count": count,
+                "ratio": round(count / message_count, 4) if message_count else 0.0,
+                "success_rate": _rate(count, total),
+            }
+            for tone, (count, total) in tones
+        ],
+        "reaction_histogram": histogram,
+        "simulation": simulation,
+        "missions_completed": stats[MISSIONS].get(COMPLETED, (0, 0.0))[0],
+        # 같은 조회로 읽은, 사용자가 기록한 반응의 요일/시간 히스토그램에서 추천 연락 시간 (기록이 없으면 None)
+        "optimal_time": best_window(*histogram_arrays(stats[HOUR_OF_WEEK])) if stats[HOUR_OF_WEEK] else None,
+    }
+
+async def rebuild_report_stats(db: AsyncSession, user_id: Optional[int] = None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    원본 메시지/미션 행에서 통계를 다시 계산해 한 트랜잭션으로 교체하고 통계 행 수를 반환합니다.
+    메시지는 서버 측 커서로 batch_size개씩 스트리밍해 증분 갱신과 같은 버킷 규칙으로 집계하고,
+    미션은 GROUP BY로 집계합니다. 재계산 중 들어온 증분은 덮어쓸 수 있으므로 한산한 시간에 실행합니다.
+    """
+    deltas = ReportDeltas()
+    messages = select(Message.user_id, Message.tone_style, Message.positive_reaction, Message.created_at, Message.reaction)
+    missions = (
+        select(Mission.user_id, func.count())
+        .where(Mission.is_completed == True)  # noqa: E712
+        .group_by(Mission.user_id)
+    )
+    if user_id is not None:
+        messages = messages.where(Message.user_id == user_id)
+        missions = missions.where(Mission.user_id == user_id)
+
+    result = await db.stream(messages.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        for owner, tone_style, positive_reaction, created_at, reaction in partition:
+            deltas.add_message(owner, tone_style, positive_reaction, created_at)
+            if reaction is not None:
+                deltas.add_outcome(owner, created_at, reaction)
+    for owner, count in await db.execute(missions):
+        deltas.add(owner, MISSIONS, COMPLETED, count=count)
+
+    clear = delete(UserReportStat)
+    if user_id is not None:
+        clear = clear.where(UserReportStat.user_id == user_id)
+    await db.execute(clear)
+    rows = deltas.rows()
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await db.execute(insert(UserReportStat).values(rows[start:start + INSERT_CHUNK_SIZE]))
+    await db.commit()
+    return len(rows)
+
+def main() -> None:
+    from app.db.database import AsyncSessionLocal, engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="이 사용자만 재계산 (기본: 전체)")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    async def run() -> int:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await rebuild_report_stats(db, args.user_id, args.batch_size)
+        finally:
+            await engine.dispose()
+
+    print(f"리포트 통계 {asyncio.run(run())}행 재계산 완료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+from app.core.config import settings
+from app.core.reload import HotReloadable
+
+DEFAULT_PHRASES_PATH = Path(__file__).resolve().parent.parent / "data" / "risk_phrases.json"
+
+def normalize(text: str) -> str:
+    """대소문자와 띄어쓰기 차이를 무시하도록 정규화 ("보고 싶어" == "보고싶어")"""
+    return "".join(text.casefold().split())
+
+class AhoCorasick:
+    """
+    여러 패턴을 한 번의 순회로 찾는 Aho-Corasick 오토마톤.
+    생성 시 트라이와 실패 링크를 만들어 두면 검색은 패턴 수와 관계없이 텍스트 길이에 비례합니다.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = tuple(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("빈 패턴은 사용할 수 없습니다")
+            node = 0
+            for char in pattern:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][char] = next_node
+                    goto.append({})
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(index)
+
+        # BFS로 실패 링크를 만들고, 실패 링크 쪽 출력도 합쳐 검색 시 따라가지 않아도 되게 함
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = tuple(tuple(output) for output in outputs)
+
+    def search(self, text: str) -> List[Tuple[int, int]]:
+        """텍스트에서 찾은 (패턴 인덱스, 끝 위치 다음 인덱스) 목록"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                matches.extend((index, position + 1) for index in outputs[node])
+        return matches
+
+@dataclass(frozen=True)
+class RiskMatch:
+    category: str
+    warning: str
+    phrase: str
+
+@dataclass(frozen=True)
+class RiskResult:
+    matches: Tuple[RiskMatch, ...]
+
+    @property
+    def top(self) -> Optional[RiskMatch]:
+        return self.matches[0] if self.matches else None
+
+    @property
+    def category(self) -> Optional[str]:
+        return self.top.category if self.top else None
+
+    @property
+    def warning(self) -> Optional[str]:
+        return self.top.warning if self.top else None
+
+class RiskDictionary:
+    """
+    위험 문구 사전을 하나의 오토마톤으로 컴파일한 스냅샷.
+    여러 분류가 걸리면 파일에 먼저 적힌 분류가 우선합니다.
+    """
+
+    def __init__(self, version: str, categories: Dict[str, Dict]):
+        self.version = version
+        self.warnings = {name: category["warning"] for name, category in categories.items()}
+        self._priority = {name: rank for rank, name in enumerate(categories)}
+        entries = {}
+        for name, category in categories.items():
+            for phrase in category["phrases"]:
+                # 같은 문구가 여러 분류에 있으면 우선순위가 높은 분류만 사용
+                entries.setdefault(normalize(phrase), (name, phrase))
+        self._entries = tuple(entries.values())
+        self._automaton = AhoCorasick(tuple(entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def scan(self, *texts: str) -> RiskResult:
+        """텍스트들에서 위험 문구를 찾아 분류 우선순위 순으로 반환 (문구별 한 번)"""
+        found = {}
+        for text in texts:
+            for index, _ in self._automaton.search(normalize(text)):
+                found.setdefault(index, self._entries[index])
+        matches = sorted(
+            (RiskMatch(category=name, warning=self.warnings[name], phrase=phrase) for name, phrase in found.values()),
+            key=lambda match: self._priority[match.category],
+        )
+        return RiskResult(matches=tuple(matches))
+
+class RiskScanner(HotReloadable[RiskDictionary]):
+    """위험 문구 사전을 한 번 컴파일해 두고 파일이 바뀌면 다시 만듭니다."""
+
+    name = "위험 문구 사전"
+    errors = (ValueError, KeyError, TypeError)
+
+    def parse(self, raw: bytes) -> RiskDictionary:
+        data = json.loads(raw)
+        return RiskDictionary(str(data["version"]), data["categories"])
+
+    def scan(self, *texts: str) -> RiskResult:
+        return self.current().scan(*texts)
+
+    def stats(self) -> Dict[str, object]:
+        dictionary = self.current()
+        return {"version": dictionary.version, "phrases": len(dictionary)}
+
+risk_scanner = RiskScanner(
+    settings.RISK_PHRASES_PATH or DEFAULT_PHRASES_PATH,
+    reload_interval=settings.RISK_PHRASES_RELOAD_INTERVAL,
+)
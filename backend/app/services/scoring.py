@@ -0,0 +1,168 @@
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+import enum
+import json
+import math
+import numpy as np
+from app.core.config import settings
+from app.core.reload import HotReloadable
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent / "data" / "reaction_model.json"
+
+# 수치형 특성 변환 (배열용, 스칼라용)
+TRANSFORMS = {
+    "identity": (lambda x: x, lambda x: x),
+    "log1p": (np.log1p, math.log1p),
+}
+
+# 이 크기 이하의 배치는 NumPy 배열을 만들지 않고 후보별로 계산하는 편이 빠름
+SCALAR_BATCH_LIMIT = 32
+
+def _value(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+def onboarding_features(onboarding, today: Optional[date] = None) -> Dict[str, Any]:
+    """온보딩 데이터에서 반응 예측에 쓰는 특성 추출 (온보딩이 없으면 빈 dict)"""
+    if onboarding is None:
+        return {}
+    today = today or date.today()
+    return {
+        "my_tendency": _value(onboarding.my_tendency),
+        "partner_tendency": _value(onboarding.partner_tendency),
+        "breakup_reason": _value(onboarding.breakup_reason),
+        "strategy_type": _value(onboarding.strategy_type),
+        "relationship_months": onboarding.relationship_years * 12 + onboarding.relationship_months,
+        "days_since_breakup": max((today - onboarding.breakup_date).days, 0),
+    }
+
+class ReactionModel:
+    """
+    범주형 특성(원-핫)과 수치형 특성을 쓰는 로지스틱 모델.
+    범주형 가중치는 (특성, 값) -> 배열 인덱스 표로 펼쳐 두고, 배치 추론은
+    인덱스 행렬로 가중치를 한 번에 모아 더합니다. 모르는 값은 가중치 0인 마지막 칸을 가리킵니다.
+    "a|b" 이름의 특성은 두 특성 값을 묶은 교차 특성입니다.
+    """
+
+    def __init__(self, version: str, bias: float, categorical: Mapping[str, Mapping[str, float]], numeric: Mapping[str, Mapping[str, Any]]):
+        self.version = version
+        self.bias = float(bias)
+
+        weights = []
+        lookups = []
+        for name, table in categorical.items():
+            parts = tuple(name.split("|"))
+            lookup = {}
+            for value, weight in table.items():
+                # 교차 특성은 값 튜플을 키로 사용
+                key = tuple(value.split("|")) if len(parts) > 1 else value
+                lookup[key] = len(weights)
+                weights.append(float(weight))
+            lookups.append((parts, lookup))
+        self._missing = len(weights)
+        self._getters = tuple(self._index_getter(parts, lookup) for parts, lookup in lookups)
+        self._weights_list = weights + [0.0]
+        self.weights = np.array(self._weights_list)
+
+        self.numeric = tuple(numeric)
+        self._transforms = tuple(TRANSFORMS[spec.get("transform", "identity")] for spec in numeric.values())
+        self._numeric_specs = tuple(
+            (float(spec.get("mean", 0.0)), float(spec.get("scale", 1.0)), float(spec["weight"]))
+            for spec in numeric.values()
+        )
+        self._mean = np.array([mean for mean, _, _ in self._numeric_specs])
+        self._scale = np.array([scale for _, scale, _ in self._numeric_specs])
+        self._numeric_weights = np.array([weight for _, _, weight in self._numeric_specs])
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ReactionModel":
+        model = cls(
+            version=str(data["version"]),
+            bias=data.get("bias", 0.0),
+            categorical=data.get("categorical", {}),
+            numeric=data.get("numeric", {}),
+        )
+        if any(scale <= 0 for _, scale, _ in model._numeric_specs):
+            raise ValueError("numeric scale은 0보다 커야 합니다")
+        return model
+
+    def _index_getter(self, parts: Tuple[str, ...], lookup: Dict[Any, int]) -> Callable[[Mapping[str, Any]], int]:
+        """특성 dict에서 가중치 인덱스를 찾는 함수 (모르는 값/결측은 가중치 0인 칸)"""
+        missing = self._missing
+        if len(parts) == 1:
+            name = parts[0]
+            return lambda row: lookup.get(row.get(name), missing)
+        return lambda row: lookup.get(tuple(row.get(part) for part in parts), missing)
+
+    def encode(self, rows: Sequence[Mapping[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """특성 dict 목록을 (범주형 인덱스 행렬, 수치형 행렬)로 변환 (수치형 결측은 NaN)"""
+        count = len(rows)
+        indices = np.empty((count, len(self._getters)), dtype=np.intp)
+        for column, getter in enumerate(self._getters):
+            indices[:, column] = np.fromiter(map(getter, rows), dtype=np.intp, count=count)
+        numeric = np.empty((count, len(self.numeric)))
+        for column, name in enumerate(self.numeric):
+            numeric[:, column] = np.fromiter(
+                (np.nan if (value := row.get(name)) is None else value for row in rows),
+                dtype=float,
+                count=count,
+            )
+        return indices, numeric
+
+    def predict(self, indices: np.ndarray, numeric: np.ndarray) -> np.ndarray:
+        """인코딩된 배치의 긍정적 반응 확률(%)"""
+        logits = self.bias + self.weights[indices].sum(axis=1)
+        if self.numeric:
+            columns = np.empty_like(numeric)
+            for i, (transform, _) in enumerate(self._transforms):
+                columns[:, i] = transform(numeric[:, i])
+            # 결측값은 평균으로 보아 기여도 0
+            standardized = np.nan_to_num((columns - self._mean) / self._scale, nan=0.0)
+            logits = logits + standardized @ self._numeric_weights
+        return 100.0 / (1.0 + np.exp(-logits))
+
+    def score(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """배치 점수. 배열 생성 비용이 더 큰 작은 배치는 단건 경로로 계산"""
+        if len(rows) <= SCALAR_BATCH_LIMIT:
+            return np.fromiter(map(self.score_one, rows), dtype=float, count=len(rows))
+        return self.predict(*self.encode(rows))
+
+    def score_one(self, row: Mapping[str, Any]) -> float:
+        """
+        메시지 하나의 점수. 배열을 만들지 않고 파이썬 연산만 사용해
+        배치 추론과 같은 값을 수 마이크로초 안에 계산합니다.
+        """
+        weights = self._weights_list
+        logit = self.bias
+        for getter in self._getters:
+            logit += weights[getter(row)]
+        for name, (_, transform), (mean, scale, weight) in zip(self.numeric, self._transforms, self._numeric_specs):
+            value = row.get(name)
+            if value is not None:
+                logit += (transform(value) - mean) / scale * weight
+        return 100.0 / (1.0 + math.exp(-logit))
+
+class ReactionScorer(HotReloadable[ReactionModel]):
+    """
+    프로세스당 한 번 로드한 반응 예측 모델로 후보 메시지들을 한 번에 점수화합니다.
+    모델 파일을 교체(원자적 rename)하면 다음 확인 주기에 반영되고, swap()으로 다른 파일로 바꿀 수도 있습니다.
+    """
+
+    name = "반응 예측 모델"
+    errors = (ValueError, KeyError, TypeError)
+
+    def parse(self, raw: bytes) -> ReactionModel:
+        return ReactionModel.from_dict(json.loads(raw))
+
+    def score(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """후보별 특성 dict 목록의 예측 점수 배열"""
+        return self.current().score(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        model = self.current()
+        return {"version": model.version, "weights": len(model.weights) - 1, "numeric": list(model.numeric)}
+
+reaction_scorer = ReactionScorer(
+    settings.REACTION_MODEL_PATH or DEFAULT_MODEL_PATH,
+    reload_interval=settings.REACTION_MODEL_RELOAD_INTERVAL,
+)
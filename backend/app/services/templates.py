@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from pathlib import Path
+from string import Formatter
+from typing import Dict, List, Mapping, Optional, Tuple
+import hashlib
+import json
+import random
+from app.core.config import settings
+from app.core.reload import HotReloadable
+from app.models.onboarding import StrategyType
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).resolve().parent.parent / "data" / "message_templates.json"
+
+# 템플릿에서 사용할 수 있는 치환 필드
+MESSAGE_FIELDS = frozenset({"purpose"})
+CONTEXT_FIELDS = frozenset({"duration", "closing"})
+
+class TemplateError(ValueError):
+    """템플릿 파일 형식 오류"""
+
+class UnknownToneStyle(ValueError):
+    """등록되지 않은 말투 스타일"""
+
+    def __init__(self, tone_style: str, available: Tuple[str, ...]):
+        super().__init__(f"Unknown tone_style: {tone_style}")
+        self.tone_style = tone_style
+        self.available = available
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    format 문자열을 미리 (리터럴, 필드명) 조각으로 나눠 둔 렌더링 계획.
+    렌더링 시 format 파싱 없이 조각만 이어 붙입니다.
+    """
+    source: str
+    plan: Tuple[Tuple[str, Optional[str]], ...]
+    id: str = ""
+
+    def render(self, values: Mapping[str, str]) -> str:
+        return "".join(
+            literal if field is None else literal + values[field]
+            for literal, field in self.plan
+        )
+
+    def fragments(self, values: Mapping[str, str]) -> List[str]:
+        """렌더링 결과를 리터럴/치환값 조각 단위로 반환 (스트리밍 전송용)"""
+        pieces = []
+        for literal, field in self.plan:
+            if literal:
+                pieces.append(literal)
+            if field is not None:
+                pieces.append(values[field])
+        return pieces
+
+def compile_template(source: str, allowed_fields: frozenset, id: str = "") -> CompiledTemplate:
+    """템플릿 문자열을 렌더링 계획으로 컴파일 (허용되지 않은 필드나 서식 지정은 TemplateError)"""
+    plan = []
+    try:
+        parsed = list(Formatter().parse(source))
+    except ValueError as e:
+        raise TemplateError(f"{source!r}: {e}") from e
+    for literal, field, format_spec, conversion in parsed:
+        if field is None:
+            plan.append((literal, None))
+            continue
+        if field not in allowed_fields:
+            raise TemplateError(f"{source!r}: 알 수 없는 필드 {{{field}}}")
+        if format_spec or conversion:
+            raise TemplateError(f"{source!r}: 서식 지정은 지원하지 않습니다")
+        plan.append((literal, field))
+    return CompiledTemplate(source=source, plan=tuple(plan), id=id)
+
+@dataclass(frozen=True)
+class ToneTemplates:
+    templates: Tuple[CompiledTemplate, ...]
+
+@dataclass(frozen=True)
+class TemplateSet:
+    """한 번 로드한 템플릿 파일의 불변 스냅샷 (리로드 시 통째로 교체)"""
+    version: str
+    tones: Dict[str, ToneTemplates]
+    context: CompiledTemplate
+    closings: Dict[str, str]
+    default_closing: str
+
+    def tone(self, tone_style: str) -> ToneTemplates:
+        try:
+            return self.tones[tone_style]
+        except KeyError:
+            raise UnknownToneStyle(tone_style, tuple(self.tones)) from None
+
+    def choose(self, tone_style: str, n: int) -> List[CompiledTemplate]:
+        """말투의 템플릿 n개를 (가능하면 서로 다르게) 무작위로 선택"""
+        templates = self.tone(tone_style).templates
+        if n <= len(templates):
+            return random.sample(templates, n)
+        return random.choices(templates, k=n)
+
+    def render_context(self, duration: str, strategy: Optional[str]) -> str:
+        closing = self.closings.get(strategy, self.default_closing)
+        return self.context.render({"duration": duration, "closing": closing})
+
+def compile_entry(entry, default_id: str) -> CompiledTemplate:
+    """
+    템플릿 항목 컴파일. 문자열이면 "말투.순번"을 id로 쓰고, {"id", "text"} 객체면 지정한 id를 사용
+    (순서를 바꿔도 점수 모델의 템플릿 가중치가 유지되도록)
+    """
+    if isinstance(entry, str):
+        return compile_template(entry, MESSAGE_FIELDS, id=default_id)
+    return compile_template(entry["text"], MESSAGE_FIELDS, id=str(entry["id"]))
+
+def parse_templates(raw: bytes) -> TemplateSet:
+    """템플릿 파일 내용을 검증하고 컴파일"""
+    try:
+        data = json.loads(raw)
+        tones = {
+            name: ToneTemplates(
+                templates=tuple(
+                    compile_entry(entry, f"{name}.{index}")
+                    for index, entry in enumerate(tone["templates"])
+                ),
+            )
+            for name, tone in data["tones"].items()
+        }
+        context = data["context"]
+        template_set = TemplateSet(
+            version=hashlib.sha256(raw).hexdigest()[:12],
+            tones=tones,
+            context=compile_template(context["template"], CONTEXT_FIELDS),
+            closings=dict(context.get("closings", {})),
+            default_closing=context["default_closing"],
+        )
+    except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise TemplateError(f"잘못된 템플릿 파일: {e!r}") from e
+    empty = [name for name, tone in tones.items() if not tone.templates]
+    if not tones or empty:
+        raise TemplateError(f"템플릿이 없는 말투가 있습니다: {empty or '(tones 비어 있음)'}")
+    # 맺음말은 온보딩 strategy_type 값으로 찾으므로 다른 키는 절대 쓰이지 않음
+    strategies = {strategy.value for strategy in StrategyType}
+    unknown = sorted(set(template_set.closings) - strategies)
+    if unknown:
+        raise TemplateError(f"closings에 알 수 없는 전략이 있습니다: {unknown} (가능한 값: {', '.join(sorted(strategies))})")
+    return template_set
+
+class TemplateRegistry(HotReloadable[TemplateSet]):
+    """메시지 템플릿 파일을 한 번 로드해 컴파일해 두고, 파일이 바뀌면 다시 로드합니다."""
+
+    name = "메시지 템플릿"
+    errors = (TemplateError,)
+
+    def parse(self, raw: bytes) -> TemplateSet:
+        return parse_templates(raw)
+
+    def stats(self) -> Dict[str, object]:
+        """현재 템플릿 버전과 말투별 템플릿 개수"""
+        current = self.current()
+        return {
+            "version": current.version,
+            "tones": {name: len(tone.templates) for name, tone in current.tones.items()},
+        }
+
+template_registry = TemplateRegistry(
+    settings.MESSAGE_TEMPLATES_PATH or DEFAULT_TEMPLATES_PATH,
+    reload_interval=settings.MESSAGE_TEMPLATES_RELOAD_INTERVAL,
+)
@@ -0,0 +1,244 @@
+"""
+연락 시간 추천 (요일 x 시간 7x24 히스토그램).
+
+근거는 사용자가 메시지마다 기록한 상대의 실제 반응(PUT /api/messages/{id}/reaction)이며,
+보낸 시각(created_at)의 요일*24 + 시 칸에 반응 점수(긍정 100, 중립 50, 부정 0)로 쌓습니다.
+생성 시점의 예측 반응은 보낸 시간과 무관하므로 쓰지 않습니다. 사용자별 히스토그램은 반응을 기록할 때
+리포트 통계(user_report_stats)의 "reaction_hour" 행으로 증분 갱신되고, 조회할 때 168칸 NumPy 배열로
+읽어 전체 사용자 사전 분포 쪽으로 평활합니다. 사용자 기록도 사전 분포도 없으면 추천하지 않습니다.
+
+사전 분포는 아래 배치 작업이 기록된 반응 전체를 스트리밍해 파일로 만들고, 각 워커가 리로드합니다:
+
+    python -m app.services.timing [--output PATH]
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+import argparse
+import asyncio
+import json
+import os
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.reload import HotReloadable
+from app.models.message import Message
+from app.models.report_stat import UserReportStat
+
+DEFAULT_PRIOR_PATH = Path(__file__).resolve().parent.parent / "data" / "timing_prior.json"
+
+HOUR_OF_WEEK = "reaction_hour"  # 리포트 통계 metric 이름
+DAYS = 7
+SLOTS = DAYS * 24
+# 기록된 반응의 점수 (칸 점수는 이 값의 평균)
+OUTCOME_SCORES = {"positive": 100.0, "neutral": 50.0, "negative": 0.0}
+# 기록이 전혀 없을 때의 점수 (중립)
+DEFAULT_MEAN = 50.0
+
+PRIOR_BATCH_SIZE = 5000
+
+TIMEZONE = ZoneInfo(settings.TIMING_TIMEZONE)
+
+def hour_of_week(created_at: datetime) -> int:
+    """UTC 생성 시각(naive면 UTC로 간주)을 설정 시간대의 요일*24 + 시 (월요일 0시 = 0)로 변환"""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    local = created_at.astimezone(TIMEZONE)
+    return local.weekday() * 24 + local.hour
+
+def smooth(counts: np.ndarray, sums: np.ndarray, prior_mean: np.ndarray, strength: float) -> np.ndarray:
+    """칸별 평균 반응 점수를 사전 평균 쪽으로 평활: (합계 + k*사전) / (건수 + k)"""
+    return (sums + strength * prior_mean) / (counts + strength)
+
+@dataclass(frozen=True)
+class TimingPrior:
+    """전체 사용자의 기록된 반응으로 만든 칸별 건수/반응 점수 합계와 평활한 칸별 평균"""
+    version: str
+    counts: np.ndarray
+    sums: np.ndarray
+    mean: np.ndarray
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TimingPrior":
+        counts = np.asarray(data["counts"], dtype=float)
+        sums = np.asarray(data["reaction_sums"], dtype=float)
+        if counts.shape != (SLOTS,) or sums.shape != (SLOTS,):
+            raise ValueError(f"counts/reaction_sums는 길이 {SLOTS}의 배열이어야 합니다")
+        if (counts < 0).any():
+            raise ValueError("counts는 0 이상이어야 합니다")
+        total = counts.sum()
+        overall = sums.sum() / total if total else DEFAULT_MEAN
+        # 전체 분포도 기록이 적은 칸은 전체 평균 쪽으로 평활
+        mean = smooth(counts, sums, np.full(SLOTS, overall), settings.TIMING_PRIOR_STRENGTH)
+        return cls(version=str(data["version"]), counts=counts, sums=sums, mean=mean)
+
+class TimingPriorRegistry(HotReloadable[TimingPrior]):
+    """사전 분포 파일을 로드해 두고, 배치 작업이 파일을 교체하면 다시 로드합니다."""
+
+    name = "연락 시간 사전 분포"
+    errors = (ValueError, KeyError, TypeError)
+
+    def parse(self, raw: bytes) -> TimingPrior:
+        return TimingPrior.from_dict(json.loads(raw))
+
+    def stats(self) -> Dict[str, Any]:
+        prior = self.current()
+        return {"version": prior.version, "outcomes": int(prior.counts.sum())}
+
+timing_prior = TimingPriorRegistry(
+    settings.TIMING_PRIOR_PATH or DEFAULT_PRIOR_PATH,
+    reload_interval=settings.TIMING_PRIOR_RELOAD_INTERVAL,
+)
+
+def histogram_arrays(buckets: Dict[str, Tuple[int, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """리포트 통계의 hour 행 {bucket: (건수, 합계)}를 168칸 (건수, 합계) 배열로"""
+    counts = np.zeros(SLOTS)
+    sums = np.zeros(SLOTS)
+    if buckets:
+        index = np.fromiter(map(int, buckets), dtype=np.intp, count=len(buckets))
+        values = np.array(list(buckets.values()), dtype=float)
+        counts[index] = values[:, 0]
+        sums[index] = values[:, 1]
+    return counts, sums
+
+def window_scores(scores: np.ndarray, hours: int) -> np.ndarray:
+    """각 칸에서 시작하는 hours시간 구간의 평균 점수 (일요일 밤에서 월요일로 이어짐)"""
+    return sum(np.roll(scores, -offset) for offset in range(hours)) / hours
+
+def _window(start: int, hours: int, score: float) -> Dict[str, Any]:
+    return {
+        "weekday": start // 24,
+        "start_hour": start % 24,
+        "end_hour": (start + hours) % 24,
+        "score": round(float(score), 1),
+    }
+
+def timing_source(counts: np.ndarray, prior: TimingPrior) -> str:
+    """점수의 근거: 사용자 기록(observed), 전체 사용자 기록만(prior), 기록 없음(none)"""
+    if counts.sum() > 0:
+        return "observed"
+    if prior.counts.sum() > 0:
+        return "prior"
+    return "none"
+
+def best_window(counts: np.ndarray, sums: np.ndarray, prior: Optional[TimingPrior] = None) -> Optional[Dict[str, Any]]:
+    """평활한 점수로 가장 좋은 연속 구간 (기록된 반응이 없거나 모든 구간 점수가 같으면 None)"""
+    prior = prior or timing_prior.current()
+    if timing_source(counts, prior) == "none":
+        return None
+    hours = settings.TIMING_WINDOW_HOURS
+    windows = window_scores(smooth(counts, sums, prior.mean, settings.TIMING_PRIOR_STRENGTH), hours)
+    if np.ptp(windows) < 1e-9:
+        return None
+    start = int(windows.argmax())
+    return _window(start, hours, windows[start])
+
+def _status(score: float, baseline: float) -> str:
+    margin = settings.TIMING_STATUS_MARGIN
+    if score >= baseline + margin:
+        return "good"
+    if score <= baseline - margin:
+        return "avoid"
+    return "normal"
+
+def weekly_timing(counts: np.ndarray, sums: np.ndarray, prior: Optional[TimingPrior] = None) -> Dict[str, Any]:
+    """
+    요일/시간별 평활 점수와 요일별 추천 구간. 요일 상태(good/normal/avoid)는 그날 가장 좋은
+    구간 점수를 한 주 평균과 비교해 정합니다 (하루 평균은 새벽 시간대에 묻혀 차이가 드러나지 않음).
+    기록된 반응이 전혀 없으면(source="none") 요일 상태와 추천 구간을 만들지 않습니다.
+    """
+    prior = prior or timing_prior.current()
+    source = timing_source(counts, prior)
+    hours = settings.TIMING_WINDOW_HOURS
+    scores = smooth(counts, sums, prior.mean, settings.TIMING_PRIOR_STRENGTH)
+    windows = window_scores(scores, hours)
+    grid = scores.reshape(DAYS, 24)
+    baseline = float(scores.mean())
+    days = []
+    if source != "none":
+        for weekday in range(DAYS):
+            start = weekday * 24 + int(windows[weekday * 24:(weekday + 1) * 24].argmax())
+            days.append({
+                "weekday": weekday,
+                "status": _status(float(windows[start]), baseline),
+                "best": _window(start, hours, windows[start]),
+            })
+    return {
+        "timezone": settings.TIMING_TIMEZONE,
+        "source": source,
+        "prior_version": prior.version,
+        "prior_outcome_count": int(prior.counts.sum()),
+        "outcome_count": int(counts.sum()),
+        "counts": counts.reshape(DAYS, 24).astype(int).tolist(),
+        "scores": np.round(grid, 1).tolist(),
+        "days": days,
+        "best": best_window(counts, sums, prior),
+    }
+
+async def get_weekly_timing(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """사용자의 hour 통계 행(최대 168행)만 읽어 주간 연락 시간 추천을 만듭니다."""
+    result = await db.execute(
+        select(UserReportStat.bucket, UserReportStat.count, UserReportStat.total).where(
+            UserReportStat.user_id == user_id,
+            UserReportStat.metric == HOUR_OF_WEEK
+        )
+    )
+    counts, sums = histogram_arrays({bucket: (count, total) for bucket, count, total in result})
+    return weekly_timing(counts, sums)
+
+async def compute_prior(db: AsyncSession, batch_size: int = PRIOR_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    반응이 기록된 메시지를 서버 측 커서로 batch_size개씩 스트리밍하며 칸별 건수/반응 점수 합계를
+    np.bincount로 누적합니다 (메모리는 배치 크기만큼만 사용).
+    """
+    counts = np.zeros(SLOTS)
+    sums = np.zeros(SLOTS)
+    result = await db.stream(
+        select(Message.created_at, Message.reaction)
+        .where(Message.reaction.is_not(None))
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        slots = np.fromiter((hour_of_week(created_at) for created_at, _ in partition), dtype=np.intp, count=len(partition))
+        reactions = np.fromiter((OUTCOME_SCORES[reaction] for _, reaction in partition), dtype=float, count=len(partition))
+        counts += np.bincount(slots, minlength=SLOTS)
+        sums += np.bincount(slots, weights=reactions, minlength=SLOTS)
+    return {
+        "version": datetime.utcnow().strftime("prior-%Y%m%d%H%M%S"),
+        "timezone": settings.TIMING_TIMEZONE,
+        "counts": counts.astype(int).tolist(),
+        "reaction_sums": np.round(sums, 4).tolist(),
+    }
+
+def write_prior(path: Union[str, Path], data: Dict[str, Any]) -> None:
+    """검증 후 임시 파일에 쓰고 rename으로 교체 (리로드하는 워커가 쓰다 만 파일을 읽지 않도록)"""
+    TimingPrior.from_dict(data)
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+def main() -> None:
+    from app.db.database import AsyncSessionLocal, engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=str(settings.TIMING_PRIOR_PATH or DEFAULT_PRIOR_PATH))
+    parser.add_argument("--batch-size", type=int, default=PRIOR_BATCH_SIZE)
+    args = parser.parse_args()
+
+    async def run() -> Dict[str, Any]:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await compute_prior(db, args.batch_size)
+        finally:
+            await engine.dispose()
+
+    data = asyncio.run(run())
+    write_prior(args.output, data)
+    print(f"사전 분포 {data['version']} ({sum(data['counts'])}개 반응) -> {args.output}")
+
+if __name__ == "__main__":
+    main()
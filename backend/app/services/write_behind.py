@@ -0,0 +1,291 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import asyncio
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.message import Message
+from app.services.report import record_messages
+
+logger = logging.getLogger(__name__)
+
+SPILL_PREFIX = "messages-"
+# 파일 이름의 소유자 키 "<호스트>-<pid>-<무작위 값>"에 쓰는 호스트 이름 (구분자 '.'은 제외)
+SPILL_HOST = re.sub(r"[^A-Za-z0-9-]", "_", socket.gethostname()) or "host"
+
+class WriteBufferFull(Exception):
+    """버퍼가 가득 차 제한 시간 안에 자리가 나지 않음"""
+
+def _parse_owner(owner: str) -> Optional[Tuple[str, int, str]]:
+    """소유자 키를 (호스트, pid, 무작위 값)으로 (pid만 있는 이전 형식은 이 호스트의 파일로 봄)"""
+    if owner.isdigit():
+        return SPILL_HOST, int(owner), ""
+    parts = owner.rsplit("-", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return None
+    return parts[0], int(parts[1]), parts[2]
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MessageWriteBuffer:
+    """
+    생성된 메시지를 메모리에 모았다가 batch_size개가 쌓이거나 flush_interval초가 지나면
+    여러 행 INSERT 한 번으로 저장하는 write-behind 버퍼 (워커 프로세스당 하나).
+    - DB에 쓰지 못한 배치는 spill_dir의 프로세스별 JSONL 파일에 fsync로 남기고,
+      다음 저장이 성공하면 파일의 행을 한 트랜잭션으로 다시 넣은 뒤 파일을 지웁니다.
+      기동 시에는 같은 호스트에서 종료된 프로세스가 남긴 파일도 가져와 다시 넣습니다.
+      파일 소유자는 호스트 이름, pid와 프로세스마다 만든 무작위 값으로 구분하므로, 컨테이너마다
+      워커가 pid 1이어도 재시작 전 프로세스의 파일을 자신의 것으로 착각하지 않습니다.
+    - 대기 행이 max_pending을 넘으면 put_timeout초까지 자리를 기다리고, 그래도 없으면 WriteBufferFull.
+    - close()는 남은 행을 모두 저장(또는 spill)한 뒤 반환합니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        put_timeout: float = 1.0,
+        spill_dir: Optional[Union[str, Path]] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._rows: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self._spill_files: List[Path] = []
+        self._nonce = secrets.token_hex(4)
+        self.spilled_rows = 0
+        self.counters = {"submitted": 0, "flushed": 0, "batches": 0, "failed_batches": 0, "replayed": 0, "rejected": 0}
+
+    @property
+    def _owner(self) -> str:
+        # fork한 워커는 무작위 값이 같아도 pid가 달라 키가 구분됨
+        return f"{SPILL_HOST}-{os.getpid()}-{self._nonce}"
+
+    @property
+    def _spill_path(self) -> Path:
+        return self.spill_dir / f"{SPILL_PREFIX}{self._owner}.jsonl"
+
+    def start(self) -> None:
+        """현재 이벤트 루프에서 주기적 저장 작업 시작 (종료된 프로세스의 spill 파일도 가져옴)"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._closing = False
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._adopt_spill_files()
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """행을 버퍼에 추가 (자리가 없으면 put_timeout초까지 기다린 뒤 WriteBufferFull)"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.put_timeout
+        # 버퍼가 비어 있으면 상한보다 큰 묶음도 받음
+        while self._rows and len(self._rows) + len(rows) > self.max_pending:
+            self._space.clear()
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                self.counters["rejected"] += 1
+                raise WriteBufferFull(f"{len(self._rows)}개 행이 저장 대기 중입니다") from None
+        self._rows.extend(rows)
+        self.counters["submitted"] += len(rows)
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """대기 중인 행을 모두 저장. 실패한 배치는 spill 파일로 (spill할 수 없으면 버퍼에 유지)"""
+        if self._lock is None:
+            return
+        async with self._lock:
+            failed = False
+            while self._rows:
+                batch = self._rows[:self.batch_size]
+                del self._rows[:self.batch_size]
+                if not failed and await self._insert([batch]):
+                    self.counters["batches"] += 1
+                    self.counters["flushed"] += len(batch)
+                    self._space.set()
+                    continue
+                # DB가 실패하면 이번 주기의 나머지 배치는 다시 시도하지 않고 바로 spill
+                failed = True
+                self.counters["failed_batches"] += 1
+                if not await self._spill(batch):
+                    self._rows[:0] = batch
+                    break
+                self._space.set()
+            if not failed and self._spill_files:
+                await self._replay()
+
+    async def close(self) -> None:
+        """남은 행을 저장하고 주기 작업 종료"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._rows),
+            "max_pending": self.max_pending,
+            "spilled_rows": self.spilled_rows,
+            **self.counters,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("메시지 저장 중 예기치 않은 오류")
+            if self._closing:
+                return
+
+    async def _insert(self, batches: List[List[Dict[str, Any]]]) -> bool:
+        """배치들을 한 트랜잭션으로 저장 (배치마다 여러 행 INSERT 한 문장)"""
+        try:
+            async with self.session_factory() as db:
+                for batch in batches:
+                    # render_nulls: warning이 None인 행과 아닌 행이 섞여도 INSERT 하나로 묶음
+                    await db.execute(insert(Message).execution_options(render_nulls=True), batch)
+                # 리포트 통계도 같은 트랜잭션에서 한 번에 갱신
+                await record_messages(db, (row for batch in batches for row in batch))
+                await db.commit()
+            return True
+        except (SQLAlchemyError, OSError):
+            logger.exception("메시지 %d개 저장 실패", sum(map(len, batches)))
+            return False
+
+    async def _spill(self, batch: List[Dict[str, Any]]) -> bool:
+        if self.spill_dir is None:
+            return False
+        path = self._spill_path
+        try:
+            await asyncio.to_thread(self._append, path, batch)
+        except OSError:
+            logger.exception("메시지 spill 파일 쓰기 실패: %s", path)
+            return False
+        if path not in self._spill_files:
+            self._spill_files.append(path)
+        self.spilled_rows += len(batch)
+        logger.warning("메시지 %d개를 %s에 임시 저장", len(batch), path)
+        return True
+
+    @staticmethod
+    def _append(path: Path, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False) + "\n"
+            for row in batch
+        )
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _read(path: Path) -> List[Dict[str, Any]]:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # 쓰는 도중 프로세스가 죽어 잘린 마지막 줄
+                    logger.warning("spill 파일의 잘린 행 무시: %s", path)
+                    continue
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+                rows.append(row)
+        return rows
+
+    async def _replay(self) -> None:
+        """spill 파일의 행을 한 트랜잭션으로 다시 저장하고 성공하면 파일 삭제"""
+        files = list(self._spill_files)
+        try:
+            rows = [row for path in files for row in await asyncio.to_thread(self._read, path)]
+        except OSError:
+            logger.exception("spill 파일 읽기 실패")
+            return
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        if batches and not await self._insert(batches):
+            return
+        for path in files:
+            path.unlink(missing_ok=True)
+            self._spill_files.remove(path)
+        self.spilled_rows = 0
+        self.counters["replayed"] += len(rows)
+        if rows:
+            logger.info("spill 파일의 메시지 %d개 저장 완료", len(rows))
+
+    def _adopt_spill_files(self) -> None:
+        """
+        자신의 파일과, 같은 호스트에서 종료된 프로세스가 남긴 파일을 이 프로세스의 replay 대상으로 가져옴.
+        pid가 자신과 같은데 무작위 값이 다르면 같은 pid를 썼던 이전 프로세스(컨테이너 재시작)의 파일입니다.
+        """
+        own = self._owner
+        pid = os.getpid()
+        for path in sorted(self.spill_dir.glob(f"{SPILL_PREFIX}*.jsonl")):
+            owner = path.name[len(SPILL_PREFIX):].split(".", 1)[0]
+            parsed = _parse_owner(owner)
+            if parsed is None:
+                continue
+            if owner != own:
+                host, owner_pid, _ = parsed
+                if host != SPILL_HOST or (owner_pid != pid and _pid_alive(owner_pid)):
+                    continue
+                claimed = path.with_name(f"{SPILL_PREFIX}{own}.from-{path.name}")
+                try:
+                    # rename은 원자적이므로 여러 워커가 동시에 기동해도 한 곳만 가져감
+                    os.rename(path, claimed)
+                except OSError:
+                    continue
+                path = claimed
+            if path not in self._spill_files:
+                self._spill_files.append(path)
+                with open(path, encoding="utf-8") as f:
+                    self.spilled_rows += sum(1 for _ in f)
+
+message_write_buffer = MessageWriteBuffer(
+    AsyncSessionLocal,
+    batch_size=settings.MESSAGE_FLUSH_BATCH_SIZE,
+    flush_interval=settings.MESSAGE_FLUSH_INTERVAL,
+    max_pending=settings.MESSAGE_BUFFER_MAX_PENDING,
+    put_timeout=settings.MESSAGE_BUFFER_PUT_TIMEOUT,
+    spill_dir=settings.MESSAGE_SPILL_DIR,
+) if settings.MESSAGE_WRITE_BEHIND else None
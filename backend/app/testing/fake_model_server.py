@@ -0,0 +1,110 @@
+"""
+테스트와 부하 측정용 가짜 모델 서버. HttpModelBackend와 같은 규약으로 응답하며
+지연 시간과 실패율을 지정할 수 있습니다.
+
+    python -m app.testing.fake_model_server --port 9000 --latency 0.2 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+class GenerateRequest(BaseModel):
+    purpose: str
+    tone_style: str
+    n: int = Field(1, ge=1, le=10)
+    context: str = ""
+    features: Dict[str, Any] = Field(default_factory=dict)
+
+_CHUNK = re.compile(r"\S+\s*|\s+")
+
+def create_app(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    seed: Optional[int] = None,
+    model_version: str = "fake-1",
+    chunk_delay: float = 0.0,
+) -> FastAPI:
+    """
+    latency초(+0~jitter초) 뒤에 응답하고 failure_rate 확률로 503을 반환하는 앱.
+    스트리밍(/generate/stream)은 본문을 단어 단위 조각으로 나눠 조각마다 chunk_delay초 간격으로 보냅니다.
+    app.state.calls에 받은 요청 수가 쌓이고, 실행 중에 app.state의 값을 바꿔 동작을 조절할 수 있습니다.
+    """
+    app = FastAPI(title="Fake model server")
+    app.state.latency = latency
+    app.state.jitter = jitter
+    app.state.failure_rate = failure_rate
+    app.state.model_version = model_version
+    app.state.chunk_delay = chunk_delay
+    app.state.calls = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+    rng = random.Random(seed)
+
+    @app.get("/version")
+    async def version() -> Dict[str, str]:
+        return {"model_version": app.state.model_version}
+
+    def candidate(request: GenerateRequest, i: int) -> str:
+        return f"[{request.tone_style}#{i}] {request.purpose}{request.context}"
+
+    async def admit() -> None:
+        """latency초(+0~jitter초) 기다린 뒤 failure_rate 확률로 503"""
+        state = app.state
+        delay = state.latency + rng.uniform(0, state.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < state.failure_rate:
+            raise HTTPException(status_code=503, detail="model overloaded")
+
+    @app.post("/generate")
+    async def generate(request: GenerateRequest) -> Dict[str, Any]:
+        state = app.state
+        state.calls += 1
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            await admit()
+            candidates: List[Dict[str, str]] = [{"text": candidate(request, i)} for i in range(request.n)]
+            return {"model_version": state.model_version, "candidates": candidates}
+        finally:
+            state.in_flight -= 1
+
+    @app.post("/generate/stream")
+    async def generate_stream(request: GenerateRequest) -> StreamingResponse:
+        state = app.state
+        state.calls += 1
+        await admit()
+
+        async def lines() -> AsyncIterator[str]:
+            for i, chunk in enumerate(_CHUNK.findall(candidate(request, 0))):
+                if i and state.chunk_delay:
+                    await asyncio.sleep(state.chunk_delay)
+                yield json.dumps({"model_version": state.model_version, "text": chunk}, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_app(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, chunk_delay=args.chunk_delay)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
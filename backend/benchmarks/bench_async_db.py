@@ -0,0 +1,162 @@
+"""
+동시 부하에서 동기 Session(이전 방식)과 AsyncSession(현재 방식)의 p99 지연을 비교합니다.
+
+    python -m benchmarks.bench_async_db --concurrency 50 --requests 500 --latency 0.005
+
+기본값은 SQLite 파일이며 `pg_sleep`을 등록해 Postgres 왕복 지연을 흉내냅니다.
+--database-url 로 실제 Postgres를 지정하면 내장 pg_sleep이 그대로 사용됩니다.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import Base, to_async_url  # noqa: E402
+from app.models import User  # noqa: E402
+
+BENCH_EMAIL = "bench@example.com"
+
+
+def _register_pg_sleep(dbapi_connection, connection_record):
+    # SQLite에는 pg_sleep이 없으므로 DB 드라이버 스레드에서 잠드는 함수로 대체
+    dbapi_connection.create_function("pg_sleep", 1, time.sleep)
+
+
+def build_app(database_url: str, latency: float) -> FastAPI:
+    # 두 경로 모두 동시성보다 넉넉한 풀을 사용해 풀 대기 시간이 결과를 왜곡하지 않도록 함
+    sync_engine = create_engine(database_url, pool_size=20, max_overflow=20)
+    async_engine = create_async_engine(
+        to_async_url(database_url),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=20,
+        max_overflow=20,
+    )
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _register_pg_sleep)
+        event.listen(async_engine.sync_engine, "connect", _register_pg_sleep)
+
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(sync_engine) as db:
+        if db.scalar(select(User).where(User.email == BENCH_EMAIL)) is None:
+            db.add(User(email=BENCH_EMAIL, username="bench", hashed_password="x"))
+            db.commit()
+
+    SyncSessionLocal = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy(db: Session = Depends(get_sync_db)):
+        # 이전 방식: async def 안에서 동기 Session 사용 -> 이벤트 루프가 막힘
+        db.execute(select(func.pg_sleep(latency)))
+        user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        return {"id": user.id}
+
+    @app.get("/async")
+    async def async_path(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(select(func.pg_sleep(latency)))
+        user = await db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        return {"id": user.id}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.state.engines = (sync_engine, async_engine)
+    return app
+
+
+async def run_load(client: AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    db_latencies, health_latencies = [], []
+
+    async def one(target: str, bucket: list):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(target)
+            response.raise_for_status()
+            bucket.append(time.perf_counter() - start)
+
+    # DB 요청과 DB를 쓰지 않는 요청을 섞어 이벤트 루프 정체가 다른 요청에 주는 영향도 측정
+    tasks = []
+    for i in range(total):
+        tasks.append(one(path, db_latencies))
+        if i % 5 == 0:
+            tasks.append(one("/health", health_latencies))
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {
+        "db": db_latencies,
+        "health": health_latencies,
+        "throughput": total / elapsed,
+    }
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, result: dict):
+    for kind in ("db", "health"):
+        values = result[kind]
+        print(
+            f"{label:<8} {kind:<7} n={len(values):<5} "
+            f"p50={statistics.median(values) * 1000:8.2f}ms "
+            f"p99={percentile(values, 99) * 1000:8.2f}ms"
+        )
+    print(f"{label:<8} throughput={result['throughput']:.1f} req/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.005, help="쿼리당 DB 왕복 지연(초)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    app = build_app(database_url, args.latency)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (("before", "/legacy"), ("after", "/async")):
+            await run_load(client, path, min(args.requests, 20), args.concurrency)  # 워밍업
+            report(label, await run_load(client, path, args.requests, args.concurrency))
+
+    sync_engine, async_engine = app.state.engines
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+긍정적 반응 예측 모델의 단건/배치 추론 시간을 측정합니다.
+
+    python -m benchmarks.bench_scoring --batch 1 10 100 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scoring import DEFAULT_MODEL_PATH, ReactionScorer  # noqa: E402
+
+TONES = ("logical", "emotional", "curious")
+
+
+def make_rows(count: int):
+    today = date.today()
+    return [
+        {
+            "tone_style": TONES[i % 3],
+            "template": f"{TONES[i % 3]}.{i % 3}",
+            "my_tendency": "analytical",
+            "partner_tendency": "emotional" if i % 2 else "analytical",
+            "breakup_reason": "의사소통 문제",
+            "strategy_type": "balanced",
+            "relationship_months": 6 + i % 48,
+            "days_since_breakup": (today - (today - timedelta(days=10 + i % 300))).days,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(fn, repeat: int) -> float:
+    """한 번 호출의 최소 시간(초)"""
+    number = max(1, repeat)
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    model = ReactionScorer(args.model, reload_interval=-1).current()
+    row = make_rows(1)[0]
+    single = measure(lambda: model.score_one(row), 20000)
+    print(f"model {model.version}")
+    print(f"score_one          {single * 1e6:8.2f} us")
+    for size in args.batch:
+        rows = make_rows(size)
+        elapsed = measure(lambda: model.score(rows), max(1, 2000 // size))
+        print(f"batch {size:>5}        {elapsed * 1e6:8.2f} us  ({elapsed * 1e6 / size:6.2f} us/message)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+미션 목록 응답의 조회+직렬화 비용을 1,000개 기준으로 비교합니다.
+
+- orm+schema+json: ORM 객체 -> MissionResponse 검증/덤프 -> 표준 json (기존 경로)
+- orm+schema+orjson: 같은 경로에서 렌더링만 orjson
+- core+orjson: 컬럼 튜플 -> dict -> orjson (현재 read_missions 경로)
+
+    python -m benchmarks.bench_serialization --missions 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.missions import MISSION_COLUMNS  # noqa: E402
+from app.core.responses import FastJSONResponse, row_dicts  # noqa: E402
+from app.db.database import Base  # noqa: E402
+from app.models.mission import Mission  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.mission import MissionResponse  # noqa: E402
+
+MISSIONS = TypeAdapter(List[MissionResponse])
+
+
+def measure(fn, number: int) -> float:
+    """한 번 호출의 최소 시간(초)"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def seed(count: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    now = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": 1, "email": "a@example.com", "username": "a", "hashed_password": "x"}])
+        db.execute(insert(Mission), [
+            {
+                "title": f"mission {i}",
+                "description": "설명 " * 10,
+                "is_completed": i % 3 == 0,
+                "user_id": 1,
+                "created_at": now + timedelta(seconds=i),
+                "updated_at": now + timedelta(seconds=i, minutes=5) if i % 2 else None,
+            }
+            for i in range(count)
+        ])
+        db.commit()
+    return engine
+
+
+def orm_schema(engine, response_class):
+    with Session(engine) as db:
+        missions = db.scalars(select(Mission).where(Mission.user_id == 1).order_by(Mission.created_at, Mission.id)).all()
+        content = MISSIONS.dump_python(MISSIONS.validate_python(missions, from_attributes=True), mode="json")
+        return response_class(content).body
+
+
+def core_rows(engine):
+    columns = Mission.__table__.c
+    with engine.connect() as conn:
+        result = conn.execute(select(*MISSION_COLUMNS).where(columns.user_id == 1).order_by(columns.created_at, columns.id))
+        return FastJSONResponse(row_dicts(result.keys(), result.all())).body
+
+
+def serialize_only(engine):
+    """조회 비용을 뺀 직렬화만의 비용"""
+    with Session(engine) as db:
+        missions = db.scalars(select(Mission).order_by(Mission.id)).all()
+        db.expunge_all()
+    with engine.connect() as conn:
+        result = conn.execute(select(*MISSION_COLUMNS).order_by(Mission.__table__.c.id))
+        keys, rows = result.keys(), result.all()
+    return {
+        "orm+schema+json": lambda: JSONResponse(MISSIONS.dump_python(MISSIONS.validate_python(missions, from_attributes=True), mode="json")).body,
+        "orm+schema+orjson": lambda: FastJSONResponse(MISSIONS.dump_python(MISSIONS.validate_python(missions, from_attributes=True), mode="json")).body,
+        "core+orjson": lambda: FastJSONResponse(row_dicts(keys, rows)).body,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = seed(args.missions)
+    # 세 경로의 응답 본문이 같은지 먼저 확인
+    assert orm_schema(engine, FastJSONResponse) == core_rows(engine)
+
+    print(f"{args.missions} missions, serialization only")
+    for name, fn in serialize_only(engine).items():
+        print(f"  {name:<20} {measure(fn, args.number) * 1e3:8.2f} ms")
+    print(f"{args.missions} missions, fetch + serialization (in-memory SQLite)")
+    for name, fn in (
+        ("orm+schema+json", lambda: orm_schema(engine, JSONResponse)),
+        ("orm+schema+orjson", lambda: orm_schema(engine, FastJSONResponse)),
+        ("core+orjson", lambda: core_rows(engine)),
+    ):
+        print(f"  {name:<20} {measure(fn, args.number) * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
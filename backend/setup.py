@@ -4,9 +4,14 @@ setup(
     name="re_connect",
     version="0.1",
     packages=find_packages(),
+    package_data={"app": ["data/*.json"]},
     install_requires=[
         "fastapi",
-        "sqlalchemy",
+        "sqlalchemy[asyncio]",
+        "asyncpg",
+        "aiosqlite",
+        "numpy",
+        "orjson",
         "pydantic",
         "python-jose",
         "passlib",
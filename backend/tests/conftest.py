@@ -1,15 +1,31 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from unittest.mock import patch
+from sqlalchemy.pool import NullPool, StaticPool
+
+# 앱 import 전에 테스트용 데이터베이스를 지정 (aiosqlite로 변환되어 사용됨)
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# 테스트 속도를 위해 bcrypt 비용 인자를 최소값으로
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+# 테스트는 fixture에서 metadata로 테이블을 만들므로 Alembic 리비전 확인 생략
+os.environ.setdefault("SCHEMA_CHECK", "off")
+os.environ.setdefault("METRICS_TOKEN", "test-metrics-token")
 
 from app.main import app
-from app.db.database import Base, get_db
+from app.db.database import Base, get_db, get_session_factory
 from app.models.user import User
 from app.core.security import create_access_token
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, principal_cache
+from app.services.generation import generation_cache
+from app.services.goals import recommended_goals_cache
+
+# 내부 지표(/api/metrics) 조회용 헤더
+METRICS_HEADERS = {"X-Metrics-Token": "test-metrics-token"}
 
 # 테스트용 데이터베이스 설정
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -21,6 +37,17 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 앱 요청은 같은 파일을 aiosqlite로 여는 비동기 세션을 사용
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db",
+    poolclass=NullPool,
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 @pytest.fixture(scope="function")
 def db():
     # 테스트용 데이터베이스 테이블 생성
@@ -38,13 +65,16 @@ def db():
 @pytest.fixture(scope="function")
 def client(db):
     # 테스트용 데이터베이스 세션을 사용하도록 의존성 오버라이드
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
+    # 테스트 간에 인증 캐시가 공유되지 않도록 초기화
+    principal_cache.clear()
+    generation_cache.clear()
+    recommended_goals_cache.clear()
     
     # 테스트 클라이언트 생성
     with TestClient(app) as test_client:
@@ -69,7 +99,7 @@ def test_user(db):
 
 @pytest.fixture(scope="function")
 def auth_headers(test_user):
-    access_token = create_access_token(data={"email": test_user.email})
+    access_token = create_access_token(data={"sub": test_user.email})
     return {"Authorization": f"Bearer {access_token}"}
 
 @pytest.fixture(scope="function")
@@ -92,7 +122,18 @@ def mock_auth(test_user):
     app.dependency_overrides.pop(get_current_user, None)
 
 @pytest.fixture(scope="function")
-def mock_auth_patch(test_user):
-    """unittest.mock.patch를 사용한 인증 모킹"""
-    with patch("app.core.deps.get_current_user", return_value=test_user):
-        yield 
\ No newline at end of file
+def mock_auth_patch(mock_auth):
+    """인증 모킹 (FastAPI는 의존성을 등록 시점에 캡처하므로 patch 대신 의존성 오버라이드 사용)"""
+    yield 
+
+@pytest.fixture(scope="function")
+def sql_statements():
+    """앱 요청이 실행한 SQL 문을 순서대로 기록 (DB 왕복 횟수 확인용)"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.orm import Session
+from app.core import security
+from app.models.user import User
+
+SIGNUP_DATA = {
+    "email": "auth@example.com",
+    "username": "authuser",
+    "password": "password123",
+    "full_name": "Auth User"
+}
+
+def login(client: TestClient, password: str = "password123"):
+    return client.post(
+        "/api/auth/login",
+        data={"username": SIGNUP_DATA["email"], "password": password}
+    )
+
+def test_signup_and_login_through_hash_pool(client: TestClient, db: Session):
+    response = client.post("/api/auth/signup", json=SIGNUP_DATA)
+    assert response.status_code == 200
+
+    db_user = db.query(User).filter(User.email == SIGNUP_DATA["email"]).first()
+    assert db_user.hashed_password.startswith("$2b$04$")
+
+    assert login(client).status_code == 200
+    assert login(client, "wrong-password").status_code == 401
+
+def test_login_rehashes_old_cost_factor(client: TestClient, db: Session, monkeypatch):
+    # 프로세스 풀 대신 현재 프로세스의 스레드풀에서 실행해 해싱 컨텍스트 교체가 반영되도록 함
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(security, "_hash_executor", None)
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("password123")
+    db.add(User(email=SIGNUP_DATA["email"], username="authuser", hashed_password=old_hash))
+    db.commit()
+
+    monkeypatch.setattr(
+        security,
+        "_pwd_context",
+        CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    )
+    assert login(client).status_code == 200
+
+    db.expire_all()
+    db_user = db.query(User).filter(User.email == SIGNUP_DATA["email"]).first()
+    assert db_user.hashed_password.startswith("$2b$05$")
+
+def test_login_rejected_when_hash_queue_is_full(client: TestClient, monkeypatch):
+    monkeypatch.setattr(security, "_hash_pending", security.settings.PASSWORD_HASH_MAX_PENDING)
+
+    response = client.post("/api/auth/signup", json=SIGNUP_DATA)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(security.settings.PASSWORD_HASH_RETRY_AFTER)
@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.mission import Mission
+from app.models.user import User
+from app.models.user_profile import UserProfile
+
+ONBOARDING = {
+    "breakup_date": "2024-01-01",
+    "relationship_years": 1,
+    "relationship_months": 3,
+    "my_tendency": "analytical",
+    "partner_tendency": "emotional",
+    "breakup_reason": "외부 요인 (거리, 환경)",
+    "strategy_type": "balanced",
+}
+
+def seed(client: TestClient, db: Session, user: User):
+    db.add(UserProfile(user_id=user.id, bio="hi", onboarding_completed=2))
+    db.add_all([
+        Mission(title="open 1", user_id=user.id),
+        Mission(title="done", user_id=user.id, is_completed=True),
+        Mission(title="open 2", user_id=user.id),
+    ])
+    db.commit()
+    client.post("/api/onboarding/complete", json=ONBOARDING)
+
+def test_bootstrap_returns_everything_in_two_queries(auth_client: TestClient, db: Session, test_user: User, sql_statements):
+    seed(auth_client, db, test_user)
+    # 인증 캐시를 채운 뒤 측정
+    auth_client.get("/api/users/me")
+    sql_statements.clear()
+
+    response = auth_client.get("/api/bootstrap/")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(sql_statements) == 2
+    assert data["user"]["email"] == test_user.email
+    assert data["profile"]["bio"] == "hi"
+    assert data["onboarding"]["strategy_type"] == "balanced"
+    assert [mission["title"] for mission in data["missions"]] == ["open 1", "open 2"]
+    assert [goal["name"] for goal in data["recommended_goals"]] == ["재회", "성장", "자기 이해"]
+
+def test_bootstrap_field_selection(auth_client: TestClient, db: Session, test_user: User, sql_statements):
+    seed(auth_client, db, test_user)
+    auth_client.get("/api/users/me")
+    sql_statements.clear()
+
+    # 사용자 정보는 인증 캐시에서, 추천 목표만 필요하면 온보딩만 JOIN
+    assert set(auth_client.get("/api/bootstrap/?fields=user").json()) == {"user"}
+    assert sql_statements == []
+    data = auth_client.get("/api/bootstrap/", params={"fields": "profile, recommended_goals"}).json()
+    assert set(data) == {"profile", "recommended_goals"}
+    assert len(sql_statements) == 1
+
+    # 추천 목표는 프로세스 캐시 대신 온보딩 JOIN 한 번으로 (다른 워커의 저장도 바로 반영)
+    sql_statements.clear()
+    auth_client.get("/api/bootstrap/?fields=recommended_goals,user")
+    assert len(sql_statements) == 1 and "JOIN onboarding" in sql_statements[0]
+
+    response = auth_client.get("/api/bootstrap/?fields=user,settings")
+    assert response.status_code == 400
+
+def test_bootstrap_without_onboarding(client: TestClient, mock_auth):
+    data = client.get("/api/bootstrap/?fields=profile,onboarding,missions,recommended_goals").json()
+    assert data["profile"] is None
+    assert data["onboarding"] is None
+    assert data["missions"] == []
+    assert len(data["recommended_goals"]) == 4
@@ -0,0 +1,324 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.services import message_service
+from app.services.generation import (
+    CircuitBreaker,
+    GeneratedText,
+    GenerationCache,
+    GenerationRequest,
+    GuardedBackend,
+    HttpModelBackend,
+    TemplateBackend,
+)
+from app.testing.fake_model_server import create_app
+from conftest import METRICS_HEADERS
+
+REQUEST = GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="logical", n=2)
+
+def make_backend(fake_app, timeout=1.0, max_concurrency=8, hedge_delay=None, failures=3, reset=30.0):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_app), base_url="http://model")
+    return GuardedBackend(
+        HttpModelBackend("http://model", timeout=timeout, client=client),
+        fallback=TemplateBackend(),
+        timeout=timeout,
+        max_concurrency=max_concurrency,
+        hedge_delay=hedge_delay,
+        breaker=CircuitBreaker(failures, reset),
+    )
+
+def test_model_backend_returns_candidates():
+    backend = make_backend(create_app())
+    results = asyncio.run(backend.generate(REQUEST))
+    assert [r.template_id for r in results] == ["model:fake-1", "model:fake-1"]
+    assert "".join(results[0].fragments) == "[logical#0] 안부를 묻고 싶어요"
+    assert backend.stats()["successes"] == 1
+
+def test_slow_model_falls_back_to_templates():
+    backend = make_backend(create_app(latency=0.5), timeout=0.05)
+    started = time.monotonic()
+    results = asyncio.run(backend.generate(REQUEST))
+    assert time.monotonic() - started < 0.4
+    assert all(r.template_id.startswith("logical.") for r in results)
+    assert backend.stats()["timeouts"] == 1
+    assert backend.stats()["fallbacks"] == 1
+
+def test_hedged_request_after_failure():
+    fake = create_app(failure_rate=0.5, seed=3)
+    backend = make_backend(fake, hedge_delay=0.2)
+
+    async def run():
+        return [await backend.generate(REQUEST) for _ in range(10)]
+
+    asyncio.run(run())
+    stats = backend.stats()
+    assert stats["hedges"] > 0
+    assert fake.state.calls == 10 + stats["hedges"]
+    # 두 번 모두 실패한 경우만 템플릿으로 대체
+    assert stats["fallbacks"] == stats["failures"] < stats["hedges"]
+
+def test_breaker_opens_and_recovers():
+    fake = create_app(failure_rate=1.0)
+    backend = make_backend(fake, failures=2, reset=0.05)
+
+    async def run():
+        for _ in range(4):
+            await backend.generate(REQUEST)
+        assert backend.breaker.state == "open"
+        assert fake.state.calls == 2
+        fake.state.failure_rate = 0.0
+        await asyncio.sleep(0.06)
+        assert backend.breaker.state == "half_open"
+        return await backend.generate(REQUEST)
+
+    results = asyncio.run(run())
+    assert results[0].template_id == "model:fake-1"
+    assert backend.breaker.state == "closed"
+    assert backend.stats()["rejected"] == 2
+
+def test_half_open_probe_released_when_shed_or_cancelled():
+    fake = create_app(failure_rate=1.0, latency=0.05)
+    backend = make_backend(fake, max_concurrency=1, failures=1, reset=0.01)
+
+    async def run():
+        await backend.generate(REQUEST)
+        await asyncio.sleep(0.02)
+        # 자리가 없어 바로 대체된 요청은 시험 호출 자리를 잡지 않음
+        fake.state.failure_rate = 0.0
+        busy = asyncio.create_task(backend.generate(REQUEST))
+        await asyncio.sleep(0)
+        shed = await backend.generate(REQUEST)
+        assert shed[0].template_id.startswith("logical.")
+        assert backend.stats()["shed"] == 1
+        # 취소된 시험 호출도 자리를 반환
+        busy.cancel()
+        try:
+            await busy
+        except asyncio.CancelledError:
+            pass
+        assert backend.breaker.state == "half_open"
+        await asyncio.sleep(0.01)  # 취소된 호출 태스크가 세마포어 자리를 반환할 때까지
+        return await backend.generate(REQUEST)
+
+    results = asyncio.run(run())
+    assert results[0].template_id == "model:fake-1"
+    assert backend.breaker.state == "closed"
+    assert backend.stats()["in_flight"] == 0
+
+def test_saturated_backend_sheds_to_templates():
+    fake = create_app(latency=0.05)
+    backend = make_backend(fake, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(backend.generate(REQUEST) for _ in range(12)))
+
+    started = time.monotonic()
+    results = asyncio.run(run())
+    # 자리가 없는 요청은 기다리지 않고 바로 템플릿으로 생성
+    assert time.monotonic() - started < 0.5
+    assert fake.state.max_in_flight == 3
+    stats = backend.stats()
+    assert (stats["successes"], stats["shed"], stats["in_flight"]) == (3, 9, 0)
+    assert sum(r[0].template_id == "model:fake-1" for r in results) == 3
+
+def collect(stream):
+    async def run():
+        return [text async for text in stream]
+
+    return asyncio.run(run())
+
+def test_model_backend_streams_chunks():
+    backend = make_backend(create_app())
+    texts = collect(backend.stream(REQUEST))
+    # 모델 서버가 보낸 조각이 하나씩 도착
+    assert len(texts) > 1 and all(len(text.fragments) == 1 for text in texts)
+    assert "".join(text.fragments[0] for text in texts) == "[logical#0] 안부를 묻고 싶어요"
+    assert {text.template_id for text in texts} == {"model:fake-1"}
+    stats = backend.stats()
+    assert (stats["successes"], stats["in_flight"]) == (1, 0)
+
+def test_stream_falls_back_before_first_chunk():
+    backend = make_backend(create_app(failure_rate=1.0))
+    texts = collect(backend.stream(REQUEST))
+    assert texts and all(text.fallback and text.template_id.startswith("logical.") for text in texts)
+    stats = backend.stats()
+    assert (stats["failures"], stats["fallbacks"], stats["in_flight"]) == (1, 1, 0)
+
+def test_stream_failure_after_chunks_is_raised():
+    class BrokenStream(TemplateBackend):
+        async def stream(self, request):
+            yield GeneratedText(template_id="model:x", fragments=["안녕"])
+            raise httpx.ReadError("connection lost")
+
+    backend = GuardedBackend(BrokenStream(), fallback=TemplateBackend(), timeout=1.0, max_concurrency=1, hedge_delay=None, breaker=CircuitBreaker(3, 30.0))
+    received = []
+
+    async def run():
+        async for text in backend.stream(REQUEST):
+            received.append(text)
+
+    # 이미 보낸 조각 뒤에 대체 결과를 이어 붙이지 않음
+    with pytest.raises(httpx.ReadError):
+        asyncio.run(run())
+    assert [text.fragments for text in received] == [["안녕"]]
+    stats = backend.stats()
+    assert (stats["failures"], stats["fallbacks"], stats["in_flight"]) == (1, 0, 0)
+
+def test_generate_endpoint_uses_model_backend(client: TestClient, mock_auth, monkeypatch):
+    backend = make_backend(create_app())
+    monkeypatch.setattr(message_service, "generation_backend", backend)
+    response = client.post("/api/messages/generate", json={"purpose": "안부", "tone_style": "curious", "n": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(v["message"] for v in data["variants"]) == ["[curious#0] 안부", "[curious#1] 안부"]
+
+    # 말투 검증은 백엔드 호출 전에 이루어짐
+    unknown = client.post("/api/messages/generate", json={"purpose": "안부", "tone_style": "shouty"})
+    assert unknown.status_code == 422
+    assert backend.stats()["calls"] == 1
+
+class CountingBackend(TemplateBackend):
+    """호출 횟수를 세고 버전을 바꿀 수 있는 템플릿 백엔드 (cacheable이면 모델 백엔드처럼 캐시됨)"""
+
+    def __init__(self, cacheable=False):
+        self.calls = 0
+        self.tag = "v1"
+        self.cacheable = cacheable
+
+    @property
+    def version(self):
+        return self.tag
+
+    async def generate(self, request):
+        self.calls += 1
+        return await super().generate(request)
+
+def cached_generate(cache, backend, request):
+    key = cache.key(backend, request)
+    texts = cache.get(key)
+    if texts is None:
+        texts = asyncio.run(backend.generate(request))
+        cache.set(key, texts)
+    return texts
+
+def test_generation_cache_key_and_invalidation():
+    cache = GenerationCache(maxsize=100, ttl=60, maxbytes=None)
+    backend = CountingBackend()
+    first = cached_generate(cache, backend, GenerationRequest(purpose="안부를  묻고\n싶어요 ", tone_style="logical", n=2))
+    again = cached_generate(cache, backend, GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="logical", n=2))
+    assert backend.calls == 1
+    assert [t.fragments for t in again] == [t.fragments for t in first]
+
+    # 말투, 맞춤 문장이 다르면 다른 항목. 템플릿 백엔드는 특성을 쓰지 않으므로 키에서 제외
+    cached_generate(cache, backend, GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="curious", n=2))
+    cached_generate(cache, backend, GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="logical", n=2, context=" ctx"))
+    cached_generate(cache, backend, GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="logical", n=2, features={"a": 1}))
+    assert backend.calls == 3
+
+    # 버전이 바뀌면 이전 항목은 비워지고 새로 생성
+    backend.tag = "v2"
+    cached_generate(cache, backend, GenerationRequest(purpose="안부를 묻고 싶어요", tone_style="logical", n=2))
+    assert backend.calls == 4
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["hits"] == 2
+
+def test_generation_cache_skips_fallback_and_limits_bytes():
+    fake = create_app(failure_rate=1.0)
+    backend = make_backend(fake)
+    cache = GenerationCache(maxsize=100, ttl=60, maxbytes=None)
+    texts = cached_generate(cache, backend, REQUEST)
+    assert texts[0].fallback
+    assert cache.stats()["size"] == 0
+
+    small = GenerationCache(maxsize=100, ttl=60, maxbytes=3000)
+    counting = CountingBackend()
+    for i in range(20):
+        cached_generate(small, counting, GenerationRequest(purpose=f"목적 {i}", tone_style="logical", n=1))
+    stats = small.stats()
+    assert 0 < stats["bytes"] <= 3000
+    assert stats["evictions"] == 20 - stats["size"] > 0
+
+def test_generate_endpoint_does_not_freeze_template_results(client: TestClient, mock_auth, monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(message_service, "generation_backend", backend)
+    body = {"purpose": "잘 지내는지 궁금해요", "tone_style": "emotional", "n": 2}
+    variants = set()
+    for _ in range(20):
+        data = client.post("/api/messages/generate", json=body).json()
+        variants.add(frozenset(v["message"] for v in data["variants"]))
+    # 다시 생성할 때마다 템플릿을 새로 고름 (캐시 안 함)
+    assert backend.calls == 20
+    assert len(variants) > 1
+    assert message_service.generation_cache.stats()["size"] == 0
+
+def test_generate_endpoint_reuses_cached_generation(client: TestClient, mock_auth, monkeypatch):
+    backend = CountingBackend(cacheable=True)
+    monkeypatch.setattr(message_service, "generation_backend", backend)
+    body = {"purpose": "잘 지내는지 궁금해요", "tone_style": "emotional", "n": 2}
+    before = client.get("/api/metrics/", headers=METRICS_HEADERS).json()["generation_cache"]
+    first = client.post("/api/messages/generate", json=body).json()
+    second = client.post("/api/messages/generate", json=dict(body, purpose=" 잘 지내는지  궁금해요")).json()
+    assert backend.calls == 1
+    assert sorted(v["message"] for v in first["variants"]) == sorted(v["message"] for v in second["variants"])
+    # 저장은 요청마다 따로
+    assert {v["id"] for v in first["variants"]}.isdisjoint(v["id"] for v in second["variants"])
+    stats = client.get("/api/metrics/", headers=METRICS_HEADERS).json()["generation_cache"]
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (1, 1)
+
+def test_model_version_change_misses_cache():
+    served = {"model_version": "m1", "calls": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/version":
+            return httpx.Response(200, json={"model_version": served["model_version"]})
+        served["calls"] += 1
+        return httpx.Response(200, json={"model_version": served["model_version"], "candidates": [{"text": "hi"}, {"text": "yo"}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://model")
+    backend = HttpModelBackend("http://model", timeout=1.0, client=client)
+    cache = GenerationCache(maxsize=100, ttl=60, maxbytes=None)
+
+    async def cached(request):
+        # prepare_drafts와 같은 순서: 키 계산 -> 조회 -> 생성 -> 생성 직후 버전과 함께 저장
+        key = cache.key(backend, request)
+        texts = cache.get(key)
+        if texts is None:
+            texts = await backend.generate(request)
+            cache.set(key, texts, version=backend.version)
+        return texts
+
+    async def run():
+        # 기동 시 확인한 버전이 첫 요청부터 캐시 키에 들어감
+        await backend.start()
+        assert backend.version == "http:m1"
+        await cached(REQUEST)
+        await cached(REQUEST)
+        assert served["calls"] == 1
+
+        # 모델이 배포되면 새 버전 응답을 받을 때까지는 이전 캐시를 쓰지만,
+        # 새 버전으로 생성한 결과는 이전 버전 키로 저장되지 않음
+        served["model_version"] = "m2"
+        other = GenerationRequest(purpose="다른 목적", tone_style="logical", n=2)
+        await cached(other)
+        assert backend.version == "http:m2"
+        assert served["calls"] == 2
+        # 이후 조회는 새 버전 키라 이전 결과를 쓰지 않고 다시 생성
+        await cached(REQUEST)
+        await cached(other)
+        assert served["calls"] == 4
+        await cached(REQUEST)
+        assert served["calls"] == 4
+
+    asyncio.run(run())
+    assert cache.stats()["version"] == "http:m2"
+
+def test_pinned_model_version_skips_probe():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("버전을 고정하면 /version을 호출하지 않음")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://model")
+    backend = HttpModelBackend("http://model", timeout=1.0, client=client, model_version="pinned")
+    asyncio.run(backend.start())
+    assert backend.version == "http:pinned"
@@ -0,0 +1,281 @@
+import json
+import time
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from app.models.message import Message
+from app.models.onboarding import BreakupReason, Onboarding, StrategyType, TendencyType
+from app.models.resource_version import ResourceVersion
+from app.models.user import User
+from app.schemas.message import MessagePurpose
+from app.services.goals import GOAL_TABLE, recommend_goals
+
+def seed_messages(db: Session, user: User, count: int):
+    now = datetime.utcnow()
+    db.execute(insert(Message), [
+        {
+            "user_id": user.id,
+            "purpose": f"purpose {n}",
+            "tone_style": "logical" if n % 2 else "emotional",
+            "content": f"content {n}",
+            "positive_reaction": 50.0 + n,
+            # 같은 시각의 메시지도 id로 순서가 정해지는지 확인하기 위해 두 개씩 묶음
+            "created_at": now - timedelta(minutes=n // 2),
+        }
+        for n in range(count)
+    ])
+    db.commit()
+
+def read_all_pages(client: TestClient, limit: int, **params):
+    messages, cursor = [], None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/messages/", params=query)
+        assert response.status_code == 200
+        messages.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return messages
+
+def test_history_pages_newest_first(auth_client: TestClient, db: Session, test_user: User):
+    seed_messages(db, test_user, 7)
+    messages = read_all_pages(auth_client, limit=3)
+
+    keys = [(message["created_at"], message["id"]) for message in messages]
+    assert len(keys) == 7
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 7
+
+def test_history_filters(auth_client: TestClient, db: Session, test_user: User):
+    seed_messages(db, test_user, 6)
+
+    logical = read_all_pages(auth_client, limit=2, tone_style="logical")
+    assert {message["tone_style"] for message in logical} == {"logical"}
+    assert len(logical) == 3
+
+    future = auth_client.get("/api/messages/", params={"since": "2999-01-01T00:00:00"}).json()
+    assert future == []
+    past = auth_client.get("/api/messages/", params={"until": "2000-01-01T00:00:00"}).json()
+    assert past == []
+
+def test_export_streams_ndjson(auth_client: TestClient, db: Session, test_user: User):
+    seed_messages(db, test_user, 5)
+
+    with auth_client.stream("GET", "/api/messages/export") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert len(rows) == 5
+    assert {row["content"] for row in rows} == {f"content {n}" for n in range(5)}
+    assert [(row["created_at"], row["id"]) for row in rows] == sorted((row["created_at"], row["id"]) for row in rows)
+
+def test_generate_variants_ranked_in_one_insert(client: TestClient, mock_auth, sql_statements):
+    sql_statements.clear()
+    response = client.post("/api/messages/generate", json={
+        "purpose": "안부 인사",
+        "purposes": ["사과", "안부 인사"],
+        "tone_style": "emotional",
+        "n": 3
+    })
+    assert response.status_code == 200
+    data = response.json()
+
+    variants = data["variants"]
+    assert len(variants) == 6
+    assert {variant["purpose"] for variant in variants} == {"안부 인사", "사과"}
+    reactions = [variant["positive_reaction"] for variant in variants]
+    assert reactions == sorted(reactions, reverse=True)
+    assert data["message"] == variants[0]["message"]
+    # 온보딩 조회 + 후보 전체 INSERT + 리포트 통계 upsert
+    assert len(sql_statements) == 3
+
+    history = client.get("/api/messages/", params={"limit": 10}).json()
+    assert len(history) == 6
+
+def read_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_generate_stream_sends_fragments_then_result(client: TestClient, mock_auth, db: Session, test_user: User):
+    response = client.post("/api/messages/generate/stream", json={"purpose": "안부 인사", "tone_style": "curious"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = read_events(response)
+    (first_event, start), *tokens, (last_event, result) = events
+    assert (first_event, start["tone_style"]) == ("start", "curious")
+    assert last_event == "result"
+    assert tokens and all(event == "token" for event, _ in tokens)
+    assert "".join(data["text"] for _, data in tokens) == result["message"]
+
+    saved = db.get(Message, result["id"])
+    assert saved.content == result["message"]
+    assert saved.user_id == test_user.id
+
+def test_generate_stream_disconnect_does_not_persist(db: Session, test_user: User):
+    import asyncio
+    from conftest import TestingAsyncSessionLocal
+    from app.api.endpoints.messages import _generation_events
+
+    async def disconnect_after_first_token():
+        purpose = MessagePurpose(purpose="p", tone_style="logical")
+        events = _generation_events(test_user, purpose, TestingAsyncSessionLocal)
+        assert (await events.__anext__()).startswith("event: start")
+        assert (await events.__anext__()).startswith("event: token")
+        await events.aclose()
+
+    asyncio.run(disconnect_after_first_token())
+    assert db.query(Message).count() == 0
+
+def test_generate_stream_starts_before_backend_returns(test_user: User, monkeypatch):
+    import asyncio
+    from conftest import TestingAsyncSessionLocal
+    from app.api.endpoints.messages import _generation_events
+    from app.services import message_service
+    from app.services.generation import TemplateBackend
+
+    class SlowBackend(TemplateBackend):
+        async def stream(self, request):
+            await asyncio.sleep(0.2)
+            async for text in super().stream(request):
+                yield text
+
+    monkeypatch.setattr(message_service, "generation_backend", SlowBackend())
+
+    async def first_event_delay():
+        events = _generation_events(test_user, MessagePurpose(purpose="느린 생성", tone_style="logical"), TestingAsyncSessionLocal)
+        started = time.monotonic()
+        first = await events.__anext__()
+        delay = time.monotonic() - started
+        await events.aclose()
+        return first, delay
+
+    first, delay = asyncio.run(first_event_delay())
+    assert first.startswith("event: start")
+    assert delay < 0.1
+
+def test_generate_stream_forwards_chunks_as_they_arrive(db: Session, test_user: User, monkeypatch):
+    import asyncio
+    from conftest import TestingAsyncSessionLocal
+    from app.api.endpoints.messages import _generation_events
+    from app.services import message_service
+    from app.services.generation import GeneratedText, TemplateBackend
+
+    class GatedBackend(TemplateBackend):
+        """첫 조각을 보낸 뒤 gate가 열릴 때까지 다음 조각을 만들지 않는 백엔드"""
+
+        async def stream(self, request):
+            yield GeneratedText(template_id="model:gated", fragments=["먼저 "])
+            await self.gate.wait()
+            yield GeneratedText(template_id="model:gated", fragments=["나중"])
+
+    backend = GatedBackend()
+    monkeypatch.setattr(message_service, "generation_backend", backend)
+
+    async def run():
+        backend.gate = asyncio.Event()
+        events = _generation_events(test_user, MessagePurpose(purpose="p", tone_style="logical"), TestingAsyncSessionLocal)
+        await events.__anext__()
+        # 생성이 끝나기 전에 첫 조각이 전달됨
+        first = await asyncio.wait_for(events.__anext__(), 1.0)
+        backend.gate.set()
+        return first, [event async for event in events]
+
+    first, rest = asyncio.run(run())
+    assert first == 'event: token\ndata: {"text": "먼저 "}\n\n'
+    assert rest[0] == 'event: token\ndata: {"text": "나중"}\n\n'
+    assert rest[-1].startswith("event: result")
+    assert db.query(Message).one().content == "먼저 나중"
+
+def test_generate_stream_reports_backend_failure(db: Session, test_user: User, monkeypatch):
+    import asyncio
+    from conftest import TestingAsyncSessionLocal
+    from app.api.endpoints.messages import _generation_events
+    from app.services import message_service
+    from app.services.generation import GeneratedText, TemplateBackend
+
+    class BrokenBackend(TemplateBackend):
+        async def stream(self, request):
+            yield GeneratedText(template_id="model:broken", fragments=["중간에 "])
+            raise RuntimeError("model connection lost")
+
+    monkeypatch.setattr(message_service, "generation_backend", BrokenBackend())
+
+    async def run():
+        events = _generation_events(test_user, MessagePurpose(purpose="p", tone_style="logical"), TestingAsyncSessionLocal)
+        return [event async for event in events]
+
+    events = asyncio.run(run())
+    assert [event.split("\n", 1)[0] for event in events] == ["event: start", "event: token", "event: error"]
+    assert db.query(Message).count() == 0
+
+def test_generate_stream_rejects_unknown_tone(client: TestClient, mock_auth):
+    response = client.post("/api/messages/generate/stream", json={"purpose": "안부", "tone_style": "angry"})
+    assert response.status_code == 422
+
+def test_goal_table_covers_every_onboarding_combination():
+    assert len(GOAL_TABLE) == 6 * 4 * 2 * 2
+    assert all(len(goals) <= 3 for goals in GOAL_TABLE.values())
+    goals = recommend_goals((BreakupReason.EXTERNAL, StrategyType.BALANCED, TendencyType.ANALYTICAL, TendencyType.EMOTIONAL))
+    assert [goal["name"] for goal in goals] == ["재회", "성장", "자기 이해"]
+    assert len(recommend_goals(None)) == 4
+
+def test_recommended_goals_cached_until_onboarding_changes(client: TestClient, mock_auth, sql_statements):
+    # 온보딩 전에는 전체 목표
+    assert len(client.get("/api/messages/recommended-goals").json()) == 4
+
+    client.post("/api/onboarding/complete", json={
+        "breakup_date": "2024-01-01",
+        "relationship_years": 1,
+        "relationship_months": 0,
+        "my_tendency": "emotional",
+        "partner_tendency": "emotional",
+        "breakup_reason": "신뢰 상실",
+        "strategy_type": "emotional",
+    })
+    response = client.get("/api/messages/recommended-goals")
+    assert [goal["name"] for goal in response.json()] == ["마음 정리", "재회"]
+
+    # 두 번째 조회는 캐시에서 (온보딩 버전 조회만)
+    sql_statements.clear()
+    assert client.get("/api/messages/recommended-goals").json() == response.json()
+    assert len(sql_statements) == 1 and "resource_versions" in sql_statements[0]
+
+    # 같은 목표면 버전 조회만으로 304
+    sql_statements.clear()
+    response = client.get("/api/messages/recommended-goals", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert len(sql_statements) == 1
+
+    # 단계 저장이 캐시를 무효화
+    client.post("/api/onboarding/step3", json={"strategy_type": "balanced"})
+    assert [goal["name"] for goal in client.get("/api/messages/recommended-goals").json()] == ["마음 정리", "성장"]
+
+def test_recommended_goals_follow_onboarding_version_from_other_workers(client: TestClient, mock_auth, db: Session, test_user: User):
+    client.post("/api/onboarding/complete", json={
+        "breakup_date": "2024-01-01",
+        "relationship_years": 1,
+        "relationship_months": 0,
+        "my_tendency": "emotional",
+        "partner_tendency": "emotional",
+        "breakup_reason": "신뢰 상실",
+        "strategy_type": "emotional",
+    })
+    assert [goal["name"] for goal in client.get("/api/messages/recommended-goals").json()] == ["마음 정리", "재회"]
+
+    # 다른 워커의 저장: 이 프로세스의 캐시는 그대로지만 온보딩 버전이 올라감
+    db.execute(update(Onboarding).where(Onboarding.user_id == test_user.id).values(strategy_type=StrategyType.BALANCED))
+    db.execute(
+        update(ResourceVersion)
+        .where(ResourceVersion.user_id == test_user.id, ResourceVersion.resource == "onboarding")
+        .values(version=ResourceVersion.version + 1)
+    )
+    db.commit()
+    assert [goal["name"] for goal in client.get("/api/messages/recommended-goals").json()] == ["마음 정리", "성장"]
@@ -0,0 +1,171 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.mission import Mission
+from app.models.onboarding import Onboarding
+from app.models.user import User
+from app.models.user_profile import UserProfile
+from app.schemas.mission import MissionResponse
+from app.schemas.onboarding import OnboardingResponse, UserProfileResponse
+
+def create_missions(client: TestClient, count: int, prefix: str = "mission"):
+    return [
+        client.post("/api/missions/", json={"title": f"{prefix} {n}"}).json()
+        for n in range(count)
+    ]
+
+def read_all_pages(client: TestClient, limit: int, **params):
+    ids, cursor = [], None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/missions/", params=query)
+        assert response.status_code == 200
+        ids.extend(mission["id"] for mission in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+def test_cursor_pagination_walks_all_missions(client: TestClient, mock_auth):
+    created = create_missions(client, 5)
+    assert read_all_pages(client, limit=2) == [mission["id"] for mission in created]
+
+def test_cursor_pagination_is_stable_under_inserts(client: TestClient, mock_auth):
+    created = create_missions(client, 4)
+    first = client.get("/api/missions/", params={"limit": 2})
+    page_ids = [mission["id"] for mission in first.json()]
+
+    # 페이지 사이에 새 미션이 추가되어도 건너뛰거나 중복되지 않음
+    inserted = create_missions(client, 1, prefix="inserted")
+    second = client.get("/api/missions/", params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]})
+    page_ids += [mission["id"] for mission in second.json()]
+
+    assert page_ids == [mission["id"] for mission in created + inserted]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_filters_and_legacy_skip(client: TestClient, mock_auth):
+    created = create_missions(client, 4)
+    client.put(f"/api/missions/{created[1]['id']}", json={"title": "done", "is_completed": True})
+
+    completed = client.get("/api/missions/", params={"is_completed": True}).json()
+    assert [mission["id"] for mission in completed] == [created[1]["id"]]
+
+    updated = client.get("/api/missions/", params={"updated_since": "2999-01-01T00:00:00"}).json()
+    assert updated == []
+
+    legacy = client.get("/api/missions/", params={"skip": 1, "limit": 2}).json()
+    assert [mission["id"] for mission in legacy] == [created[1]["id"], created[2]["id"]]
+
+def test_invalid_cursor_is_rejected(client: TestClient, mock_auth):
+    response = client.get("/api/missions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def batch_body(missions: list, new: int) -> dict:
+    operations = [{"op": "create", "title": f"new {n}"} for n in range(new)]
+    for n, mission in enumerate(missions):
+        kind = ("update", "complete", "delete")[n % 3]
+        operation = {"op": kind, "id": mission["id"]}
+        if kind == "update":
+            operation["title"] = f"edited {n}"
+        operations.append(operation)
+    return {"operations": operations}
+
+def test_batch_applies_operations_with_per_item_results(client: TestClient, mock_auth):
+    created = create_missions(client, 3)
+    body = batch_body(created, 2)
+    body["operations"].append({"op": "delete", "id": 999999})
+
+    response = client.post("/api/missions/batch", json=body)
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status"] for result in results] == ["ok"] * 5 + ["not_found"]
+    assert [result["mission"]["title"] for result in results[:2]] == ["new 0", "new 1"]
+    assert results[2]["mission"]["title"] == "edited 0"
+    assert results[3]["mission"]["is_completed"] is True
+    assert results[4]["mission"] is None
+
+    remaining = {mission["id"]: mission for mission in client.get("/api/missions/").json()}
+    assert created[2]["id"] not in remaining
+    assert remaining[created[0]["id"]]["title"] == "edited 0"
+    assert remaining[created[1]["id"]]["is_completed"] is True
+    assert len(remaining) == 4
+
+def test_batch_round_trips_do_not_grow_with_size(client: TestClient, mock_auth, sql_statements):
+    small = create_missions(client, 3)
+    sql_statements.clear()
+    client.post("/api/missions/batch", json=batch_body(small, 2))
+    small_count = len(sql_statements)
+
+    large = create_missions(client, 60)
+    sql_statements.clear()
+    response = client.post("/api/missions/batch", json=batch_body(large, 40))
+    assert response.status_code == 200
+    assert len(sql_statements) == small_count
+
+def test_batch_rejects_duplicate_targets(client: TestClient, mock_auth):
+    mission = create_missions(client, 1)[0]
+    response = client.post("/api/missions/batch", json={"operations": [
+        {"op": "complete", "id": mission["id"]},
+        {"op": "delete", "id": mission["id"]},
+    ]})
+    assert response.status_code == 400
+
+def test_batch_rejects_null_update_fields(client: TestClient, mock_auth):
+    mission = create_missions(client, 1)[0]
+    for field in ("title", "is_completed"):
+        response = client.post("/api/missions/batch", json={"operations": [
+            {"op": "create", "title": "not written"},
+            {"op": "update", "id": mission["id"], field: None},
+        ]})
+        assert response.status_code == 422
+    # 쓰기 전에 거절되어 아무것도 바뀌지 않음
+    remaining = client.get("/api/missions/").json()
+    assert [(m["id"], m["title"], m["is_completed"]) for m in remaining] == [(mission["id"], mission["title"], False)]
+
+def test_lean_reads_match_response_schemas(client: TestClient, mock_auth, db: Session, test_user: User):
+    created = create_missions(client, 3)
+    client.put(f"/api/missions/{created[1]['id']}", json={"title": "renamed", "is_completed": True})
+    client.post("/api/onboarding/profile", json={"bio": "hi", "interests": ["a"], "preferences": {"k": 1}})
+    client.post("/api/onboarding/complete", json={
+        "breakup_date": "2024-01-01",
+        "relationship_years": 1,
+        "relationship_months": 3,
+        "my_tendency": "analytical",
+        "partner_tendency": "emotional",
+        "breakup_reason": "기타",
+        "strategy_type": "balanced",
+    })
+
+    # 컬럼 행을 바로 직렬화한 결과가 ORM 객체를 스키마로 검증한 결과와 같아야 함
+    missions = db.query(Mission).order_by(Mission.created_at, Mission.id).all()
+    assert client.get("/api/missions/").json() == [
+        MissionResponse.model_validate(mission).model_dump(mode="json") for mission in missions
+    ]
+    onboarding = db.query(Onboarding).one()
+    assert client.get("/api/onboarding/").json() == OnboardingResponse.model_validate(onboarding).model_dump(mode="json")
+    profile = db.query(UserProfile).one()
+    assert client.get("/api/onboarding/profile").json() == UserProfileResponse.model_validate(profile).model_dump(mode="json")
+
+def test_missions_conditional_get(client: TestClient, mock_auth, sql_statements):
+    create_missions(client, 2)
+    first = client.get("/api/missions/")
+    etag = first.headers["ETag"]
+
+    # 버전이 같으면 버전 조회 한 번으로 본문 없이 304
+    sql_statements.clear()
+    response = client.get("/api/missions/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert len(sql_statements) == 1, sql_statements
+
+    # 쿼리 파라미터가 다르면 다른 ETag
+    assert client.get("/api/missions/", params={"limit": 1}).headers["ETag"] != etag
+
+    # 쓰기가 버전을 올리므로 이전 ETag로는 새 목록을 받음
+    assert client.put(f"/api/missions/{first.json()[0]['id']}", json={"title": "done", "is_completed": True}).status_code == 200
+    response = client.get("/api/missions/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["is_completed"] is True
+    assert response.headers["ETag"] != etag
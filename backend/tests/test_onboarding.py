@@ -69,4 +69,65 @@ def test_create_onboarding_step1_invalid_data(client: TestClient, db: Session, t
     }
     
     response = client.post("/api/onboarding/step1", json=invalid_data)
-    assert response.status_code == 422  # Unprocessable Entity 
\ No newline at end of file
+    assert response.status_code == 422  # Unprocessable Entity 
+STEP1 = {
+    "breakup_date": "2024-01-01",
+    "relationship_years": 1,
+    "relationship_months": 3,
+    "my_tendency": "analytical",
+    "partner_tendency": "emotional"
+}
+
+def post(client: TestClient, sql_statements: list, path: str, body: dict):
+    sql_statements.clear()
+    return client.post(path, json=body)
+
+def test_onboarding_steps_upsert_in_one_statement(client: TestClient, test_user: User, mock_auth_patch, sql_statements):
+    response = post(client, sql_statements, "/api/onboarding/step1", STEP1)
+    assert response.status_code == 200
+    # 온보딩 upsert + 리소스 버전 upsert
+    assert len(sql_statements) == 2 and "ON CONFLICT" in sql_statements[0]
+
+    response = post(client, sql_statements, "/api/onboarding/step2", {"breakup_reason": "신뢰 상실"})
+    assert response.json()["breakup_reason"] == "신뢰 상실"
+    assert len(sql_statements) == 2
+
+    # 1단계를 다시 저장해도 2단계 값은 유지
+    response = post(client, sql_statements, "/api/onboarding/step1", dict(STEP1, relationship_years=4))
+    data = response.json()
+    assert data["relationship_years"] == 4
+    assert data["breakup_reason"] == "신뢰 상실"
+
+def test_onboarding_step2_requires_step1(client: TestClient, test_user: User, mock_auth_patch):
+    response = client.post("/api/onboarding/step2", json={"breakup_reason": "기타"})
+    assert response.status_code == 400
+
+def test_complete_onboarding(client: TestClient, test_user: User, mock_auth_patch, sql_statements):
+    body = dict(STEP1, breakup_reason="기타", strategy_type="balanced")
+    response = post(client, sql_statements, "/api/onboarding/complete", body)
+    assert response.status_code == 200
+    assert len(sql_statements) == 2
+    data = response.json()
+    assert data["strategy_type"] == "balanced"
+    assert data["breakup_reason"] == "기타"
+    assert client.get("/api/onboarding/").json()["id"] == data["id"]
+
+def test_onboarding_conditional_get(client: TestClient, test_user: User, mock_auth_patch, sql_statements):
+    client.post("/api/onboarding/step1", json=STEP1)
+    client.post("/api/onboarding/profile", json={"bio": "hello"})
+    onboarding_etag = client.get("/api/onboarding/").headers["ETag"]
+    profile_etag = client.get("/api/onboarding/profile").headers["ETag"]
+
+    for path, etag in (("/api/onboarding/", onboarding_etag), ("/api/onboarding/profile", profile_etag)):
+        sql_statements.clear()
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        # 버전 조회만 실행
+        assert len(sql_statements) == 1, sql_statements
+
+    # 온보딩 저장은 온보딩 버전만 올림
+    client.post("/api/onboarding/step2", json={"breakup_reason": "기타"})
+    response = client.get("/api/onboarding/", headers={"If-None-Match": onboarding_etag})
+    assert response.status_code == 200
+    assert response.json()["breakup_reason"] == "기타"
+    assert client.get("/api/onboarding/profile", headers={"If-None-Match": profile_etag}).status_code == 304
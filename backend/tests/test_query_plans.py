@@ -0,0 +1,155 @@
+"""
+라우터가 실제로 실행하는 쿼리를 운영 규모 데이터에서 EXPLAIN QUERY PLAN으로 확인해
+인덱스 없이 테이블 전체를 훑는(SCAN) 쿼리가 생기면 실패시킵니다.
+"""
+import json
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+from app.core.pagination import encode_cursor
+from app.models import Message, Mission, Onboarding, User, UserProfile
+from conftest import async_engine, engine
+
+USERS = 500
+MISSIONS_PER_USER = 40
+MESSAGES_PER_USER = 40
+
+# 새 라우터를 추가하면 여기에 호출을 추가
+ROUTER_CALLS = [
+    ("GET", "/api/users/me", None),
+    ("GET", "/api/missions/", None),
+    ("GET", "/api/missions/?limit=5&is_completed=false&cursor={cursor}", None),
+    ("GET", "/api/missions/{mission_id}", None),
+    ("PUT", "/api/missions/{mission_id}", {"title": "updated", "is_completed": True}),
+    ("POST", "/api/missions/", {"title": "new mission"}),
+    ("POST", "/api/missions/batch", {"operations": [
+        {"op": "create", "title": "batch mission"},
+        {"op": "update", "id": "{mission_id}", "title": "batch updated"},
+    ]}),
+    ("DELETE", "/api/missions/{mission_id}", None),
+    ("GET", "/api/onboarding/", None),
+    ("POST", "/api/onboarding/step1", {
+        "breakup_date": "2024-01-01",
+        "relationship_years": 1,
+        "relationship_months": 3,
+        "my_tendency": "analytical",
+        "partner_tendency": "emotional"
+    }),
+    ("POST", "/api/onboarding/step2", {"breakup_reason": "신뢰 상실"}),
+    ("POST", "/api/onboarding/step3", {"strategy_type": "balanced"}),
+    ("POST", "/api/onboarding/complete", {
+        "breakup_date": "2024-01-01",
+        "relationship_years": 1,
+        "relationship_months": 3,
+        "my_tendency": "analytical",
+        "partner_tendency": "emotional",
+        "breakup_reason": "기타",
+        "strategy_type": "emotional"
+    }),
+    ("GET", "/api/onboarding/profile", None),
+    ("PUT", "/api/onboarding/profile", {"bio": "updated"}),
+    ("PUT", "/api/onboarding/step/2", None),
+    ("GET", "/api/messages/recommended-goals", None),
+    ("GET", "/api/bootstrap/", None),
+    ("GET", "/api/report/", None),
+    ("GET", "/api/timing/weekly", None),
+    ("GET", "/api/messages/", None),
+    ("GET", "/api/messages/?limit=5&tone_style=logical&since=2000-01-01T00:00:00&cursor={cursor}", None),
+    ("GET", "/api/messages/export", None),
+    ("POST", "/api/messages/generate", {"purpose": "안부 인사", "tone_style": "emotional"}),
+    ("POST", "/api/messages/generate/stream", {"purpose": "안부 인사", "tone_style": "emotional"}),
+    ("PUT", "/api/messages/{message_id}/reaction", {"reaction": "positive"}),
+    ("PUT", "/api/users/me", {
+        "email": "test@example.com",
+        "username": "testuser",
+        "full_name": "Test User",
+        "password": "password123"
+    }),
+]
+
+SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)")
+
+def seed(db: Session, test_user: User):
+    """다른 사용자 데이터를 섞어 운영과 비슷한 행 수를 만든 뒤 통계 수집"""
+    db.execute(insert(User), [
+        {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x", "is_active": True}
+        for i in range(USERS)
+    ])
+    user_ids = [test_user.id] + [row[0] for row in db.execute(text("SELECT id FROM users WHERE id != :id"), {"id": test_user.id})]
+    now = datetime.utcnow()
+    db.execute(insert(Mission), [
+        {"user_id": user_id, "title": f"mission {n}", "is_completed": n % 3 == 0}
+        for user_id in user_ids for n in range(MISSIONS_PER_USER)
+    ])
+    db.execute(insert(Message), [
+        {
+            "user_id": user_id,
+            "purpose": "purpose",
+            "tone_style": "logical",
+            "content": "content",
+            "positive_reaction": 60.0,
+            "created_at": now - timedelta(minutes=n)
+        }
+        for user_id in user_ids for n in range(MESSAGES_PER_USER)
+    ])
+    db.execute(insert(Onboarding), [
+        {
+            "user_id": user_id,
+            "breakup_date": date(2024, 1, 1),
+            "relationship_years": 1,
+            "relationship_months": 2,
+            "my_tendency": "ANALYTICAL",
+            "partner_tendency": "EMOTIONAL"
+        }
+        for user_id in user_ids
+    ])
+    db.execute(insert(UserProfile), [
+        {"user_id": user_id, "bio": "bio", "onboarding_completed": 0}
+        for user_id in user_ids
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+@pytest.fixture
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            # executemany는 첫 번째 파라미터 세트로 계획을 확인
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+def test_router_queries_use_indexes(auth_client: TestClient, db: Session, test_user: User, captured_statements):
+    seed(db, test_user)
+    mission_id = db.execute(
+        text("SELECT id FROM missions WHERE user_id = :id ORDER BY id LIMIT 1"), {"id": test_user.id}
+    ).scalar()
+    message_id = db.execute(
+        text("SELECT id FROM messages WHERE user_id = :id ORDER BY id LIMIT 1"), {"id": test_user.id}
+    ).scalar()
+
+    cursor = encode_cursor(datetime(2000, 1, 1), 0)
+
+    for method, path, body in ROUTER_CALLS:
+        if body is not None:
+            body = json.loads(json.dumps(body).replace('"{mission_id}"', str(mission_id)))
+        response = auth_client.request(method, path.format(mission_id=mission_id, message_id=message_id, cursor=cursor), json=body)
+        assert response.status_code < 400, (method, path, response.text)
+
+    assert captured_statements
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in captured_statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            details = [row[-1] for row in plan]
+            if any(SCAN.match(detail) for detail in details):
+                scans.append((statement, details))
+    assert scans == [], "sequential scans found:\n" + "\n".join(f"{s}\n  {d}" for s, d in scans)
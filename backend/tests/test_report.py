@@ -0,0 +1,107 @@
+import asyncio
+from datetime import date, datetime
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.message import Message
+from app.models.mission import Mission
+from app.models.user import User
+from app.services.report import get_report, rebuild_report_stats, reaction_bucket, week_bucket
+from conftest import TestingAsyncSessionLocal
+
+def rebuild(user_id=None, batch_size=2):
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await rebuild_report_stats(db, user_id, batch_size=batch_size)
+    return asyncio.run(run())
+
+def report(user_id: int, today: date):
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await get_report(db, user_id, today)
+    return asyncio.run(run())
+
+def test_buckets():
+    assert week_bucket(datetime(2024, 5, 8, 23, 0)) == "2024-05-06"
+    assert week_bucket(date(2024, 5, 6)) == "2024-05-06"
+    assert [reaction_bucket(value) for value in (0.0, 9.99, 55.0, 100.0)] == ["0", "0", "5", "9"]
+
+def test_report_is_updated_incrementally(client: TestClient, mock_auth, sql_statements):
+    empty = client.get("/api/report/").json()
+    assert empty["message_count"] == 0
+    assert empty["success_rate"] is None and empty["simulation"] is None
+
+    generated = client.post("/api/messages/generate", json={"purpose": "안부 인사", "tone_style": "logical", "n": 3}).json()
+    client.post("/api/messages/generate", json={"purpose": "사과", "tone_style": "emotional"})
+    missions = [client.post("/api/missions/", json={"title": f"mission {n}"}).json() for n in range(3)]
+    client.put(f"/api/missions/{missions[0]['id']}", json={"title": "done", "is_completed": True})
+    client.post("/api/missions/batch", json={"operations": [
+        {"op": "complete", "id": missions[1]["id"]},
+        {"op": "delete", "id": missions[0]["id"]},
+        {"op": "create", "title": "already done", "is_completed": True},
+    ]})
+
+    # 통계 행만 읽는 한 문장
+    sql_statements.clear()
+    data = client.get("/api/report/").json()
+    assert len(sql_statements) == 1, sql_statements
+
+    assert data["message_count"] == 4
+    assert data["missions_completed"] == 2
+    assert [tone["tone_style"] for tone in data["tone_distribution"]] == ["logical", "emotional"]
+    assert data["tone_distribution"][0]["ratio"] == 0.75
+    expected = sum(variant["positive_reaction"] for variant in generated["variants"])
+    # 응답의 positive_reaction은 정수로 반올림되어 있음
+    assert abs(data["tone_distribution"][0]["success_rate"] - expected / 3 / 100) < 0.01
+    assert sum(data["reaction_histogram"]) == 4
+    simulation = data["simulation"]
+    assert abs(simulation["positive"] + simulation["neutral"] + simulation["negative"] - 1) < 1e-3
+
+def test_mission_completion_counted_once_per_change(client: TestClient, mock_auth):
+    mission = client.post("/api/missions/", json={"title": "mission"}).json()
+    url = f"/api/missions/{mission['id']}"
+    completed = []
+    for is_completed in (True, True, False, False, True):
+        client.put(url, json={"title": "mission", "is_completed": is_completed})
+        completed.append(client.get("/api/report/").json()["missions_completed"])
+    # 같은 값으로 다시 보내면 증감 없음
+    assert completed == [1, 1, 0, 0, 1]
+    assert client.put("/api/missions/999999", json={"title": "x", "is_completed": True}).status_code == 404
+    assert client.get("/api/report/").json()["missions_completed"] == 1
+
+def test_rebuild_matches_incremental_stats(client: TestClient, mock_auth, test_user: User):
+    for tone in ("logical", "emotional", "logical"):
+        client.post("/api/messages/generate", json={"purpose": "안부 인사", "tone_style": tone, "n": 2})
+    mission = client.post("/api/missions/", json={"title": "mission"}).json()
+    client.put(f"/api/missions/{mission['id']}", json={"title": "done", "is_completed": True})
+    today = datetime.utcnow().date()
+    incremental = report(test_user.id, today)
+
+    # 작은 배치로 스트리밍해도 같은 결과
+    assert rebuild(batch_size=2) > 0
+    assert report(test_user.id, today) == incremental
+
+def test_rebuild_from_raw_rows(db: Session, test_user: User):
+    # 증분 갱신을 거치지 않고 저장된 기록
+    db.add_all([
+        Message(user_id=test_user.id, purpose="p", tone_style="logical", content="c", positive_reaction=reaction, reaction=outcome, created_at=created_at)
+        for reaction, outcome, created_at in (
+            (40.0, None, datetime(2024, 4, 30)),
+            (60.0, None, datetime(2024, 5, 1)),
+            (70.0, "negative", datetime(2024, 5, 7)),
+            (90.0, "positive", datetime(2024, 5, 8)),
+        )
+    ])
+    db.add(Mission(user_id=test_user.id, title="done", is_completed=True))
+    db.commit()
+    assert report(test_user.id, date(2024, 5, 9))["message_count"] == 0
+
+    rebuild(user_id=test_user.id)
+    data = report(test_user.id, date(2024, 5, 9))
+    assert data["message_count"] == 4
+    assert data["success_rate"] == 0.65
+    # 이번 주 평균 0.8 - 지난주 평균 0.5
+    assert data["rate_change"] == 0.3
+    assert data["missions_completed"] == 1
+    assert data["simulation"] == {"tone_style": "logical", "positive": 0.75, "neutral": 0.25, "negative": 0.0}
+    # 기록된 반응 두 건으로 연락 시간 추천
+    assert data["optimal_time"] is not None
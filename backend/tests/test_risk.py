@@ -0,0 +1,51 @@
+import random
+from fastapi.testclient import TestClient
+from app.services.risk import DEFAULT_PHRASES_PATH, AhoCorasick, RiskDictionary, RiskScanner, normalize
+
+def naive_search(patterns, text):
+    return sorted(
+        (index, start + len(pattern))
+        for index, pattern in enumerate(patterns)
+        for start in range(len(text) - len(pattern) + 1)
+        if text.startswith(pattern, start)
+    )
+
+def test_automaton_matches_naive_search():
+    rng = random.Random(7)
+    alphabet = "가나다라ab"
+    patterns = list({"".join(rng.choices(alphabet, k=rng.randint(1, 5))) for _ in range(3000)})
+    automaton = AhoCorasick(patterns)
+    for _ in range(20):
+        text = "".join(rng.choices(alphabet, k=200))
+        assert sorted(automaton.search(text)) == naive_search(patterns, text)
+
+def test_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(automaton.search("ushers")) == [(0, 4), (1, 4), (3, 6)]
+
+def test_scan_uses_category_priority_and_ignores_spacing():
+    dictionary = RiskDictionary("t", {
+        "pressure": {"warning": "부담", "phrases": ["답장해줘"]},
+        "rejection": {"warning": "거부", "phrases": ["보고 싶어"]},
+    })
+    result = dictionary.scan("안부", "너무 보고싶어. 답장 해줘")
+    assert result.category == "pressure"
+    assert result.warning == "부담"
+    assert [match.category for match in result.matches] == ["pressure", "rejection"]
+    assert dictionary.scan("잘 지내?").warning is None
+    assert normalize("A  b\nC") == "abc"
+
+def test_default_dictionary_loads():
+    scanner = RiskScanner(DEFAULT_PHRASES_PATH)
+    assert scanner.stats()["phrases"] > 0
+    assert scanner.scan("너 때문에 잠을 못 자").category == "emotional_trigger"
+
+def test_scan_endpoint(client: TestClient, mock_auth):
+    response = client.post("/api/messages/scan", json={"text": "꼭 답장해줘", "purpose": "안부"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["category"] == "pressure"
+    assert data["warning"] == "상대방이 부담을 느낄 수 있습니다."
+
+    clean = client.post("/api/messages/scan", json={"text": "잘 지내고 있길 바라요"}).json()
+    assert clean == {"warning": None, "category": None, "matches": []}
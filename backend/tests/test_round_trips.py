@@ -0,0 +1,92 @@
+"""
+쓰기 엔드포인트마다 실행되는 SQL 문 수를 고정해 커밋 후 refresh 같은
+불필요한 왕복이 다시 생기면 실패시킵니다.
+"""
+from datetime import date
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models import Mission, Onboarding, User, UserProfile
+from app.models.onboarding import TendencyType
+
+STEP1 = {
+    "breakup_date": "2024-01-01",
+    "relationship_years": 1,
+    "relationship_months": 3,
+    "my_tendency": "analytical",
+    "partner_tendency": "emotional"
+}
+
+# (method, path, body, 실행 SQL 문 수). 미션/온보딩/프로필 쓰기는 ETag용 리소스 버전 upsert 한 문장이 더해짐
+WRITE_CALLS = [
+    ("POST", "/api/missions/", {"title": "new"}, 2),
+    # 리포트 통계(현재 행과 비교한 증감) + UPDATE + 버전
+    ("PUT", "/api/missions/{mission_id}", {"title": "updated", "is_completed": True}, 3),
+    ("DELETE", "/api/missions/{mission_id}", None, 2),
+    ("PUT", "/api/onboarding/profile", {"bio": "updated"}, 2),
+    ("PUT", "/api/onboarding/step/3", None, 2),
+    ("POST", "/api/onboarding/step1", STEP1, 2),
+    ("POST", "/api/onboarding/step2", {"breakup_reason": "기타"}, 2),
+    ("POST", "/api/onboarding/step3", {"strategy_type": "balanced"}, 2),
+    # 온보딩 조회 + INSERT + 리포트 통계
+    ("POST", "/api/messages/generate", {"purpose": "안부 인사", "tone_style": "logical"}, 3),
+]
+
+@pytest.fixture
+def seeded(db: Session, test_user: User):
+    mission = Mission(user_id=test_user.id, title="mission")
+    db.add_all([
+        mission,
+        UserProfile(user_id=test_user.id, onboarding_completed=0),
+        Onboarding(
+            user_id=test_user.id,
+            breakup_date=date(2024, 1, 1),
+            relationship_years=1,
+            relationship_months=2,
+            my_tendency=TendencyType.ANALYTICAL,
+            partner_tendency=TendencyType.EMOTIONAL
+        ),
+    ])
+    db.commit()
+    return {"mission_id": mission.id}
+
+@pytest.mark.parametrize("method,path,body,expected", WRITE_CALLS, ids=[f"{m} {p}" for m, p, _, _ in WRITE_CALLS])
+def test_write_round_trips(client: TestClient, mock_auth, seeded, sql_statements, method, path, body, expected):
+    sql_statements.clear()
+    response = client.request(method, path.format(**seeded), json=body)
+    assert response.status_code < 400, response.text
+    assert len(sql_statements) == expected, sql_statements
+
+def test_update_me_round_trips(auth_client: TestClient, sql_statements):
+    # 인증 캐시를 채운 뒤에는 UPDATE와 /users/me 버전 upsert만 실행
+    auth_client.get("/api/users/me")
+    sql_statements.clear()
+    response = auth_client.put("/api/users/me", json={
+        "email": "test@example.com",
+        "username": "testuser",
+        "full_name": "Renamed",
+        "password": "password123"
+    })
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
+    assert len(sql_statements) == 2, sql_statements
+
+def test_signup_round_trips(client: TestClient, db: Session, sql_statements):
+    sql_statements.clear()
+    response = client.post("/api/auth/signup", json={
+        "email": "new@example.com",
+        "username": "newuser",
+        "full_name": "New User",
+        "password": "password123"
+    })
+    assert response.status_code == 200
+    assert response.json()["id"]
+    # 중복 확인 SELECT + INSERT
+    assert len(sql_statements) == 2, sql_statements
+
+def test_server_defaults_are_returned_without_refresh(client: TestClient, mock_auth, seeded):
+    created = client.post("/api/missions/", json={"title": "new"}).json()
+    assert created["created_at"] is not None
+
+    updated = client.put(f"/api/missions/{created['id']}", json={"title": "again"}).json()
+    assert updated["updated_at"] is not None
@@ -0,0 +1,65 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.models.onboarding import BreakupReason, StrategyType, TendencyType
+from app.services.scoring import DEFAULT_MODEL_PATH, ReactionModel, ReactionScorer, onboarding_features
+
+ONBOARDING = SimpleNamespace(
+    my_tendency=TendencyType.ANALYTICAL,
+    partner_tendency=TendencyType.EMOTIONAL,
+    breakup_reason=BreakupReason.TRUST,
+    strategy_type=StrategyType.BALANCED,
+    relationship_years=2,
+    relationship_months=3,
+    breakup_date=date(2024, 1, 1),
+)
+
+def rows():
+    features = onboarding_features(ONBOARDING, today=date(2024, 3, 1))
+    return [
+        dict(features, tone_style="emotional", template="emotional.0"),
+        dict(features, tone_style="logical", template="logical.2"),
+        {"tone_style": "curious", "template": "unknown"},
+        {},
+    ]
+
+def test_onboarding_features():
+    features = onboarding_features(ONBOARDING, today=date(2024, 3, 1))
+    assert features["relationship_months"] == 27
+    assert features["days_since_breakup"] == 60
+    assert features["breakup_reason"] == "신뢰 상실"
+    assert onboarding_features(None) == {}
+
+def test_batch_matches_single_scoring():
+    model = ReactionScorer(DEFAULT_MODEL_PATH).current()
+    batch = model.predict(*model.encode(rows()))
+    single = [model.score_one(row) for row in rows()]
+    np.testing.assert_allclose(batch, single)
+    np.testing.assert_allclose(model.score(rows() * 10), single * 10)
+    assert ((batch > 0) & (batch < 100)).all()
+    # 감성적 상대에게는 감성적 말투가 논리적 말투보다 높게 예측됨
+    assert batch[0] > batch[1]
+
+def test_unknown_and_missing_features_contribute_nothing():
+    model = ReactionModel("t", bias=0.0, categorical={"tone_style": {"logical": 1.0}}, numeric={
+        "days_since_breakup": {"transform": "log1p", "mean": 1.0, "scale": 1.0, "weight": 2.0}
+    })
+    assert model.score([{"tone_style": "other"}, {}]).tolist() == [50.0, 50.0]
+    assert model.score_one({"tone_style": "logical"}) == pytest.approx(100 / (1 + np.exp(-1.0)))
+
+def test_swap_validates_before_replacing(tmp_path):
+    scorer = ReactionScorer(DEFAULT_MODEL_PATH, reload_interval=-1)
+    baseline = scorer.current()
+
+    broken = tmp_path / "broken.json"
+    broken.write_text(json.dumps({"bias": 0.0}))
+    with pytest.raises(KeyError):
+        scorer.swap(broken)
+    assert scorer.current() is baseline
+
+    replacement = tmp_path / "model.json"
+    replacement.write_text(json.dumps({"version": "v2", "bias": 1.0}))
+    assert scorer.swap(replacement).version == "v2"
+    assert scorer.score([{}])[0] == pytest.approx(100 / (1 + np.exp(-1.0)))
@@ -0,0 +1,74 @@
+import json
+import os
+import pytest
+from fastapi.testclient import TestClient
+from app.models.onboarding import StrategyType
+from app.services.templates import (
+    DEFAULT_TEMPLATES_PATH,
+    TemplateError,
+    TemplateRegistry,
+    UnknownToneStyle,
+    compile_template,
+)
+
+def write_templates(path, tones, mtime=None):
+    path.write_text(json.dumps({
+        "tones": {name: {"templates": templates} for name, templates in tones.items()},
+        "context": {"template": " ({duration}) {closing}", "closings": {}, "default_closing": "끝"}
+    }, ensure_ascii=False), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_compiled_template_renders_like_format():
+    source = "{purpose}에 대해 {purpose}!"
+    assert compile_template(source, frozenset({"purpose"})).render({"purpose": "안부"}) == source.format(purpose="안부")
+
+def test_compile_rejects_unknown_fields():
+    with pytest.raises(TemplateError):
+        compile_template("{name}님 안녕하세요", frozenset({"purpose"}))
+    with pytest.raises(TemplateError):
+        compile_template("{purpose!r}", frozenset({"purpose"}))
+
+def test_default_templates_load():
+    templates = TemplateRegistry(DEFAULT_TEMPLATES_PATH).current()
+    assert set(templates.tones) == {"logical", "emotional", "curious"}
+    template, = templates.choose("curious", 1)
+    assert "안부" in template.render({"purpose": "안부"})
+    with pytest.raises(UnknownToneStyle):
+        templates.choose("angry", 1)
+
+def test_hot_reload_and_bad_file(tmp_path):
+    path = tmp_path / "templates.json"
+    write_templates(path, {"logical": ["A {purpose}"]}, mtime=1_000_000)
+    registry = TemplateRegistry(path, reload_interval=0)
+    first = registry.current()
+    assert first.choose("logical", 1)[0].render({"purpose": "x"}) == "A x"
+
+    write_templates(path, {"logical": ["B {purpose}"], "playful": ["C {purpose}"]}, mtime=1_000_100)
+    second = registry.current()
+    assert second.version != first.version
+    assert second.choose("playful", 1)[0].render({"purpose": "x"}) == "C x"
+
+    # 잘못된 파일로 바뀌면 이전 스냅샷 유지
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, (1_000_200, 1_000_200))
+    assert registry.current() is second
+
+def test_closings_keyed_by_strategy(tmp_path):
+    templates = TemplateRegistry(DEFAULT_TEMPLATES_PATH).current()
+    for strategy in StrategyType:
+        assert templates.closings[strategy.value] in templates.render_context("1년", strategy)
+
+    # 전략 값이 아닌 키는 리로드를 실패시킴
+    path = tmp_path / "templates.json"
+    write_templates(path, {"logical": ["A {purpose}"]})
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["context"]["closings"] = {"재회 희망": "다시"}
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(TemplateError, match="재회 희망"):
+        TemplateRegistry(path).current()
+
+def test_generate_rejects_unknown_tone(client: TestClient, mock_auth):
+    response = client.post("/api/messages/generate", json={"purpose": "안부 인사", "tone_style": "angry"})
+    assert response.status_code == 422
+    assert "logical" in response.json()["detail"]
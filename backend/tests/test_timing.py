@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.message import Message
+from app.models.user import User
+from app.services.timing import (
+    SLOTS,
+    TimingPrior,
+    TimingPriorRegistry,
+    compute_prior,
+    hour_of_week,
+    weekly_timing,
+    write_prior,
+)
+from conftest import TestingAsyncSessionLocal
+
+FLAT_PRIOR = TimingPrior.from_dict({"version": "flat", "counts": [0] * SLOTS, "reaction_sums": [0.0] * SLOTS})
+
+def test_hour_of_week_uses_configured_timezone():
+    # 월요일 00:00 UTC = 월요일 09:00 KST
+    assert hour_of_week(datetime(2024, 5, 6, 0, 0)) == 9
+    # 일요일 15:00 UTC = 월요일 00:00 KST
+    assert hour_of_week(datetime(2024, 5, 5, 15, 0, tzinfo=timezone.utc)) == 0
+    assert hour_of_week(datetime(2024, 5, 12, 14, 59)) == SLOTS - 1
+
+def test_weekly_timing_smooths_towards_prior():
+    counts, sums = np.zeros(SLOTS), np.zeros(SLOTS)
+    # 기록된 반응이 전혀 없으면 요일 상태와 추천 구간을 만들지 않음
+    empty = weekly_timing(counts, sums, FLAT_PRIOR)
+    assert (empty["source"], empty["days"], empty["best"]) == ("none", [], None)
+
+    # 금요일 20시에 반응이 좋았던 기록
+    slot = 4 * 24 + 20
+    counts[slot], sums[slot] = 5, 5 * 90.0
+    data = weekly_timing(counts, sums, FLAT_PRIOR)
+    assert data["best"]["weekday"] == 4 and data["best"]["start_hour"] in (19, 20)
+    # 사전 평균(50) 쪽으로 당겨짐: (450 + 5*50) / (5 + 5)
+    assert data["scores"][4][20] == 70.0
+    assert data["counts"][4][20] == 5 and data["prior_outcome_count"] == 0
+    assert len(data["scores"]) == 7 and len(data["scores"][0]) == 24
+    assert data["days"][4]["status"] == "good"
+    assert data["source"] == "observed"
+
+    # 사용자 기록이 없으면 전체 사용자 기록으로만 추천
+    all_counts, all_sums = counts.copy(), sums.copy()
+    all_counts[9], all_sums[9] = 5, 5 * 10.0
+    prior = TimingPrior.from_dict({"version": "p", "counts": all_counts.tolist(), "reaction_sums": all_sums.tolist()})
+    fallback = weekly_timing(np.zeros(SLOTS), np.zeros(SLOTS), prior)
+    assert fallback["source"] == "prior" and fallback["outcome_count"] == 0
+    assert fallback["best"]["weekday"] == 4 and len(fallback["days"]) == 7
+
+def test_prior_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        TimingPrior.from_dict({"version": "bad", "counts": [0] * 24, "reaction_sums": [0.0] * 24})
+
+def test_weekly_endpoint_reads_recorded_reactions(client: TestClient, mock_auth, sql_statements):
+    variants = client.post("/api/messages/generate", json={"purpose": "안부 인사", "tone_style": "logical", "n": 3}).json()["variants"]
+
+    # 생성만 하고 반응을 기록하지 않으면 추천하지 않음 (예측 반응은 보낸 시간과 무관)
+    data = client.get("/api/timing/weekly").json()
+    assert (data["source"], data["outcome_count"], data["days"], data["best"]) == ("none", 0, [], None)
+    assert client.get("/api/report/").json()["optimal_time"] is None
+
+    for variant, reaction in zip(variants, ("positive", "positive", "negative")):
+        response = client.put(f"/api/messages/{variant['id']}/reaction", json={"reaction": reaction})
+        assert response.status_code == 200
+        assert response.json()["reaction"] == reaction
+    # 다시 기록하면 이전 반응을 빼고 교체
+    client.put(f"/api/messages/{variants[2]['id']}/reaction", json={"reaction": "neutral"})
+    assert client.put("/api/messages/999999/reaction", json={"reaction": "positive"}).status_code == 404
+    assert client.put(f"/api/messages/{variants[0]['id']}/reaction", json={"reaction": "great"}).status_code == 422
+
+    sql_statements.clear()
+    response = client.get("/api/timing/weekly")
+    assert response.status_code == 200
+    # 사용자의 reaction_hour 통계 행만 읽는 한 문장
+    assert len(sql_statements) == 1, sql_statements
+    data = response.json()
+    assert (data["source"], data["outcome_count"]) == ("observed", 3)
+    assert data["timezone"] == "Asia/Seoul"
+    count, weekday, hour = max((count, weekday, hour) for weekday, row in enumerate(data["counts"]) for hour, count in enumerate(row))
+    # 세 반응(100, 100, 50)이 같은 칸에 모여 사전 평균(50) 쪽으로 평활: (250 + 5*50) / (3 + 5)
+    assert count == 3 and data["scores"][weekday][hour] == 62.5
+    assert len(data["days"]) == 7
+    assert client.get("/api/report/").json()["optimal_time"] is not None
+
+def test_compute_prior_streams_all_messages(db: Session, test_user: User, tmp_path):
+    db.add_all([
+        Message(user_id=test_user.id, purpose="p", tone_style="logical", content="c", positive_reaction=90.0, reaction=reaction, created_at=created_at)
+        for reaction, created_at in (
+            ("positive", datetime(2024, 5, 6, 0, 10)),
+            ("neutral", datetime(2024, 5, 6, 0, 50)),
+            ("negative", datetime(2024, 5, 7, 12, 0)),
+            # 반응을 기록하지 않은 메시지는 제외
+            (None, datetime(2024, 5, 6, 0, 30)),
+        )
+    ])
+    db.commit()
+
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await compute_prior(session, batch_size=2)
+
+    data = asyncio.run(run())
+    assert sum(data["counts"]) == 3
+    assert data["counts"][9] == 2 and data["reaction_sums"][9] == 150.0
+
+    path = tmp_path / "timing_prior.json"
+    write_prior(path, data)
+    prior = TimingPriorRegistry(path, reload_interval=-1).current()
+    assert prior.version == data["version"]
+    # 기록이 많은 칸일수록 칸 평균(75)에 가깝고, 기록 없는 칸은 전체 평균(50)
+    assert prior.mean[9] == pytest.approx((150 + 5 * 50) / 7)
+    assert prior.mean[0] == pytest.approx(50)
+    assert json.loads(path.read_text())["timezone"] == "Asia/Seoul"
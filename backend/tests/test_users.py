@@ -1,9 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.main import app
+from app.models.resource_version import ResourceVersion
 from app.models.user import User
 from app.core.security import create_access_token
+from app.core.config import settings
+from app.core.deps import principal_cache
+from conftest import METRICS_HEADERS
 
 
 def test_get_me_unauthorized(client: TestClient):
@@ -17,4 +22,77 @@ def test_get_me_invalid_token(client: TestClient):
         "/api/users/me",
         headers={"Authorization": "Bearer invalid_token"}
     )
-    assert response.status_code == 401 
\ No newline at end of file
+    assert response.status_code == 401 
+
+def test_get_me_uses_principal_cache(auth_client: TestClient):
+    before = auth_client.get("/api/metrics/", headers=METRICS_HEADERS).json()["principal_cache"]
+    first = auth_client.get("/api/users/me")
+    second = auth_client.get("/api/users/me")
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+
+    after = auth_client.get("/api/metrics/", headers=METRICS_HEADERS).json()["principal_cache"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+def test_metrics_require_internal_token(client: TestClient, auth_headers, monkeypatch):
+    # 일반 사용자 토큰으로는 내부 지표를 볼 수 없음
+    assert client.get("/api/metrics/", headers=auth_headers).status_code == 403
+    assert client.get("/api/metrics/", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+    assert client.get("/api/metrics/", headers=METRICS_HEADERS).status_code == 200
+    # 토큰을 설정하지 않으면 엔드포인트를 열지 않음
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/api/metrics/", headers=METRICS_HEADERS).status_code == 404
+
+def test_update_me_invalidates_principal_cache(auth_client: TestClient, db: Session, test_user: User):
+    auth_client.get("/api/users/me")
+    assert len(principal_cache) == 1
+
+    response = auth_client.put("/api/users/me", json={
+        "email": test_user.email,
+        "username": "renamed",
+        "full_name": "Renamed User",
+        "password": "new-password"
+    })
+    assert response.status_code == 200
+    assert len(principal_cache) == 0
+    assert auth_client.get("/api/users/me").json()["username"] == "renamed"
+
+def test_deactivated_user_is_not_served_from_cache(auth_client: TestClient, db: Session, test_user: User):
+    assert auth_client.get("/api/users/me").status_code == 200
+
+    test_user.is_active = False
+    db.commit()
+
+    assert auth_client.get("/api/users/me").status_code == 400
+
+def test_get_me_conditional_get(auth_client: TestClient, test_user: User, sql_statements):
+    etag = auth_client.get("/api/users/me").headers["ETag"]
+
+    # 버전 조회 한 번으로 304
+    sql_statements.clear()
+    response = auth_client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(sql_statements) == 1 and "resource_versions" in sql_statements[0]
+
+    auth_client.put("/api/users/me", json={
+        "email": test_user.email,
+        "username": "renamed",
+        "full_name": "Renamed User",
+        "password": "new-password"
+    })
+    response = auth_client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["username"] == "renamed"
+
+def test_get_me_sees_writes_from_other_workers(auth_client: TestClient, db: Session, test_user: User):
+    etag = auth_client.get("/api/users/me").headers["ETag"]
+
+    # 다른 워커의 수정: 이 프로세스의 인증 캐시는 그대로지만 버전이 올라감
+    db.execute(update(User).where(User.id == test_user.id).values(full_name="Elsewhere"))
+    db.add(ResourceVersion(user_id=test_user.id, resource="user", version=1))
+    db.commit()
+    response = auth_client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Elsewhere"
+    assert response.headers["ETag"] != etag
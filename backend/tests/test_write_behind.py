@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from app.core.config import Settings
+from app.models.message import Message
+from app.models.report_stat import UserReportStat
+from app.models.user import User
+from app.services import message_service
+from app.services.write_behind import SPILL_HOST, MessageWriteBuffer, WriteBufferFull
+from conftest import TestingAsyncSessionLocal
+
+# 존재하지 않는 디렉터리의 파일이라 연결할 때마다 OperationalError
+broken_sessions = async_sessionmaker(bind=create_async_engine("sqlite+aiosqlite:///./missing-dir/none.db"))
+
+class SwitchableSessions:
+    """DB 장애를 흉내 내기 위해 정상/고장 세션 팩토리를 전환"""
+
+    def __init__(self):
+        self.down = False
+
+    def __call__(self):
+        return (broken_sessions if self.down else TestingAsyncSessionLocal)()
+
+async def wait_flushed(buffer: MessageWriteBuffer, count: int, timeout: float = 2.0) -> int:
+    """백그라운드 저장이 count개에 이를 때까지 대기 (느린 환경에서도 고정 sleep에 의존하지 않도록)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while buffer.stats()["flushed"] < count and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    return buffer.stats()["flushed"]
+
+def make_rows(user: User, count: int, start: int = 0):
+    return [
+        {
+            "user_id": user.id,
+            "purpose": f"purpose {i}",
+            "tone_style": "logical",
+            "content": f"content {i}",
+            "positive_reaction": 50.0,
+            "warning": None if i % 2 else "경고",
+            "created_at": datetime(2024, 1, 1, 0, 0, i),
+        }
+        for i in range(start, start + count)
+    ]
+
+def count_messages(db: Session) -> int:
+    db.expire_all()
+    return db.scalar(select(func.count()).select_from(Message))
+
+def test_flushes_in_multi_row_batches(db: Session, test_user: User, sql_statements):
+    buffer = MessageWriteBuffer(TestingAsyncSessionLocal, batch_size=3, flush_interval=10)
+
+    async def run():
+        for row in make_rows(test_user, 7):
+            await buffer.submit([row])
+        # 주기(10초)를 기다리지 않고 크기 조건으로 저장됨
+        assert await wait_flushed(buffer, 7) == 7
+        await buffer.close()
+
+    asyncio.run(run())
+    assert count_messages(db) == 7
+    assert sum(statement.startswith("INSERT INTO messages") for statement in sql_statements) == 3
+    assert buffer.stats()["batches"] == 3
+    # 리포트 통계도 저장 트랜잭션에서 갱신
+    assert db.get(UserReportStat, (test_user.id, "messages", "")).count == 7
+
+def test_flushes_on_interval(db: Session, test_user: User):
+    buffer = MessageWriteBuffer(TestingAsyncSessionLocal, batch_size=100, flush_interval=0.02)
+
+    async def run():
+        await buffer.submit(make_rows(test_user, 2))
+        flushed = await wait_flushed(buffer, 2)
+        await buffer.close()
+        return flushed
+
+    assert asyncio.run(run()) == 2
+    assert count_messages(db) == 2
+
+def test_spills_when_db_is_down_and_replays(db: Session, test_user: User, tmp_path):
+    sessions = SwitchableSessions()
+    buffer = MessageWriteBuffer(sessions, batch_size=2, flush_interval=10, spill_dir=tmp_path)
+
+    async def run():
+        sessions.down = True
+        await buffer.submit(make_rows(test_user, 5))
+        await buffer.flush()
+        assert buffer.stats()["spilled_rows"] == 5
+        assert buffer.stats()["pending"] == 0
+
+        sessions.down = False
+        await buffer.submit(make_rows(test_user, 1, start=5))
+        await buffer.close()
+
+    asyncio.run(run())
+    assert count_messages(db) == 6
+    assert list(tmp_path.iterdir()) == []
+    assert buffer.stats()["replayed"] == 5
+    # 저장 시각은 생성 시각 그대로
+    assert db.scalar(select(func.min(Message.created_at))) == datetime(2024, 1, 1, 0, 0, 0)
+
+def test_adopts_spill_file_of_dead_process(db: Session, test_user: User, tmp_path):
+    rows = make_rows(test_user, 2)
+    lines = [json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False) for row in rows]
+    # 마지막 줄은 쓰는 도중 끊긴 것처럼 잘라 둠
+    (tmp_path / "messages-999999999.jsonl").write_text("\n".join(lines) + "\n" + lines[0][:10], encoding="utf-8")
+    buffer = MessageWriteBuffer(TestingAsyncSessionLocal, flush_interval=10, spill_dir=tmp_path)
+
+    async def run():
+        buffer.start()
+        assert buffer.stats()["spilled_rows"] == 3
+        await buffer.close()
+
+    asyncio.run(run())
+    assert count_messages(db) == 2
+    assert list(tmp_path.iterdir()) == []
+
+def test_adopts_only_files_of_dead_processes_on_this_host(db: Session, test_user: User, tmp_path):
+    def spill(owner, start):
+        row = make_rows(test_user, 1, start=start)[0]
+        line = json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False)
+        (tmp_path / f"messages-{owner}.jsonl").write_text(line + "\n", encoding="utf-8")
+
+    # 같은 pid(컨테이너의 pid 1처럼)를 썼던 재시작 전 프로세스의 파일은 가져감
+    spill(f"{SPILL_HOST}-{os.getpid()}-0ld0ld00", 0)
+    # 살아 있는 프로세스와 생존 여부를 알 수 없는 다른 호스트의 파일은 남김
+    spill(f"{SPILL_HOST}-{os.getppid()}-a1b2c3d4", 1)
+    spill(f"other-host-{os.getpid()}-a1b2c3d4", 2)
+    buffer = MessageWriteBuffer(TestingAsyncSessionLocal, flush_interval=10, spill_dir=tmp_path)
+
+    async def run():
+        buffer.start()
+        assert buffer.stats()["spilled_rows"] == 1
+        await buffer.close()
+
+    asyncio.run(run())
+    assert count_messages(db) == 1
+    assert {path.name for path in tmp_path.iterdir()} == {
+        f"messages-{SPILL_HOST}-{os.getppid()}-a1b2c3d4.jsonl",
+        f"messages-other-host-{os.getpid()}-a1b2c3d4.jsonl",
+    }
+
+def test_spill_dir_must_be_absolute(tmp_path):
+    with pytest.raises(ValidationError):
+        Settings(MESSAGE_SPILL_DIR="spill")
+    assert Settings(MESSAGE_SPILL_DIR=str(tmp_path)).MESSAGE_SPILL_DIR == str(tmp_path)
+
+def test_backpressure_when_rows_cannot_be_saved(db: Session, test_user: User):
+    sessions = SwitchableSessions()
+    sessions.down = True
+    # spill 디렉터리가 없으면 저장하지 못한 행은 버퍼에 남음
+    buffer = MessageWriteBuffer(sessions, batch_size=2, flush_interval=10, max_pending=3, put_timeout=0.05)
+
+    async def run():
+        await buffer.submit(make_rows(test_user, 3))
+        with pytest.raises(WriteBufferFull):
+            await buffer.submit(make_rows(test_user, 1, start=3))
+        assert buffer.stats()["pending"] == 3
+        sessions.down = False
+        await buffer.close()
+
+    asyncio.run(run())
+    assert count_messages(db) == 3
+    assert buffer.stats()["rejected"] == 1
+
+def test_generate_returns_before_messages_are_saved(client: TestClient, mock_auth, db: Session, monkeypatch):
+    buffer = MessageWriteBuffer(TestingAsyncSessionLocal, flush_interval=10)
+    monkeypatch.setattr(message_service, "message_write_buffer", buffer)
+    response = client.post("/api/messages/generate", json={"purpose": "안부", "tone_style": "logical", "n": 3})
+    assert response.status_code == 200
+    variants = response.json()["variants"]
+    assert [variant["id"] for variant in variants] == [None, None, None]
+    assert count_messages(db) == 0
+
+    # 요청 처리 루프에서 시작된 버퍼는 같은 루프에서 닫음
+    client.portal.call(buffer.close)
+    assert count_messages(db) == 3